@@ -19,4 +19,5 @@ with CLIMADA. If not, see <https://www.gnu.org/licenses/>.
 init engine
 """
 from .impact import *
+from .impact_calc import *
 from .cost_benefit import *
@@ -28,7 +28,7 @@ from scipy import interpolate
 from scipy.optimize import minimize
 import itertools
 
-from climada.engine import Impact
+from climada.engine import ImpactCalculator
 from climada.entity import ImpactFuncSet, ImpfTropCyclone, impact_funcs
 from climada.engine.impact_data import emdat_impact_yearlysum, emdat_impact_event
 
@@ -38,7 +38,7 @@ LOGGER = logging.getLogger(__name__)
 
 
 def calib_instance(hazard, exposure, impact_func, df_out=pd.DataFrame(),
-                   yearly_impact=False, return_cost='False'):
+                   yearly_impact=False, return_cost='False', impact_calc=None):
 
     """calculate one impact instance for the calibration algorithm and write
         to given DataFrame
@@ -59,6 +59,9 @@ def calib_instance(hazard, exposure, impact_func, df_out=pd.DataFrame(),
         return_cost : str, optional
             if not 'False' but any of 'R2', 'logR2',
             cost is returned instead of df_out
+        impact_calc : ImpactCalculator, optional
+            calculator of exposure and hazard, reused by successive calls
+            with different impact functions
 
         Returns
         -------
@@ -68,8 +71,9 @@ def calib_instance(hazard, exposure, impact_func, df_out=pd.DataFrame(),
     """
     IFS = ImpactFuncSet()
     IFS.append(impact_func)
-    impacts = Impact()
-    impacts.calc(exposure, IFS, hazard)
+    if impact_calc is None:
+        impact_calc = ImpactCalculator(exposure, hazard)
+    impacts = impact_calc.impact(IFS)
     if yearly_impact:  # impact per year
         IYS = impacts.calc_impact_year_set(all_years=True)
         # Loop over whole year range:
@@ -344,11 +348,13 @@ def calib_all(hazard, exposure, impf_name_or_instance, param_full_dict,
             raise ValueError('other impact data sources not yet implemented.')
     params_generator = (dict(zip(param_full_dict, x))
                         for x in itertools.product(*param_full_dict.values()))
+    impact_calc = ImpactCalculator(exposure, hazard)
     for param_dict in params_generator:
         print(param_dict)
         df_out = copy.deepcopy(df_impact_data)
         ImpactFunc_final, df_out = init_impf(impf_name_or_instance, param_dict, df_out)
-        df_out = calib_instance(hazard, exposure, ImpactFunc_final, df_out, yearly_impact)
+        df_out = calib_instance(hazard, exposure, ImpactFunc_final, df_out, yearly_impact,
+                                impact_calc=impact_calc)
         if df_result is None:
             df_result = copy.deepcopy(df_out)
         else:
@@ -407,6 +413,7 @@ def calib_optimize(hazard, exposure, impf_name_or_instance, param_dict,
                                               impact_data_source['emdat'], year_range[-1])
         else:
             raise ValueError('other impact data sources not yet implemented.')
+    impact_calc = ImpactCalculator(exposure, hazard)
     # definie specific function to
     def specific_calib(x):
         param_dict_temp = dict(zip(param_dict.keys(), x))
@@ -414,7 +421,8 @@ def calib_optimize(hazard, exposure, impf_name_or_instance, param_dict,
         return calib_instance(hazard, exposure,
                               init_impf(impf_name_or_instance, param_dict_temp)[0],
                               df_impact_data,
-                              yearly_impact=yearly_impact, return_cost=cost_fucntion)
+                              yearly_impact=yearly_impact, return_cost=cost_fucntion,
+                              impact_calc=impact_calc)
     # define constraints
     if impf_name_or_instance == 'emanuel':
         cons = [{'type': 'ineq', 'fun': lambda x: -x[0] + x[1]},
@@ -30,6 +30,7 @@ from matplotlib.patches import Rectangle, FancyArrowPatch
 from tabulate import tabulate
 
 from climada.engine.impact import Impact
+from climada.engine.impact_calc import ImpactCalculator
 
 LOGGER = logging.getLogger(__name__)
 
@@ -758,8 +759,8 @@ class CostBenefit():
 
         # compute impact without measures
         LOGGER.debug('%s impact with no measure.', when)
-        imp_tmp = Impact()
-        imp_tmp.calc(exposures, imp_fun_set, hazard)
+        impact_calc = ImpactCalculator(exposures, hazard)
+        imp_tmp = impact_calc.impact(imp_fun_set)
         impact_meas[NO_MEASURE] = dict()
         impact_meas[NO_MEASURE]['cost'] = (0, 0)
         impact_meas[NO_MEASURE]['risk'] = risk_func(imp_tmp)
@@ -771,7 +772,8 @@ class CostBenefit():
         # compute impact for each measure
         for measure in meas_set.get_measure(hazard.tag.haz_type):
             LOGGER.debug('%s impact of measure %s.', when, measure.name)
-            imp_tmp, risk_transf = measure.calc_impact(exposures, imp_fun_set, hazard)
+            imp_tmp, risk_transf = measure.calc_impact(exposures, imp_fun_set, hazard,
+                                                       impact_calc)
             impact_meas[measure.name] = dict()
             impact_meas[measure.name]['cost'] = (measure.cost, measure.risk_transf_cost_factor)
             impact_meas[measure.name]['risk'] = risk_func(imp_tmp)
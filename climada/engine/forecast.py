@@ -154,7 +154,14 @@ class Forecast:
         exposure_name : str, optional
             string specifying the exposure (e.g. 'EU'), which is used to
             name output files.
+
+        Raises
+        ------
+        ValueError
+            if hazard_dict is empty or the hazards contain several event dates
         """
+        if not hazard_dict:
+            raise ValueError('No hazard provided.')
         self.run_datetime = list(hazard_dict.keys())
         self.hazard = list(hazard_dict.values())
         # check event_date
@@ -291,8 +298,21 @@ class Forecast:
         force_reassign : bool, optional
             Reassign hazard centroids to the exposure for all hazards,
             default is false.
+
+        Raises
+        ------
+        ValueError
+            if the attribute hazard is empty
         """
+        if not self.hazard:
+            raise ValueError('No hazard provided.')
         # calc impact
+        # pylint: disable=protected-access
+        if not force_reassign and Impact._common_centroids(self.hazard):
+            self._impact = Impact.calc_hazards(
+                self.exposure, self.vulnerability, self.hazard, save_mat=True
+            )
+            return
         for ind_i, haz_i in enumerate(self.hazard):
             # force reassign
             if force_reassign:
@@ -19,14 +19,19 @@ with CLIMADA. If not, see <https://www.gnu.org/licenses/>.
 Define Impact and ImpactFreqCurve classes.
 """
 
-__all__ = ['ImpactFreqCurve', 'Impact']
+__all__ = ['ImpactFreqCurve', 'ImpactGroups', 'Impact']
 
 import logging
 import copy
 import csv
+import numbers
+import threading
 import warnings
-import datetime as dt
+from concurrent.futures import ThreadPoolExecutor
 from itertools import zip_longest
+from pathlib import Path
+import h5py
+import numba
 import numpy as np
 from scipy import sparse
 import matplotlib.pyplot as plt
@@ -36,7 +41,7 @@ import xlsxwriter
 from tqdm import tqdm
 
 
-from climada.entity import Exposures, Tag
+from climada.entity import Exposures, Tag, ImpactFunc
 from climada.entity.exposures import INDICATOR_CENTR
 from climada.hazard import Tag as TagHaz
 import climada.util.plot as u_plot
@@ -44,10 +49,16 @@ from climada import CONFIG
 from climada.util.constants import DEF_CRS, CMAP_IMPACT
 import climada.util.coordinates as u_coord
 import climada.util.dates_times as u_dt
+import climada.util.dtype as u_dtype
+import climada.util.hdf5_handler as u_hdf5
+import climada.util.interpolation as u_interp
 from climada.util.select import get_attributes_with_matching_dimension
 
 LOGGER = logging.getLogger(__name__)
 
+_HAZ_CACHE_LOCK = threading.Lock()
+"""Guards the caches of hazard columns shared by the threads, see Impact._haz_columns"""
+
 class Impact():
     """Impact definition. Compute from an entity (exposures and impact
     functions) and hazard.
@@ -132,7 +143,7 @@ class Impact():
 
         return ifc
 
-    def calc(self, exposures, impact_funcs, hazard, save_mat=False):
+    def calc(self, exposures, impact_funcs, hazard, save_mat=False, n_workers=None):
         """Compute impact of an hazard to exposures.
 
         Parameters
@@ -142,7 +153,12 @@ class Impact():
             impact functions
         hazard : climada.Hazard
         save_mat : bool
-            self impact matrix: events x exposures
+            self impact matrix: events x exposures, stored with the data type
+            of the float_dtype configuration parameter
+        n_workers : int, optional
+            number of threads used to compute the exposure chunks concurrently.
+            The result is identical to the serial computation, the memory use
+            grows with the number of threads. Default: None (serial)
 
         Examples
         --------
@@ -168,6 +184,38 @@ class Impact():
             >>> imp.calc(exp, funcs, haz)
             >>> imp.aai_agg
         """
+        self._calc(exposures, impact_funcs, hazard, save_mat, n_workers)
+
+    def _calc(self, exposures, impact_funcs, hazard, save_mat=False, n_workers=None,
+              haz_cache=None, grp_acc=None, exp_sel=None, ev_bounds=None, value=None,
+              frequency=None):
+        """Compute impact of an hazard to exposures, see calc.
+
+        Parameters
+        ----------
+        exposures : climada.entity.Exposures
+        impact_funcs : climada.entity.ImpactFuncSet
+        hazard : climada.Hazard
+        save_mat : bool, optional
+        n_workers : int, optional
+        haz_cache : dict, optional
+            hazard columns of previous computations with the same hazard,
+            extended with the columns of this computation. Default: None
+        grp_acc : list, optional
+            [exposures x groups indicator, events x groups impact], the
+            impact per group of this computation is added to the second
+            element. Default: None
+        exp_sel : np.array, optional
+            positions of the only exposures to compute. Default: None (all)
+        ev_bounds : np.array, optional
+            first event of each hazard stacked in hazard, and number of
+            events. eai_exp is then computed per hazard, hazards x exposures.
+            Default: None
+        value : np.array, optional
+            exposure values used instead of exposures.gdf.value. Default: None
+        frequency : np.array, optional
+            event frequencies used instead of hazard.frequency. Default: None
+        """
         # 1. Assign centroids to each exposure if not done
         assign_haz = INDICATOR_CENTR + hazard.tag.haz_type
         if assign_haz not in exposures.gdf:
@@ -176,21 +224,30 @@ class Impact():
             LOGGER.info('Exposures matching centroids found in %s', assign_haz)
 
         # 2. Initialize values
+        if value is None:
+            value = exposures.gdf.value.values
+        if frequency is None:
+            frequency = hazard.frequency
         self.unit = exposures.value_unit
         self.event_id = hazard.event_id
         self.event_name = hazard.event_name
         self.date = hazard.date
         self.coord_exp = np.stack([exposures.gdf.latitude.values,
                                    exposures.gdf.longitude.values], axis=1)
-        self.frequency = hazard.frequency
+        self.frequency = frequency
         self.at_event = np.zeros(hazard.intensity.shape[0])
-        self.eai_exp = np.zeros(exposures.gdf.value.size)
+        if ev_bounds is None:
+            self.eai_exp = np.zeros(value.size)
+        else:
+            self.eai_exp = np.zeros((len(ev_bounds) - 1, value.size))
         self.tag = {'exp': exposures.tag, 'impf_set': impact_funcs.tag,
                     'haz': hazard.tag}
         self.crs = exposures.crs
 
         # Select exposures with positive value and assigned centroid
-        exp_idx = np.where((exposures.gdf.value > 0) & (exposures.gdf[assign_haz] >= 0))[0]
+        exp_idx = np.where((value > 0) & (exposures.gdf[assign_haz].values >= 0))[0]
+        if exp_sel is not None:
+            exp_idx = np.intersect1d(exp_idx, exp_sel)
         if exp_idx.size == 0:
             LOGGER.warning("No affected exposures.")
 
@@ -199,7 +256,6 @@ class Impact():
                     exp_idx.size, num_events)
 
         # Get damage functions for this hazard
-        impf_haz = exposures.get_impf_column(hazard.tag.haz_type)
         haz_imp = impact_funcs.get_func(hazard.tag.haz_type)
 
         # Check if deductible and cover should be applied
@@ -209,35 +265,435 @@ class Impact():
             insure_flag = True
 
         if save_mat:
-            # (data, (row_ind, col_ind))
+            # (data, (row_ind, col_ind)), as lists of arrays per chunk
             self.imp_mat = ([], ([], []))
 
-        # 3. Loop over exposures according to their impact function
-        tot_exp = 0
-        for imp_fun in haz_imp:
-            # get indices of all the exposures with this impact function
-            exp_iimp = np.where(exposures.gdf[impf_haz].values[exp_idx] == imp_fun.id)[0]
-            tot_exp += exp_iimp.size
-            exp_step = CONFIG.max_matrix_size.int() // num_events
-            if not exp_step:
-                raise ValueError('Increase max_matrix_size configuration parameter to > %s'
-                                 % str(num_events))
-            # separate in chunks
-            chk = -1
-            for chk in range(int(exp_iimp.size / exp_step)):
-                self._exp_impact(
-                    exp_idx[exp_iimp[chk * exp_step:(chk + 1) * exp_step]],
-                    exposures, hazard, imp_fun, insure_flag)
-            self._exp_impact(exp_idx[exp_iimp[(chk + 1) * exp_step:]],
-                             exposures, hazard, imp_fun, insure_flag)
+        # 3. Order exposures by impact function, so that the hazard columns of
+        # all exposures are gathered in a single pass per chunk
+        exp_iimp, exp_fun = self._exp_impf_sorted(exposures, hazard, exp_idx, haz_imp)
+        tot_exp = exp_iimp.size
+        # column-major hazard matrices, fetched once for all the chunks
+        haz_csc = self._haz_csc(hazard)
+        # separate in chunks of at most max_matrix_size nonzero intensities
+        exp_chunks = self._exp_chunks(
+            np.diff(haz_csc[0].indptr)[exposures.gdf[assign_haz].values[exp_iimp]],
+            CONFIG.max_matrix_size.int())
+        if n_workers is not None and n_workers > 1:
+            self._exp_impact_threads(exp_iimp, exp_fun, exp_chunks, exposures, hazard,
+                                     haz_imp, insure_flag, n_workers, haz_cache, grp_acc,
+                                     ev_bounds, haz_csc, value, frequency)
+        else:
+            for chk in exp_chunks:
+                self._exp_impact(exp_iimp[chk], exposures, hazard, haz_imp, insure_flag,
+                                 exp_fun[chk], haz_cache=haz_cache, grp_acc=grp_acc,
+                                 ev_bounds=ev_bounds, haz_csc=haz_csc, value=value,
+                                 frequency=frequency)
 
         if not tot_exp:
             LOGGER.warning('No impact functions match the exposures.')
-        self.aai_agg = sum(self.at_event * hazard.frequency)
+        self.aai_agg = sum(self.at_event * frequency)
 
         if save_mat:
-            shape = (self.date.size, exposures.gdf.value.size)
-            self.imp_mat = sparse.csr_matrix(self.imp_mat, shape=shape)
+            # at_event and eai_exp are accumulated in double precision, the
+            # impact matrix is stored with the configured data type
+            shape = (self.date.size, value.size)
+            self.imp_mat = self._stitch_imp_mat(self.imp_mat, shape, u_dtype.float_dtype())
+
+    def calc_event_blocks(self, exposures, impact_funcs, haz_blocks, imp_mat_file=None):
+        """Compute impact of a hazard given as successive blocks of events.
+
+        Only one block of the hazard is held in memory at a time. The impact
+        per event, the expected annual impact per exposure and the average
+        annual impact are accumulated over the blocks, and the rows of the
+        impact matrix are optionally written block by block to an hdf5 file.
+
+        Parameters
+        ----------
+        exposures : climada.entity.Exposures
+        impact_funcs : climada.entity.ImpactFuncSet
+            impact functions
+        haz_blocks : iterable(climada.Hazard)
+            hazards with disjoint events, sharing the same centroids and hazard
+            type, e.g. Hazard.from_hdf5_event_blocks
+        imp_mat_file : str, optional
+            if provided, the impact matrix (events x exposures) is written in
+            csr format to the group 'imp_mat' of this hdf5 file, with datasets
+            'data', 'indices', 'indptr' and attribute 'shape'. self.imp_mat
+            stays empty. Default: None
+
+        Raises
+        ------
+        ValueError
+
+        Examples
+        --------
+            >>> haz_blocks = Hazard.from_hdf5_event_blocks(HAZ_FILE, 10000)
+            >>> imp = Impact()
+            >>> imp.calc_event_blocks(exp, funcs, haz_blocks, 'imp_mat.h5')
+            >>> imp.aai_agg
+        """
+        event_id, event_name, date, frequency, at_event = [], [], [], [], []
+        hf_data, hf_csr = None, None
+        if imp_mat_file is not None:
+            LOGGER.info('Writing %s', imp_mat_file)
+            hf_data = h5py.File(imp_mat_file, 'w')
+            hf_csr = hf_data.create_group('imp_mat')
+            for var_name, var_dtype in [('data', float), ('indices', np.int64),
+                                        ('indptr', np.int64)]:
+                hf_csr.create_dataset(var_name, (0,), maxshape=(None,),
+                                      chunks=True, dtype=var_dtype)
+        try:
+            imp_blk, eai_exp, aai_agg = None, 0, 0
+            for haz_blk in haz_blocks:
+                imp_blk = Impact()
+                imp_blk.calc(exposures, impact_funcs, haz_blk,
+                             save_mat=hf_csr is not None)
+                eai_exp = eai_exp + imp_blk.eai_exp
+                aai_agg += imp_blk.aai_agg
+                event_id.append(imp_blk.event_id)
+                event_name.extend(imp_blk.event_name)
+                date.append(imp_blk.date)
+                frequency.append(imp_blk.frequency)
+                at_event.append(imp_blk.at_event)
+                if hf_csr is not None:
+                    self._append_hdf5_csr_rows(hf_csr, imp_blk.imp_mat)
+                    imp_blk.imp_mat = None
+            if imp_blk is None:
+                raise ValueError('No hazard blocks provided.')
+            if hf_csr is not None:
+                hf_csr.attrs['shape'] = (sum(ev_id.size for ev_id in event_id),
+                                         exposures.gdf.shape[0])
+        finally:
+            if hf_data is not None:
+                hf_data.close()
+
+        self.tag = imp_blk.tag
+        self.unit = imp_blk.unit
+        self.coord_exp = imp_blk.coord_exp
+        self.crs = imp_blk.crs
+        self.tot_value = imp_blk.tot_value
+        self.event_id = np.concatenate(event_id)
+        self.event_name = event_name
+        self.date = np.concatenate(date)
+        self.frequency = np.concatenate(frequency)
+        self.at_event = np.concatenate(at_event)
+        self.eai_exp = eai_exp
+        self.aai_agg = aai_agg
+        self.imp_mat = sparse.csr_matrix(np.empty((0, 0)))
+
+        if np.unique(self.event_id).size != self.event_id.size:
+            LOGGER.warning('The hazard blocks contain repeated event ids.')
+
+    @staticmethod
+    def _append_hdf5_csr_rows(hf_csr, mat):
+        """Append the rows of a csr matrix to the resizable datasets 'data',
+        'indices' and 'indptr' of an hdf5 group.
+
+        Parameters
+        ----------
+        hf_csr : h5py.Group
+            group with one dimensional resizable datasets
+        mat : sparse.csr_matrix
+            rows to append
+        """
+        nnz = hf_csr['data'].size
+        num_ptr = hf_csr['indptr'].size
+        if not num_ptr:
+            hf_csr['indptr'].resize((1,))
+            hf_csr['indptr'][0] = 0
+            num_ptr = 1
+        if mat.nnz:
+            hf_csr['data'].resize((nnz + mat.nnz,))
+            hf_csr['data'][nnz:] = mat.data
+            hf_csr['indices'].resize((nnz + mat.nnz,))
+            hf_csr['indices'][nnz:] = mat.indices
+        hf_csr['indptr'].resize((num_ptr + mat.shape[0],))
+        hf_csr['indptr'][num_ptr:] = mat.indptr[1:].astype(np.int64) + nnz
+
+    @classmethod
+    def calc_hazards(cls, exposures, impact_funcs, haz_list, save_mat=False, n_workers=None,
+                     combine=False):
+        """Compute the impacts of several hazards on the same centroids, e.g.
+        the members of an ensemble or the hazards of several scenarios, in a
+        single pass.
+
+        The exposures are assigned to the centroids and grouped by impact
+        function once, and the events of all hazards are stacked, so that
+        the hazard columns of every exposure are processed once. The impacts
+        of each hazard are identical to the ones of Impact.calc.
+
+        Parameters
+        ----------
+        exposures : climada.entity.Exposures
+        impact_funcs : climada.entity.ImpactFuncSet
+            impact functions
+        haz_list : list(climada.Hazard)
+            hazards of the same type with equal centroids
+        save_mat : bool, optional
+            save impact matrices: events x exposures. Default: False
+        n_workers : int, optional
+            number of threads, see calc. Default: None
+        combine : bool, optional
+            return one impact with the events of all hazards, with unchanged
+            frequencies, instead of one impact per hazard. Default: False
+
+        Returns
+        -------
+        list(climada.engine.Impact) or climada.engine.Impact
+
+        Raises
+        ------
+        ValueError
+            if the hazards do not share type and centroids
+
+        Examples
+        --------
+            >>> imp_members = Impact.calc_hazards(exp, impf_set, haz_members)
+            >>> aai_aggs = [imp.aai_agg for imp in imp_members]
+        """
+        if len(haz_list) == 0:
+            return cls() if combine else []
+        if not cls._common_centroids(haz_list):
+            raise ValueError('The hazards do not share type and centroids.')
+        haz_stack = copy.copy(haz_list[0])
+        # implicit fractions are made explicit if stacked with explicit ones,
+        # quantized intensities are decoded
+        haz_stack.implicit_fraction = all(haz.implicit_fraction for haz in haz_list)
+        quantized = any(haz.intensity_quantization is not None for haz in haz_list)
+        for attr_name, attr_val in vars(haz_list[0]).items():
+            if attr_name == 'fraction' and not haz_stack.implicit_fraction:
+                haz_stack.fraction = sparse.vstack(
+                    [haz.get_fraction() for haz in haz_list], format='csr')
+            elif attr_name == 'intensity' and quantized:
+                haz_stack.intensity = sparse.vstack(
+                    [haz.get_intensity() for haz in haz_list], format='csr')
+                haz_stack.intensity_quantization = None
+            elif isinstance(attr_val, sparse.csr_matrix):
+                setattr(haz_stack, attr_name, sparse.vstack(
+                    [getattr(haz, attr_name) for haz in haz_list], format='csr'))
+            elif isinstance(attr_val, np.ndarray) and attr_val.ndim == 1 \
+            and attr_val.size == haz_list[0].size:
+                setattr(haz_stack, attr_name, np.concatenate(
+                    [getattr(haz, attr_name) for haz in haz_list]))
+            elif attr_name == 'event_name':
+                haz_stack.event_name = [name for haz in haz_list for name in haz.event_name]
+        ev_bounds = np.cumsum([0] + [haz.size for haz in haz_list])
+
+        imp_stack = cls()
+        imp_stack._calc(exposures, impact_funcs, haz_stack, save_mat, n_workers,
+                        ev_bounds=None if combine else ev_bounds)
+        if combine:
+            return imp_stack
+
+        imp_list = []
+        for haz, ini, end, eai_exp in zip(haz_list, ev_bounds[:-1], ev_bounds[1:],
+                                          imp_stack.eai_exp):
+            imp = cls()
+            imp.tag = dict(imp_stack.tag, haz=haz.tag)
+            imp.unit, imp.crs = imp_stack.unit, imp_stack.crs
+            imp.coord_exp, imp.tot_value = imp_stack.coord_exp.copy(), imp_stack.tot_value
+            imp.event_id, imp.event_name = haz.event_id, haz.event_name
+            imp.date, imp.frequency = haz.date, haz.frequency
+            imp.at_event = imp_stack.at_event[ini:end]
+            imp.eai_exp = eai_exp
+            imp.aai_agg = sum(imp.at_event * haz.frequency)
+            if save_mat:
+                imp.imp_mat = imp_stack.imp_mat[ini:end]
+            imp_list.append(imp)
+        return imp_list
+
+    @staticmethod
+    def _common_centroids(haz_list):
+        """Whether all hazards have the type and the centroids of the first.
+
+        Parameters
+        ----------
+        haz_list : list(climada.Hazard)
+
+        Returns
+        -------
+        bool
+        """
+        return all(haz.tag.haz_type == haz_list[0].tag.haz_type
+                   and (haz.centroids is haz_list[0].centroids
+                        or haz.centroids.equal(haz_list[0].centroids))
+                   for haz in haz_list[1:])
+
+    def update(self, exposures, impact_funcs, hazard, changed_idx, n_workers=None):
+        """Update the impact computed with calc(save_mat=True) after a change
+        of some exposures, e.g. of their values or impact functions.
+
+        The impacts of the changed exposures are removed from at_event and
+        imp_mat using the stored columns of imp_mat, and they are computed
+        again from the hazard. The other exposures are not computed. The
+        result equals the one of calc up to rounding errors in at_event and
+        tot_value.
+
+        Parameters
+        ----------
+        exposures : climada.entity.Exposures
+            exposures with the changes, same number and order of exposures as
+            in the computation of the impact. Changed coordinates require
+            to assign the centroids again.
+        impact_funcs : climada.entity.ImpactFuncSet
+            impact functions
+        hazard : climada.Hazard
+            hazard of the computation of the impact
+        changed_idx : np.array
+            positions of the changed exposures
+        n_workers : int, optional
+            number of threads, see calc. Default: None
+
+        Raises
+        ------
+        ValueError
+            if the impact matrix is missing or does not match the exposures
+
+        Examples
+        --------
+            >>> imp.calc(exp, impf_set, haz, save_mat=True)
+            >>> exp.gdf.value.values[changed_idx] *= 1.1
+            >>> imp.update(exp, impf_set, haz, changed_idx)
+        """
+        num_exp = exposures.gdf.shape[0]
+        if self.imp_mat.shape != (self.event_id.size, num_exp) \
+        or self.eai_exp.size != num_exp:
+            raise ValueError("The impact matrix is missing or does not match the exposures. "
+                             "Please recompute impact.calc() with save_mat=True.")
+        changed_idx = np.unique(np.asarray(changed_idx, dtype=int))
+        imp_chg = Impact()
+        imp_chg._calc(exposures, impact_funcs, hazard, save_mat=True, n_workers=n_workers,
+                      exp_sel=changed_idx)
+
+        # replace the columns of the changed exposures
+        exp_keep = np.ones(num_exp)
+        exp_keep[changed_idx] = 0
+        imp_old = self.imp_mat[:, changed_idx]
+        self.imp_mat = self.imp_mat @ sparse.diags(exp_keep)
+        self.imp_mat.eliminate_zeros()
+        self.imp_mat = sparse.csr_matrix(self.imp_mat + imp_chg.imp_mat)
+
+        self.at_event = self.at_event - imp_old.sum(axis=1).A1 + imp_chg.at_event
+        self.eai_exp[changed_idx] = imp_chg.eai_exp[changed_idx]
+        self.coord_exp[changed_idx] = imp_chg.coord_exp[changed_idx]
+        self.aai_agg = sum(self.at_event * self.frequency)
+        assign_haz = INDICATOR_CENTR + hazard.tag.haz_type
+        exp_iimp, _ = self._exp_impf_sorted(
+            exposures, hazard,
+            np.where((exposures.gdf.value > 0) & (exposures.gdf[assign_haz] >= 0))[0],
+            impact_funcs.get_func(hazard.tag.haz_type))
+        self.tot_value = np.sum(exposures.gdf.value.values[exp_iimp])
+
+    def calc_groups(self, exposures, impact_funcs, hazard, groups, n_workers=None):
+        """Compute the impact as calc without impact matrix, and aggregate it
+        per group of exposures, e.g. per region, chunk by chunk.
+
+        Parameters
+        ----------
+        exposures : climada.entity.Exposures
+        impact_funcs : climada.entity.ImpactFuncSet
+            impact functions
+        hazard : climada.Hazard
+        groups : np.array or str
+            group of each exposure, or name of the column of exposures.gdf
+            containing it, e.g. 'region_id'
+        n_workers : int, optional
+            number of threads, see calc. Default: None
+
+        Returns
+        -------
+        ImpactGroups
+
+        Examples
+        --------
+            >>> imp = Impact()
+            >>> imp_reg = imp.calc_groups(exp, impf_set, haz, 'region_id')
+            >>> imp_reg.calc_freq_curve([10, 100])
+        """
+        if isinstance(groups, str):
+            groups = exposures.gdf[groups].values
+        group_id, group_ind = self._group_indicator(groups, exposures.gdf.shape[0])
+        grp_acc = [group_ind, sparse.csr_matrix((hazard.size, group_id.size))]
+        self._calc(exposures, impact_funcs, hazard, False, n_workers, grp_acc=grp_acc)
+        return self._impact_groups(group_id, group_ind, grp_acc[1])
+
+    def aggregate_groups(self, groups):
+        """Aggregate the impact per group of exposures, e.g. per region, from
+        the impact matrix.
+
+        Parameters
+        ----------
+        groups : np.array
+            group of each exposure, in the order of coord_exp
+
+        Returns
+        -------
+        ImpactGroups
+
+        Raises
+        ------
+        ValueError
+            if the impact matrix is missing
+        """
+        if self.imp_mat.shape != (self.event_id.size, self.eai_exp.size):
+            raise ValueError("The impact matrix is missing or incomplete. "
+                             "Please recompute impact.calc() with save_mat=True "
+                             "or use impact.calc_groups()")
+        group_id, group_ind = self._group_indicator(groups, self.eai_exp.size)
+        return self._impact_groups(group_id, group_ind,
+                                   sparse.csr_matrix(self.imp_mat @ group_ind))
+
+    @staticmethod
+    def _group_indicator(groups, num_exp):
+        """Sparse indicator matrix of the group of each exposure.
+
+        Parameters
+        ----------
+        groups : np.array
+            group of each exposure
+        num_exp : int
+            number of exposures
+
+        Returns
+        -------
+        group_id : np.array
+            sorted groups
+        group_ind : sparse.csr_matrix
+            exposures x groups, 1 at the group of each exposure
+        """
+        groups = np.asarray(groups)
+        if groups.size != num_exp:
+            raise ValueError('Wrong number of groups: %s != %s.' % (groups.size, num_exp))
+        group_id, group_pos = np.unique(groups, return_inverse=True)
+        return group_id, sparse.csr_matrix((np.ones(num_exp), (np.arange(num_exp), group_pos)),
+                                           shape=(num_exp, group_id.size))
+
+    def _impact_groups(self, group_id, group_ind, at_event):
+        """ImpactGroups of this impact.
+
+        Parameters
+        ----------
+        group_id : np.array
+            sorted groups
+        group_ind : sparse.csr_matrix
+            exposures x groups indicator
+        at_event : sparse.csr_matrix
+            impact of each event in each group
+
+        Returns
+        -------
+        ImpactGroups
+        """
+        imp_grp = ImpactGroups()
+        imp_grp.tag = self.tag
+        imp_grp.group_id = group_id
+        imp_grp.event_id = self.event_id
+        imp_grp.frequency = self.frequency
+        imp_grp.at_event = at_event
+        imp_grp.eai = group_ind.T.dot(self.eai_exp)
+        imp_grp.aai_agg = self.aai_agg
+        imp_grp.unit = self.unit
+        return imp_grp
 
     def calc_risk_transfer(self, attachment, cover):
         """Compute traaditional risk transfer over impact. Returns new impact
@@ -600,13 +1056,93 @@ class Impact():
 
         imp_wb.close()
 
-    def write_sparse_csr(self, file_name):
-        """Write imp_mat matrix in numpy's npz format."""
+    def write_sparse_csr(self, file_name, as_dir=False):
+        """Write imp_mat matrix in numpy's npz format.
+
+        Parameters
+        ----------
+        file_name : str
+            npz file name, or directory name if as_dir
+        as_dir : bool, optional
+            write the arrays as npy files data.npy, indices.npy, indptr.npy
+            and shape.npy of the directory file_name instead, which can be
+            memory-mapped by read_sparse_csr. Default: False
+        """
+        LOGGER.info('Writing %s', file_name)
+        csr_arrays = dict(data=self.imp_mat.data, indices=self.imp_mat.indices,
+                          indptr=self.imp_mat.indptr, shape=self.imp_mat.shape)
+        if not as_dir:
+            np.savez(file_name, **csr_arrays)
+            return
+        Path(file_name).mkdir(parents=True, exist_ok=True)
+        for var_name, var_val in csr_arrays.items():
+            np.save(Path(file_name, var_name + '.npy'), var_val)
+
+    def write_hdf5(self, file_name, compression='gzip'):
+        """Write impact in hdf5 format, imp_mat included.
+
+        The impact matrix is stored in the group 'imp_mat' as compressed and
+        chunked csr datasets 'data', 'indices' and 'indptr', so that
+        Impact.from_hdf5 can read selected events or exposures only, or no
+        matrix at all. Event names are stored as strings, integer names are
+        read back as integers.
+
+        Parameters
+        ----------
+        file_name : str
+            file name to write, with h5 format
+        compression : str, optional
+            hdf5 compression filter of the array datasets, None for no
+            compression. Default: 'gzip'
+        """
         LOGGER.info('Writing %s', file_name)
-        np.savez(file_name, data=self.imp_mat.data, indices=self.imp_mat.indices,
-                 indptr=self.imp_mat.indptr, shape=self.imp_mat.shape)
+        str_dt = h5py.special_dtype(vlen=str)
+        with h5py.File(file_name, 'w') as hf_data:
+            for tag_name, tag_attrs in [('tag_hazard', ('haz', ['haz_type', 'file_name',
+                                                                'description'])),
+                                        ('tag_exposure', ('exp', ['file_name', 'description'])),
+                                        ('tag_impact_func', ('impf_set', ['file_name',
+                                                                          'description']))]:
+                tag_key, attr_names = tag_attrs
+                if tag_key in self.tag:
+                    hf_data.create_dataset(
+                        tag_name, dtype=str_dt,
+                        data=[str(getattr(self.tag[tag_key], attr)) for attr in attr_names])
+            hf_data.create_dataset('unit', data=self.unit, dtype=str_dt)
+            hf_data.create_dataset('crs', data=str(self.crs), dtype=str_dt)
+            hf_data.create_dataset('aai_agg', data=self.aai_agg)
+            if self.tot_value is not None:
+                hf_data.create_dataset('tot_value', data=self.tot_value)
+            hf_data.create_dataset('event_name', dtype=str_dt,
+                                   data=np.array([str(name) for name in self.event_name],
+                                                 dtype=object))
+            # integer names, e.g. the default event ids of Hazard.check, are
+            # marked to be read back as integers
+            name_int = np.array([isinstance(name, numbers.Integral)
+                                 for name in self.event_name], dtype=bool)
+            if name_int.any():
+                hf_data.create_dataset('event_name_int', data=name_int)
+            for var_name in ['event_id', 'date', 'frequency', 'at_event', 'eai_exp',
+                             'coord_exp']:
+                var_val = np.asarray(getattr(self, var_name))
+                if var_name == 'coord_exp' and var_val.ndim != 2:
+                    var_val = np.zeros((0, 2))
+                if var_val.size:
+                    hf_data.create_dataset(var_name, data=var_val, chunks=True,
+                                           compression=compression)
+                else:
+                    hf_data.create_dataset(var_name, data=var_val)
+            hf_csr = hf_data.create_group('imp_mat')
+            for var_name in ['data', 'indices', 'indptr']:
+                var_val = getattr(self.imp_mat, var_name)
+                if var_val.size:
+                    hf_csr.create_dataset(var_name, data=var_val, chunks=True,
+                                          compression=compression)
+                else:
+                    hf_csr.create_dataset(var_name, data=var_val)
+            hf_csr.attrs['shape'] = self.imp_mat.shape
 
-    def calc_impact_year_set(self, all_years=True, year_range=None):
+    def calc_impact_year_set(self, all_years=True, year_range=None, as_array=False):
         """Calculate yearly impact from impact data.
 
         Parameters
@@ -616,17 +1152,22 @@ class Impact():
             last year with event, including years without any events.
         year_range : tuple or list with integers
             start and end year
+        as_array : bool, optional
+            return the years and their impacts as arrays instead of a dict.
+            Default: False
 
         Returns
         -------
-        Impact year set of type numpy.ndarray with summed impact per year.
+        Impact year set of type dict with summed impact per year,
+        or tuple of np.arrays years and summed impact if as_array.
         """
         if year_range is None:
             year_range = []
 
-        orig_year = np.array([dt.datetime.fromordinal(date).year
-                              for date in self.date])
+        orig_year = u_dt.ordinal_to_year(self.date)
         if orig_year.size == 0 and len(year_range) == 0:
+            if as_array:
+                return np.array([], int), np.array([])
             return dict()
         if orig_year.size == 0 or (len(year_range) > 0 and all_years):
             years = np.arange(min(year_range), max(year_range) + 1)
@@ -638,11 +1179,14 @@ class Impact():
             years = years[years >= min(year_range)]
             years = years[years <= max(year_range)]
 
-        year_set = dict()
-
-        for year in years:
-            year_set[year] = sum(self.at_event[orig_year == year])
-        return year_set
+        year_imp = np.zeros(years.size)
+        if years.size and orig_year.size:
+            first_year = min(years.min(), orig_year.min())
+            year_imp = np.bincount(orig_year - first_year, weights=self.at_event,
+                                   minlength=years.max() - first_year + 1)[years - first_year]
+        if as_array:
+            return years, year_imp
+        return dict(zip(years, year_imp))
 
     def local_exceedance_imp(self, return_periods=(25, 50, 100, 250)):
         """Compute exceedance impact map for given return periods.
@@ -669,15 +1213,11 @@ class Impact():
         if not cen_step:
             raise ValueError('Increase max_matrix_size configuration parameter to > %s'
                              % str(self.imp_mat.shape[0]))
-        # separte in chunks
-        chk = -1
-        for chk in range(int(num_cen / cen_step)):
-            self._loc_return_imp(np.array(return_periods),
-                                 self.imp_mat[:, chk * cen_step:(chk + 1) * cen_step].toarray(),
-                                 imp_stats[:, chk * cen_step:(chk + 1) * cen_step])
-        self._loc_return_imp(np.array(return_periods),
-                             self.imp_mat[:, (chk + 1) * cen_step:].toarray(),
-                             imp_stats[:, (chk + 1) * cen_step:])
+        # separte in chunks, fitted from the nonzeros of each column
+        imp_csc = self.imp_mat.tocsc()
+        for ini in range(0, num_cen, cen_step):
+            imp_stats[:, ini:ini + cen_step] = u_interp.local_exceedance_fit(
+                imp_csc[:, ini:ini + cen_step], self.frequency, np.array(return_periods))
 
         return imp_stats
 
@@ -729,21 +1269,37 @@ class Impact():
         return axis, imp_stats
 
     @staticmethod
-    def read_sparse_csr(file_name):
-        """Read imp_mat matrix from numpy's npz format.
+    def read_sparse_csr(file_name, mmap_mode=None):
+        """Read imp_mat matrix from numpy's npz format, or from the directory
+        of npy files written by write_sparse_csr with as_dir=True.
 
         Parameters
         ----------
-        file_name : str file name
+        file_name : str
+            file name, or directory name
+        mmap_mode : str, optional
+            memory-map the arrays of a directory with this mode of np.load,
+            e.g. 'r': only the parts of the matrix which are accessed, e.g.
+            the rows selected in Impact.select, are read from the disk.
+            Default: None (the matrix is read into memory)
 
         Returns
         -------
         sparse.csr_matrix
         """
         LOGGER.info('Reading %s', file_name)
-        loader = np.load(file_name)
+        if not Path(file_name).is_dir():
+            if mmap_mode is not None:
+                LOGGER.warning('npz files cannot be memory-mapped, reading %s into memory.',
+                               file_name)
+            loader = np.load(file_name)
+            return sparse.csr_matrix(
+                (loader['data'], loader['indices'], loader['indptr']), shape=loader['shape'])
+        loader = {var_name: np.load(Path(file_name, var_name + '.npy'), mmap_mode=mmap_mode)
+                  for var_name in ['data', 'indices', 'indptr']}
         return sparse.csr_matrix(
-            (loader['data'], loader['indices'], loader['indptr']), shape=loader['shape'])
+            (loader['data'], loader['indices'], loader['indptr']),
+            shape=tuple(np.load(Path(file_name, 'shape.npy'))))
 
     @classmethod
     def from_csv(cls, file_name):
@@ -788,6 +1344,141 @@ class Impact():
                                  str(imp_df.tag_impact_func[1]))
         return imp
 
+    @classmethod
+    def from_hdf5(cls, file_name, event_id=None, exp_range=None, imp_mat=True):
+        """Read impact in hdf5 format generated by write_hdf5.
+
+        Only the requested part of the impact matrix is read from the file:
+        the rows of the selected events, and of them the columns of the
+        selected exposures. With imp_mat=False, the matrix is not read at all.
+        As in Impact.select, the frequencies are not adjusted to a selection
+        of events, and at_event, eai_exp and aai_agg are recomputed for the
+        selection from the impact matrix.
+
+        Parameters
+        ----------
+        file_name : str
+            file name to read, with h5 format
+        event_id : list[int], optional
+            ids of the events to read. Default: None, all events
+        exp_range : tuple(int, int), optional
+            (first, last + 1) position of the exposures to read, in the order
+            of coord_exp. Default: None, all exposures
+        imp_mat : bool, optional
+            read the impact matrix. Without it, the aggregates that cannot be
+            derived for a selection are empty: eai_exp for a selection of
+            events, at_event for a selection of exposures. Default: True
+
+        Returns
+        -------
+        imp : climada.engine.impact.Impact
+            Impact from hdf5 file
+
+        Raises
+        ------
+        ValueError
+            if events and exposures are selected without reading the matrix
+
+        Examples
+        --------
+            >>> aggregates = Impact.from_hdf5(IMP_FILE, imp_mat=False)
+            >>> imp_sel = Impact.from_hdf5(IMP_FILE, event_id=[4, 8], exp_range=(0, 100))
+        """
+        if not imp_mat and event_id is not None and exp_range is not None:
+            raise ValueError('The impact matrix is needed to select events and '
+                             'exposures at the same time.')
+        LOGGER.info('Reading %s', file_name)
+        imp = cls()
+        with h5py.File(file_name, 'r') as hf_data:
+            for tag_name, tag_key, tag_cls in [('tag_hazard', 'haz', TagHaz),
+                                               ('tag_exposure', 'exp', Tag),
+                                               ('tag_impact_func', 'impf_set', Tag)]:
+                if tag_name in hf_data:
+                    imp.tag[tag_key] = tag_cls(
+                        *map(u_hdf5.to_string, hf_data.get(tag_name)[:].tolist()))
+            imp.unit = u_hdf5.to_string(hf_data.get('unit')[()])
+            imp.crs = u_coord.to_crs_user_input(u_hdf5.to_string(hf_data.get('crs')[()]))
+            imp.aai_agg = hf_data.get('aai_agg')[()]
+            imp.tot_value = hf_data.get('tot_value')[()] if 'tot_value' in hf_data else None
+            imp.event_id = hf_data.get('event_id')[:]
+
+            sel_ev = slice(None)
+            if event_id is not None:
+                sel_ev = np.isin(imp.event_id, event_id).nonzero()[0]
+                if sel_ev.size == 0:
+                    LOGGER.warning("No event ids match the selection.")
+                imp.event_id = imp.event_id[sel_ev]
+            event_name = hf_data.get('event_name')[:]
+            name_int = hf_data.get('event_name_int')[:] if 'event_name_int' in hf_data \
+                else np.zeros(event_name.size, dtype=bool)
+            if event_name.size == hf_data.get('event_id').size:
+                event_name, name_int = event_name[sel_ev], name_int[sel_ev]
+            imp.event_name = [int(u_hdf5.to_string(name)) if is_int
+                              else u_hdf5.to_string(name)
+                              for name, is_int in zip(event_name.tolist(), name_int)]
+            for var_name in ['date', 'frequency', 'at_event']:
+                setattr(imp, var_name, hf_data.get(var_name)[:][sel_ev])
+
+            sel_exp = slice(None)
+            if exp_range is not None:
+                sel_exp = slice(*slice(*exp_range).indices(hf_data.get('eai_exp').size))
+            imp.eai_exp = hf_data.get('eai_exp')[sel_exp]
+            imp.coord_exp = hf_data.get('coord_exp')[sel_exp]
+
+            if imp_mat:
+                imp.imp_mat = cls._read_hdf5_csr(hf_data.get('imp_mat'), sel_ev, sel_exp)
+        if exp_range is not None:
+            imp.tot_value = None
+        if event_id is None and exp_range is None:
+            return imp
+
+        if imp_mat:
+            if exp_range is not None:
+                imp.at_event = imp.imp_mat.sum(axis=1).A1
+            imp.eai_exp = imp.imp_mat.multiply(imp.frequency.reshape(-1, 1)).sum(axis=0).A1
+            imp.aai_agg = imp.eai_exp.sum()
+        elif event_id is not None:
+            imp.eai_exp = np.array([])
+            imp.aai_agg = np.sum(imp.at_event * imp.frequency)
+        else:
+            imp.at_event = np.array([])
+            imp.aai_agg = imp.eai_exp.sum()
+        return imp
+
+    @staticmethod
+    def _read_hdf5_csr(hf_csr, sel_ev, sel_exp):
+        """Read selected rows and columns of a csr matrix written by
+        write_hdf5. The rows are read by consecutive runs, through their
+        range in 'indptr'.
+
+        Parameters
+        ----------
+        hf_csr : h5py.Group
+            group with the datasets 'data', 'indices' and 'indptr'
+        sel_ev : np.array or slice
+            sorted positions of the rows to read
+        sel_exp : slice
+            columns to read
+
+        Returns
+        -------
+        sparse.csr_matrix
+        """
+        num_ev, num_exp = hf_csr.attrs['shape']
+        indptr = hf_csr['indptr'][:]
+        sel_ev = np.arange(num_ev)[sel_ev]
+        runs = np.split(sel_ev, np.flatnonzero(np.diff(sel_ev) != 1) + 1)
+        mat = [sparse.csr_matrix((0, num_exp))[:, sel_exp]]
+        for run in runs:
+            if not run.size:
+                continue
+            ini, end = indptr[run[0]], indptr[run[-1] + 1]
+            mat.append(sparse.csr_matrix((hf_csr['data'][ini:end],
+                                          hf_csr['indices'][ini:end],
+                                          indptr[run[0]:run[-1] + 2] - ini),
+                                         shape=(run.size, num_exp))[:, sel_exp])
+        return sparse.vstack(mat, format='csr')
+
     def read_csv(self, *args, **kwargs):
         """This function is deprecated, use Impact.from_csv instead."""
         LOGGER.warning("The use of Impact.read_csv is deprecated."
@@ -889,9 +1580,15 @@ class Impact():
         imp_list = []
         exp_list = []
         imp_arr = np.zeros(len(exp.gdf))
+        imp_hazs = None
+        if haz_list and Impact._common_centroids(haz_list):
+            imp_hazs = Impact.calc_hazards(exp, impf_set, haz_list)
         for i_time, _ in enumerate(haz_list):
-            imp_tmp = Impact()
-            imp_tmp.calc(exp, impf_set, haz_list[i_time])
+            if imp_hazs is not None:
+                imp_tmp = imp_hazs[i_time]
+            else:
+                imp_tmp = Impact()
+                imp_tmp.calc(exp, impf_set, haz_list[i_time])
             imp_arr = np.maximum(imp_arr, imp_tmp.eai_exp)
             # remove not impacted exposures
             save_exp = imp_arr > imp_thresh
@@ -900,8 +1597,8 @@ class Impact():
             imp_list.append(imp_tmp)
             exp_list.append(~save_exp)
 
-        v_lim = [np.array([haz.intensity.min() for haz in haz_list]).min(),
-                 np.array([haz.intensity.max() for haz in haz_list]).max()]
+        v_lim = [np.array([haz.get_intensity().min() for haz in haz_list]).min(),
+                 np.array([haz.get_intensity().max() for haz in haz_list]).max()]
 
         if 'vmin' not in args_exp:
             args_exp['vmin'] = exp.gdf.value.values.min()
@@ -991,7 +1688,82 @@ class Impact():
                 imp_sort[:, cen_idx], freq_sort[:, cen_idx],
                 0, return_periods)
 
-    def _exp_impact(self, exp_iimp, exposures, hazard, imp_fun, insure_flag):
+    def _exp_impact_threads(self, exp_iimp, exp_fun, exp_chunks, exposures, hazard, imp_funs,
+                            insure_flag, n_workers, haz_cache=None, grp_acc=None,
+                            ev_bounds=None, haz_csc=None, value=None, frequency=None):
+        """Compute the impact of the exposure chunks in a pool of threads.
+
+        Every chunk is accumulated in its own Impact, and these are added to
+        self in the order of the chunks, so that the result does not differ
+        from the serial computation. A single chunk is split instead in the
+        evaluation of the impact functions.
+
+        Parameters
+        ----------
+        exp_iimp : np.array
+            exposures indexes, sorted by impact function
+        exp_fun : np.array
+            position in imp_funs of the impact function of each exposure
+        exp_chunks : list(slice)
+            chunks of exp_iimp and exp_fun
+        exposures: climada.entity.Exposures instance
+        hazard : climada.Hazard
+        imp_funs : list(climada.entity.ImpactFunc)
+            impact functions of the hazard type
+        insure_flag : bool
+            consider deductible and cover of exposures
+        n_workers : int
+            number of threads
+        haz_cache : dict, optional
+            cache of hazard columns, see _exp_impact
+        grp_acc : list, optional
+            accumulator of the impact per group, see _calc
+        ev_bounds : np.array, optional
+            events of each stacked hazard, see _calc
+        haz_csc : tuple(sparse.csc_matrix, sparse.csc_matrix), optional
+            intensity and fraction of the hazard, see _haz_csc
+        value : np.array, optional
+            exposure values, see _calc
+        frequency : np.array, optional
+            event frequencies, see _calc
+        """
+        if len(exp_chunks) < 2:
+            for chk in exp_chunks:
+                self._exp_impact(exp_iimp[chk], exposures, hazard, imp_funs, insure_flag,
+                                 exp_fun[chk], n_workers, haz_cache, grp_acc, ev_bounds,
+                                 haz_csc, value, frequency)
+            return
+
+        def chunk_impact(chk):
+            imp_chk = Impact()
+            imp_chk.at_event = np.zeros(self.at_event.shape)
+            imp_chk.eai_exp = np.zeros(self.eai_exp.shape)
+            if isinstance(self.imp_mat, tuple):
+                imp_chk.imp_mat = ([], ([], []))
+            grp_chk = None
+            if grp_acc is not None:
+                grp_chk = [grp_acc[0], sparse.csr_matrix(grp_acc[1].shape)]
+            imp_chk._exp_impact(exp_iimp[chk], exposures, hazard, imp_funs, insure_flag,
+                                exp_fun[chk], haz_cache=haz_cache, grp_acc=grp_chk,
+                                ev_bounds=ev_bounds, haz_csc=haz_csc, value=value,
+                                frequency=frequency)
+            return imp_chk, grp_chk
+
+        with ThreadPoolExecutor(n_workers) as executor:
+            for imp_chk, grp_chk in executor.map(chunk_impact, exp_chunks):
+                if grp_acc is not None:
+                    grp_acc[1] = grp_acc[1] + grp_chk[1]
+                self.at_event += imp_chk.at_event
+                self.eai_exp += imp_chk.eai_exp
+                self.tot_value += imp_chk.tot_value
+                if isinstance(self.imp_mat, tuple):
+                    self.imp_mat[0].extend(imp_chk.imp_mat[0])
+                    self.imp_mat[1][0].extend(imp_chk.imp_mat[1][0])
+                    self.imp_mat[1][1].extend(imp_chk.imp_mat[1][1])
+
+    def _exp_impact(self, exp_iimp, exposures, hazard, imp_fun, insure_flag, exp_fun=None,
+                    n_workers=None, haz_cache=None, grp_acc=None, ev_bounds=None,
+                    haz_csc=None, value=None, frequency=None):
         """Compute impact for inpute exposure indexes and impact function.
 
         Parameters
@@ -999,44 +1771,428 @@ class Impact():
         exp_iimp : np.array exposures indexes
         exposures: climada.entity.Exposures instance
         hazard : climada.Hazard
-        imp_fun : climada.entity.ImpactFunc
-            impact function instance
+        imp_fun : climada.entity.ImpactFunc or list(climada.entity.ImpactFunc)
+            impact function instance, or list of impact functions if exp_fun is given
         insure_flag : bool
             consider deductible and cover of exposures
+        exp_fun : np.array, optional
+            position in imp_fun of the impact function of each exposure in
+            exp_iimp, sorted in ascending order. Default: all exposures use the
+            single impact function imp_fun.
+        n_workers : int, optional
+            number of threads evaluating the impact functions. Default: None
+        haz_cache : dict, optional
+            intensity and fraction columns (csc) of the hazard, indexed by the
+            assigned centroids of a chunk, see _haz_columns. Columns not found
+            are added. Default: None
+        grp_acc : list, optional
+            accumulator of the impact per group, see _calc. Default: None
+        ev_bounds : np.array, optional
+            events of each stacked hazard, see _calc. Default: None
+        haz_csc : tuple(sparse.csc_matrix, sparse.csc_matrix), optional
+            intensity and fraction of the hazard, see _haz_csc.
+            Default: None (taken from hazard)
+        value : np.array, optional
+            exposure values. Default: None (exposures.gdf.value)
+        frequency : np.array, optional
+            event frequencies. Default: None (hazard.frequency)
         """
         if not exp_iimp.size:
             return
+        if exp_fun is None:
+            imp_fun, exp_fun = [imp_fun], np.zeros(exp_iimp.size, int)
+        if haz_csc is None:
+            haz_csc = self._haz_csc(hazard)
+        if value is None:
+            value = exposures.gdf.value.values
+        if frequency is None:
+            frequency = hazard.frequency
 
         # get assigned centroids
         icens = exposures.gdf[INDICATOR_CENTR + hazard.tag.haz_type].values[exp_iimp]
 
-        # get affected intensities
-        inten_val = hazard.intensity[:, icens]
-        # get affected fractions
-        fract = hazard.fraction[:, icens]
-        # impact = fraction * mdr * value
-        inten_val.data = imp_fun.calc_mdr(inten_val.data)
-        impact = fract.multiply(inten_val).multiply(exposures.gdf.value.values[exp_iimp])
-
-        if insure_flag and impact.nonzero()[0].size:
-            inten_val = hazard.intensity[:, icens].toarray()
-            paa = np.interp(inten_val, imp_fun.intensity, imp_fun.paa)
-            impact = impact.toarray()
-            impact -= exposures.gdf.deductible.values[exp_iimp] * paa
-            impact = np.clip(impact, 0, exposures.gdf.cover.values[exp_iimp])
-            self.eai_exp[exp_iimp] += np.einsum('ji,j->i', impact, hazard.frequency)
-            impact = sparse.coo_matrix(impact)
-        else:
+        only_metrics = not isinstance(self.imp_mat, tuple) and grp_acc is None \
+            and all(type(fun).calc_mdr is ImpactFunc.calc_mdr for fun in imp_fun)
+        if only_metrics and haz_cache is None:
+            # only the metrics are needed: accumulate them directly from the
+            # hazard columns, without sparse matrices of the chunk
+            self._exp_metrics(exp_iimp, icens, exposures, hazard, imp_fun, insure_flag,
+                              exp_fun, ev_bounds, haz_csc, value, frequency)
+            return
+
+        # get affected intensities and fractions (column slicing of the cached CSC matrices)
+        inten_csc, fract = self._haz_columns(haz_csc, icens, haz_cache)
+        if only_metrics:
+            # the columns are in the order of the exposures
+            self._exp_metrics(exp_iimp, np.arange(icens.size), exposures, hazard, imp_fun,
+                              insure_flag, exp_fun, ev_bounds, (inten_csc, fract), value,
+                              frequency)
+            return
+        # impact = fraction * mdr * value, with fraction 1 if implicit
+        inten_data = inten_csc.data
+        if hazard.intensity_quantization is not None:
+            inten_data = u_dtype.dequantize(inten_data, *hazard.intensity_quantization)
+        inten_fun = np.repeat(exp_fun, np.diff(inten_csc.indptr))
+        inten_val = sparse.csc_matrix((self._impf_values(
+            inten_data, inten_fun, imp_fun,
+            lambda fun, inten: fun.calc_mdr(inten), n_workers),
+                                       inten_csc.indices, inten_csc.indptr),
+                                      shape=inten_csc.shape)
+        if fract is not None:
+            inten_val = fract.multiply(inten_val)
+        impact = inten_val.multiply(value[exp_iimp])
+
+        if insure_flag and impact.nnz:
+            # impact = min(max(impact - deductible * paa, 0), cover), applied to
+            # the nonzero intensities only: zero intensity has zero impact
+            paa = sparse.csc_matrix((self._impf_values(
+                inten_data, inten_fun, imp_fun,
+                lambda fun, inten: np.interp(inten, fun.intensity, fun.paa), n_workers),
+                                     inten_csc.indices, inten_csc.indptr),
+                                    shape=inten_csc.shape)
+            impact = sparse.csc_matrix(
+                impact - paa.multiply(exposures.gdf.deductible.values[exp_iimp]))
+            impact.data = np.clip(impact.data, 0, np.repeat(
+                exposures.gdf.cover.values[exp_iimp], np.diff(impact.indptr)))
+            impact.eliminate_zeros()
+
+        if ev_bounds is None:
             self.eai_exp[exp_iimp] += np.squeeze(np.asarray(np.sum(
-                impact.multiply(hazard.frequency.reshape(-1, 1)), axis=0)))
+                impact.multiply(frequency.reshape(-1, 1)), axis=0)))
+        else:
+            imp_freq = sparse.csr_matrix(impact.multiply(frequency.reshape(-1, 1)))
+            for i_haz, (ini, end) in enumerate(zip(ev_bounds[:-1], ev_bounds[1:])):
+                self.eai_exp[i_haz, exp_iimp] += np.squeeze(np.asarray(np.sum(
+                    imp_freq[ini:end], axis=0)))
 
         self.at_event += np.squeeze(np.asarray(np.sum(impact, axis=1)))
-        self.tot_value += np.sum(exposures.gdf.value.values[exp_iimp])
+        self.tot_value += np.sum(value[exp_iimp])
+        if grp_acc is not None:
+            grp_acc[1] = grp_acc[1] + sparse.csr_matrix(impact @ grp_acc[0][exp_iimp])
         if isinstance(self.imp_mat, tuple):
-            row_ind, col_ind = impact.nonzero()
-            self.imp_mat[0].extend(list(impact.data))
-            self.imp_mat[1][0].extend(list(row_ind))
-            self.imp_mat[1][1].extend(list(exp_iimp[col_ind]))
+            impact = sparse.coo_matrix(impact)
+            nz_pos = impact.data != 0
+            idx_dtype = self._imp_mat_index_dtype(impact.shape[0], exposures.gdf.shape[0])
+            self.imp_mat[0].append(impact.data[nz_pos])
+            self.imp_mat[1][0].append(impact.row[nz_pos].astype(idx_dtype, copy=False))
+            self.imp_mat[1][1].append(exp_iimp[impact.col[nz_pos]].astype(idx_dtype, copy=False))
+
+    def _exp_metrics(self, exp_iimp, icens, exposures, hazard, imp_funs, insure_flag,
+                     exp_fun, ev_bounds=None, haz_cols=None, value=None, frequency=None):
+        """Add the impact metrics of exposures to at_event, eai_exp and
+        tot_value with _exp_metrics_kernel, see _exp_impact.
+
+        Parameters
+        ----------
+        exp_iimp : np.array
+            exposures indexes
+        icens : np.array
+            assigned centroids of the exposures, or columns of haz_cols
+        exposures: climada.entity.Exposures instance
+        hazard : climada.Hazard
+        imp_funs : list(climada.entity.ImpactFunc)
+            impact functions, evaluated as ImpactFunc.calc_mdr
+        insure_flag : bool
+            consider deductible and cover of exposures
+        exp_fun : np.array
+            position in imp_funs of the impact function of each exposure
+        ev_bounds : np.array, optional
+            events of each stacked hazard, see _calc. Default: None
+        haz_cols : tuple(sparse.csc_matrix, sparse.csc_matrix), optional
+            intensity and fraction columns of the hazard to use instead of its
+            matrices, see _haz_csc and _haz_columns. Default: None
+        value : np.array, optional
+            exposure values. Default: None (exposures.gdf.value)
+        frequency : np.array, optional
+            event frequencies. Default: None (hazard.frequency)
+        """
+        fun_ptr = np.cumsum([0] + [fun.intensity.size for fun in imp_funs])
+        if haz_cols is None:
+            haz_cols = self._haz_csc(hazard)
+        if value is None:
+            value = exposures.gdf.value.values
+        if frequency is None:
+            frequency = hazard.frequency
+        inten_csc, fract_csc = haz_cols
+        fract_implicit = fract_csc is None
+        if fract_implicit:
+            # an implicit fraction is not read by the kernel
+            fract_csc = inten_csc
+        values = value[exp_iimp]
+        if insure_flag:
+            deductible = exposures.gdf.deductible.values[exp_iimp].astype(float)
+            cover = exposures.gdf.cover.values[exp_iimp].astype(float)
+        else:
+            deductible = cover = np.zeros(0)
+        at_event = np.zeros(self.at_event.size)
+        if ev_bounds is None:
+            ev_haz = np.zeros(self.at_event.size, int)
+            eai_exp = np.zeros((1, exp_iimp.size))
+        else:
+            ev_haz = np.repeat(np.arange(len(ev_bounds) - 1), np.diff(ev_bounds))
+            eai_exp = np.zeros((len(ev_bounds) - 1, exp_iimp.size))
+        inten_scale, inten_offset = hazard.intensity_quantization or (1., 0.)
+        # quantized intensities are decoded with the data type of u_dtype.dequantize
+        inten_single = hazard.intensity_quantization is not None \
+            and u_dtype.float_dtype() == np.float32
+        _exp_metrics_kernel(
+            inten_csc.indptr, inten_csc.indices, inten_csc.data, inten_scale, inten_offset,
+            inten_single, fract_csc.indptr, fract_csc.indices, fract_csc.data, fract_implicit,
+            icens, exp_fun, fun_ptr,
+            np.concatenate([fun.intensity for fun in imp_funs]).astype(float),
+            np.concatenate([fun.mdd for fun in imp_funs]).astype(float),
+            np.concatenate([fun.paa for fun in imp_funs]).astype(float),
+            values.astype(float), deductible, cover, insure_flag,
+            np.asarray(frequency, dtype=float), ev_haz, at_event, eai_exp)
+        if ev_bounds is None:
+            self.eai_exp[exp_iimp] += eai_exp[0]
+        else:
+            self.eai_exp[:, exp_iimp] += eai_exp
+        self.at_event += at_event
+        self.tot_value += np.sum(values)
+
+    @staticmethod
+    def _haz_csc(hazard):
+        """Intensity and fraction of the hazard in compressed sparse column
+        format, see Hazard.intensity_csc.
+
+        Parameters
+        ----------
+        hazard : climada.Hazard
+
+        Returns
+        -------
+        inten_csc : sparse.csc_matrix
+            intensity
+        fract_csc : sparse.csc_matrix or None
+            fraction, None if the fraction is implicit
+        """
+        return (hazard.intensity_csc,
+                None if hazard.implicit_fraction else hazard.fraction_csc)
+
+    @staticmethod
+    def _haz_columns(haz_csc, icens, haz_cache=None, max_size=None):
+        """Intensity and fraction columns (csc) of the hazard at the given
+        centroids, taken from and added to a cache.
+
+        The cache is bounded: once its columns contain more than max_size
+        nonzeros, the oldest entries are dropped. The columns of this call
+        are always kept. The cache is read and updated under a lock, so that
+        it can be shared by threads; the columns are sliced outside of it.
+
+        Parameters
+        ----------
+        haz_csc : tuple(sparse.csc_matrix, sparse.csc_matrix)
+            intensity and fraction of the hazard, see _haz_csc
+        icens : np.array
+            centroids of the columns
+        haz_cache : dict, optional
+            columns of previous calls with the same hazard, indexed by the
+            centroids. Default: None
+        max_size : int, optional
+            maximum number of nonzero intensities in the cache.
+            Default: CONFIG.max_matrix_size
+
+        Returns
+        -------
+        inten_csc : sparse.csc_matrix
+            intensity columns
+        fract : sparse.csc_matrix or None
+            fraction columns, None if the fraction is implicit
+        """
+        haz_key = (icens.dtype.str, icens.tobytes())
+        if haz_cache is not None:
+            with _HAZ_CACHE_LOCK:
+                haz_cols = haz_cache.get(haz_key)
+            if haz_cols is not None:
+                return haz_cols
+        inten_csc = haz_csc[0][:, icens]
+        fract = None if haz_csc[1] is None else haz_csc[1][:, icens]
+        if haz_cache is None:
+            return inten_csc, fract
+        if max_size is None:
+            max_size = CONFIG.max_matrix_size.int()
+        with _HAZ_CACHE_LOCK:
+            haz_cache[haz_key] = (inten_csc, fract)
+            cache_size = sum(cols[0].nnz for cols in haz_cache.values())
+            for key in list(haz_cache):
+                if cache_size <= max_size:
+                    break
+                if key == haz_key:
+                    continue
+                cache_size -= haz_cache.pop(key)[0].nnz
+        return inten_csc, fract
+
+    @staticmethod
+    def _exp_impf_sorted(exposures, hazard, exp_idx, haz_imp):
+        """Exposures with an impact function of the hazard type, sorted by
+        impact function.
+
+        Parameters
+        ----------
+        exposures : climada.entity.Exposures
+        hazard : climada.Hazard
+        exp_idx : np.array
+            exposures indexes
+        haz_imp : list(climada.entity.ImpactFunc)
+            impact functions of the hazard type
+
+        Returns
+        -------
+        exp_iimp : np.array
+            exposures indexes of exp_idx with an impact function, sorted by
+            impact function
+        exp_fun : np.array
+            position in haz_imp of the impact function of each exposure
+        """
+        impf_haz = exposures.get_impf_column(hazard.tag.haz_type)
+        exp_fun = Impact._impf_position(exposures.gdf[impf_haz].values[exp_idx], haz_imp)
+        exp_sort = np.argsort(exp_fun, kind='stable')
+        exp_sort = exp_sort[exp_fun[exp_sort] >= 0]
+        return exp_idx[exp_sort], exp_fun[exp_sort]
+
+    @staticmethod
+    def _exp_chunks(exp_nnz, max_size):
+        """Split exposures in consecutive chunks, such that the hazard columns
+        of the exposures of a chunk contain at most max_size nonzeros. A chunk
+        contains at least one exposure.
+
+        Parameters
+        ----------
+        exp_nnz : np.array
+            number of nonzero hazard values of each exposure
+        max_size : int
+            maximum number of nonzero hazard values per chunk
+
+        Returns
+        -------
+        list(slice)
+        """
+        cum_nnz = np.cumsum(exp_nnz)
+        exp_chunks, ini = [], 0
+        while ini < exp_nnz.size:
+            end = np.searchsorted(cum_nnz, cum_nnz[ini] - exp_nnz[ini] + max_size,
+                                  side='right')
+            end = max(end, ini + 1)
+            exp_chunks.append(slice(ini, end))
+            ini = end
+        return exp_chunks
+
+    @staticmethod
+    def _imp_mat_index_dtype(num_events, num_exp):
+        """Smallest integer type for the row and column indices of an impact
+        matrix of shape num_events x num_exp."""
+        if max(num_events, num_exp) <= np.iinfo(np.int32).max:
+            return np.int32
+        return np.int64
+
+    @classmethod
+    def _stitch_imp_mat(cls, imp_mat_chunks, shape, dtype=None):
+        """Build the sparse impact matrix from the nonzeros computed per chunk
+        of exposures.
+
+        Every chunk array is concatenated once into a preallocated array, and
+        the chunk arrays are released as soon as they have been copied, so that
+        the peak memory stays close to the size of the final matrix.
+
+        Parameters
+        ----------
+        imp_mat_chunks : tuple(list(np.array), tuple(list(np.array), list(np.array)))
+            (data, (row_ind, col_ind)) with one array per chunk. The lists are
+            emptied.
+        shape : tuple(int, int)
+            number of events, number of exposures
+        dtype : np.dtype, optional
+            data type of the impact matrix. Default: data type of the chunks
+
+        Returns
+        -------
+        sparse.csr_matrix
+        """
+        data, (row_ind, col_ind) = imp_mat_chunks
+        idx_dtype = cls._imp_mat_index_dtype(*shape)
+        if dtype is None:
+            dtype = data[0].dtype if data else float
+
+        def concat(chunks, arr_dtype):
+            """Copy the chunks into one array and release them"""
+            arr = np.empty(sum(chunk.size for chunk in chunks), dtype=arr_dtype)
+            pos = 0
+            while chunks:
+                chunk = chunks.pop(0)
+                arr[pos:pos + chunk.size] = chunk
+                pos += chunk.size
+            return arr
+
+        imp_mat = sparse.coo_matrix(
+            (concat(data, dtype), (concat(row_ind, idx_dtype), concat(col_ind, idx_dtype))),
+            shape=shape)
+        return imp_mat.tocsr()
+
+    @staticmethod
+    def _impf_position(exp_impf, imp_funs):
+        """Position of the impact function of each exposure in a list of
+        impact functions.
+
+        Parameters
+        ----------
+        exp_impf : np.array
+            impact function id of each exposure
+        imp_funs : list(climada.entity.ImpactFunc)
+            impact functions
+
+        Returns
+        -------
+        np.array
+            position in imp_funs of the impact function of each exposure,
+            -1 if no impact function matches its id
+        """
+        return pd.Index([imp_fun.id for imp_fun in imp_funs]).get_indexer(exp_impf)
+
+    @staticmethod
+    def _impf_values(inten, inten_fun, imp_funs, impf_eval, n_workers=None):
+        """Evaluate several impact functions in one pass over an array of
+        intensities.
+
+        Parameters
+        ----------
+        inten : np.array
+            intensity values, e.g. the data of a sparse intensity matrix
+        inten_fun : np.array
+            position in imp_funs of the impact function to apply to each value
+        imp_funs : list(climada.entity.ImpactFunc)
+            impact functions
+        impf_eval : function
+            evaluation of an impact function at given intensities,
+            e.g. ``lambda fun, inten: fun.calc_mdr(inten)``
+        n_workers : int, optional
+            number of threads, each evaluating a contiguous piece of the values.
+            Default: None (serial)
+
+        Returns
+        -------
+        np.array
+        """
+        if not inten.size:
+            return np.zeros(inten.shape)
+        if n_workers is not None and 1 < n_workers < inten.size:
+            bounds = np.linspace(0, inten.size, n_workers + 1).astype(int)
+            with ThreadPoolExecutor(n_workers) as executor:
+                return np.concatenate(list(executor.map(
+                    lambda ini, end: Impact._impf_values(
+                        inten[ini:end], inten_fun[ini:end], imp_funs, impf_eval),
+                    bounds[:-1], bounds[1:])))
+        fun_min, fun_max = inten_fun.min(), inten_fun.max()
+        if fun_min == fun_max:
+            return impf_eval(imp_funs[fun_min], inten)
+        # group the values by impact function, each group is evaluated at once
+        val_sort = np.argsort(inten_fun, kind='stable')
+        fun_bounds = np.searchsorted(inten_fun[val_sort], np.arange(fun_min, fun_max + 2))
+        values = np.zeros(inten.shape)
+        for i_fun, (ini, end) in enumerate(zip(fun_bounds[:-1], fun_bounds[1:]), fun_min):
+            if ini < end:
+                values[val_sort[ini:end]] = impf_eval(imp_funs[i_fun], inten[val_sort[ini:end]])
+        return values
 
     def _build_exp(self):
         return Exposures(
@@ -1178,7 +2334,9 @@ class Impact():
                            "method.")
             return None
 
-        imp = copy.deepcopy(self)
+        # the impact matrix is sliced below: avoid copying it, which would
+        # also read a memory-mapped matrix completely
+        imp = copy.deepcopy(self, {id(self.imp_mat): self.imp_mat})
 
         # apply event selection to impact attributes
         sel_ev = self._selected_events_idx(event_ids, event_names, dates, nb_events)
@@ -1223,9 +2381,86 @@ class Impact():
         # .A1 reduce 1d matrix to 1d array
         imp.eai_exp = imp.imp_mat.multiply(freq_mat).sum(axis=0).A1
         imp.aai_agg = imp.eai_exp.sum()
+        if imp.imp_mat is self.imp_mat:
+            imp.imp_mat = self.imp_mat.copy()
 
         return imp
 
+    @classmethod
+    def concat_exposures(cls, imp_list):
+        """Concatenate impacts of the same events on different exposures, e.g.
+        computed on partitions of the exposures.
+
+        The impacts per event, the aggregated impacts and the total values are
+        summed, the exposure coordinates, the impacts per exposure and the
+        impact matrices are concatenated in the order of imp_list. The other
+        attributes are copied from the first impact. The result can be used
+        with Impact.select like an impact computed on all the exposures.
+
+        Parameters
+        ----------
+        imp_list : list of climada.engine.Impact
+            impacts of the same events and frequencies
+
+        Returns
+        -------
+        imp : climada.engine.Impact
+            impact on all the exposures. It has no impact matrix if one of the
+            impacts has none.
+
+        Raises
+        ------
+        ValueError
+            if the impacts do not share events, frequencies, unit and crs
+
+        Examples
+        --------
+            >>> imp_tiles = []
+            >>> for exp_tile in exp_tiles:
+            ...     imp_tiles.append(Impact())
+            ...     imp_tiles[-1].calc(exp_tile, impf_set, haz, save_mat=True)
+            >>> imp = Impact.concat_exposures(imp_tiles)
+        """
+        if len(imp_list) == 0:
+            return cls()
+        imp_first = imp_list[0]
+        for imp in imp_list[1:]:
+            if not np.array_equal(imp.event_id, imp_first.event_id):
+                raise ValueError('The impacts have different event ids.')
+            if not np.array_equal(imp.frequency, imp_first.frequency):
+                raise ValueError('The impacts have different frequencies.')
+            if imp.unit != imp_first.unit:
+                raise ValueError('The impacts have different units: %s != %s.'
+                                 % (imp.unit, imp_first.unit))
+            if not u_coord.equal_crs(imp.crs, imp_first.crs):
+                raise ValueError('The impacts have different crs: %s != %s.'
+                                 % (imp.crs, imp_first.crs))
+
+        imp_concat = copy.copy(imp_first)
+        imp_concat.tag = copy.deepcopy(imp_first.tag)
+        imp_concat.imp_mat = sparse.csr_matrix(np.empty((0, 0)))
+        imp_concat.coord_exp = np.concatenate([np.reshape(imp.coord_exp, (-1, 2))
+                                               for imp in imp_list])
+        imp_concat.eai_exp = np.concatenate([imp.eai_exp for imp in imp_list])
+        imp_concat.at_event = np.array(imp_first.at_event, dtype=float)
+        for imp in imp_list[1:]:
+            imp_concat.at_event += imp.at_event
+            imp_concat.aai_agg += imp.aai_agg
+            if imp_concat.tot_value is not None:
+                imp_concat.tot_value = None if imp.tot_value is None \
+                    else imp_concat.tot_value + imp.tot_value
+            if 'exp' in imp_concat.tag and 'exp' in imp.tag:
+                imp_concat.tag['exp'].append(imp.tag['exp'])
+
+        if all(imp.imp_mat.shape == (imp.event_id.size, imp.eai_exp.size)
+               for imp in imp_list):
+            imp_concat.imp_mat = sparse.hstack([imp.imp_mat for imp in imp_list],
+                                               format='csr')
+        else:
+            LOGGER.warning('The impact matrix is missing in some impacts. '
+                           'The concatenated impact has no impact matrix.')
+        return imp_concat
+
     def _selected_exposures_idx(self, coord_exp):
         assigned_idx = u_coord.assign_coordinates(self.coord_exp, coord_exp, threshold=0)
         sel_exp = (assigned_idx >= 0).nonzero()[0]
@@ -1278,6 +2513,81 @@ class Impact():
 
         return sel_ev
 
+@numba.njit(nogil=True)
+def _exp_metrics_kernel(inten_indptr, inten_indices, inten_data, inten_scale, inten_offset,
+                        inten_single, fract_indptr, fract_indices, fract_data,
+                        fract_implicit, icens, exp_fun, fun_ptr, fun_inten, fun_mdd, fun_paa,
+                        values, deductible, cover, insure, frequency, ev_haz, at_event,
+                        eai_exp):
+    """Accumulate the impact of each exposure at every event in at_event and
+    eai_exp, walking once through the nonzeros of the hazard columns of the
+    exposures. The impacts are added in the same order as the row and column
+    sums of the impact matrix in Impact._exp_impact.
+
+    Parameters
+    ----------
+    inten_indptr, inten_indices, inten_data : np.array
+        intensity of the hazard, csc with sorted indices
+    inten_scale, inten_offset : float
+        decoding of the intensity values: inten_data * inten_scale + inten_offset,
+        see Hazard.quantize_intensity
+    inten_single : bool
+        round the decoded intensity values to single precision, as
+        climada.util.dtype.dequantize with float_dtype float32
+    fract_indptr, fract_indices, fract_data : np.array
+        fraction of the hazard, csc with sorted indices
+    fract_implicit : bool
+        the fraction is 1 at every stored intensity, fract_* are not read
+    icens : np.array
+        assigned centroid of each exposure
+    exp_fun : np.array
+        impact function of each exposure
+    fun_ptr : np.array
+        position of the values of each impact function in fun_inten,
+        fun_mdd and fun_paa
+    fun_inten, fun_mdd, fun_paa : np.array
+        intensity, mdd and paa of all the impact functions
+    values : np.array
+        value of each exposure
+    deductible, cover : np.array
+        deductible and cover of each exposure, if insure
+    insure : bool
+        apply deductible and cover
+    frequency : np.array
+        frequency of each event
+    ev_haz : np.array
+        row of eai_exp of each event, e.g. its hazard for stacked hazards
+    at_event : np.array
+        impact of each event, updated
+    eai_exp : np.array
+        expected annual impact of each exposure (columns), updated
+    """
+    for i_exp in range(icens.size):
+        fun_ini, fun_end = fun_ptr[exp_fun[i_exp]], fun_ptr[exp_fun[i_exp] + 1]
+        i_fract, fract_end = fract_indptr[icens[i_exp]], fract_indptr[icens[i_exp] + 1]
+        for i_inten in range(inten_indptr[icens[i_exp]], inten_indptr[icens[i_exp] + 1]):
+            # impact only where intensity and fraction are stored
+            row = inten_indices[i_inten]
+            fract = 1.
+            if not fract_implicit:
+                while i_fract < fract_end and fract_indices[i_fract] < row:
+                    i_fract += 1
+                if i_fract == fract_end:
+                    break
+                if fract_indices[i_fract] != row:
+                    continue
+                fract = fract_data[i_fract]
+            inten = inten_data[i_inten] * inten_scale + inten_offset
+            if inten_single:
+                inten = np.float64(np.float32(inten))
+            paa = np.interp(inten, fun_inten[fun_ini:fun_end], fun_paa[fun_ini:fun_end])
+            mdr = paa * np.interp(inten, fun_inten[fun_ini:fun_end], fun_mdd[fun_ini:fun_end])
+            impact = fract * mdr * values[i_exp]
+            if insure:
+                impact = min(max(impact - paa * deductible[i_exp], 0.), cover[i_exp])
+            at_event[row] += impact
+            eai_exp[ev_haz[row], i_exp] += impact * frequency[row]
+
 class ImpactFreqCurve():
     """Impact exceedence frequency curve.
 
@@ -1330,3 +2640,71 @@ class ImpactFreqCurve():
             axis.set_xlabel('Return period (year)')
             axis.plot(self.return_per, self.impact, **kwargs)
         return axis
+
+
+class ImpactGroups():
+    """Impact aggregated per group of exposures, e.g. per region or per
+    portfolio segment.
+
+    Attributes
+    ----------
+    tag : dict
+        dictionary of tags of exposures, impact functions set and
+        hazard: {'exp': Tag(), 'impf_set': Tag(), 'haz': TagHazard()}
+    group_id : np.array
+        group of each column of at_event, sorted
+    event_id : np.array
+        id (>0) of each hazard event
+    frequency : np.array
+        annual frequency of each event
+    at_event : sparse.csr_matrix
+        impact of each event (rows) in each group (columns)
+    eai : np.array
+        expected annual impact of each group
+    aai_agg : float
+        average annual impact (aggregated)
+    unit : str
+        value unit used (given by exposures unit)
+    """
+    def __init__(self):
+        self.tag = dict()
+        self.group_id = np.array([])
+        self.event_id = np.array([], int)
+        self.frequency = np.array([])
+        self.at_event = sparse.csr_matrix(np.empty((0, 0)))
+        self.eai = np.array([])
+        self.aai_agg = 0
+        self.unit = ''
+
+    def calc_freq_curve(self, return_per):
+        """Compute the impact exceedance frequency curve of each group, as
+        Impact.calc_freq_curve. The events without impact in a group exceed
+        the impact 0 in this group.
+
+        Parameters
+        ----------
+        return_per : np.array
+            return periods where to compute the exceedance impact
+
+        Returns
+        -------
+        np.array
+            exceedance impact, return periods x groups
+        """
+        return_per = np.asarray(return_per, dtype=float)
+        at_event = self.at_event.tocsc()
+        tot_freq = np.sum(self.frequency)
+        imp_curve = np.zeros((return_per.size, self.group_id.size))
+        for i_grp in range(self.group_id.size):
+            grp_imp = at_event.data[at_event.indptr[i_grp]:at_event.indptr[i_grp + 1]]
+            grp_ev = at_event.indices[at_event.indptr[i_grp]:at_event.indptr[i_grp + 1]]
+            sort_idxs = np.argsort(grp_imp)[::-1]
+            exceed_freq = np.cumsum(self.frequency[grp_ev[sort_idxs]])
+            grp_imp = grp_imp[sort_idxs]
+            if grp_ev.size < self.frequency.size:
+                exceed_freq = np.append(exceed_freq, tot_freq)
+                grp_imp = np.append(grp_imp, 0)
+            if grp_imp.size:
+                imp_curve[:, i_grp] = np.interp(return_per, 1 / exceed_freq[::-1],
+                                                grp_imp[::-1])
+        return imp_curve
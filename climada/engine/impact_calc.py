@@ -0,0 +1,113 @@
+"""
+This file is part of CLIMADA.
+
+Copyright (C) 2017 ETH Zurich, CLIMADA contributors listed in AUTHORS.
+
+CLIMADA is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free
+Software Foundation, version 3.
+
+CLIMADA is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with CLIMADA. If not, see <https://www.gnu.org/licenses/>.
+
+---
+
+Define ImpactCalculator class.
+"""
+
+__all__ = ['ImpactCalculator']
+
+import logging
+import numpy as np
+
+from climada.entity.exposures import INDICATOR_CENTR
+from climada.engine.impact import Impact
+
+LOGGER = logging.getLogger(__name__)
+
+class ImpactCalculator():
+    """Impact computation of a fixed pair of exposures and hazard for several
+    impact function sets, exposure values or event frequencies.
+
+    The exposures are assigned to the hazard centroids once, and the hazard
+    columns gathered for the exposures are kept for the following
+    computations, up to CONFIG.max_matrix_size nonzero intensities. The
+    exposures and the hazard must not be modified in place while the
+    calculator is in use.
+
+    Attributes
+    ----------
+    exposures : climada.entity.Exposures
+        exposures, with assigned centroids
+    hazard : climada.Hazard
+        hazard
+    """
+
+    def __init__(self, exposures, hazard):
+        """Assign the exposures to the hazard centroids if not done.
+
+        Parameters
+        ----------
+        exposures : climada.entity.Exposures
+        hazard : climada.Hazard
+        """
+        if INDICATOR_CENTR + hazard.tag.haz_type not in exposures.gdf:
+            exposures.assign_centroids(hazard)
+        self.exposures = exposures
+        self.hazard = hazard
+        self._haz_cache = dict()
+
+    def impact(self, impact_funcs, save_mat=False, value=None, frequency=None,
+               n_workers=None):
+        """Compute the impact, same as Impact.calc.
+
+        Parameters
+        ----------
+        impact_funcs : climada.entity.ImpactFuncSet
+            impact functions
+        save_mat : bool, optional
+            save impact matrix: events x exposures. Default: False
+        value : np.array, optional
+            exposure values used instead of exposures.gdf.value. Default: None
+        frequency : np.array, optional
+            event frequencies used instead of hazard.frequency. Default: None
+        n_workers : int, optional
+            number of threads, see Impact.calc. Default: None
+
+        Returns
+        -------
+        climada.engine.Impact
+
+        Raises
+        ------
+        ValueError
+
+        Examples
+        --------
+            >>> imp_calc = ImpactCalculator(exp, haz)
+            >>> aai_aggs = [imp_calc.impact(impf_set).aai_agg for impf_set in impf_sets]
+        """
+        exposures, hazard = self.exposures, self.hazard
+        if value is not None:
+            if np.size(value) != exposures.gdf.shape[0]:
+                raise ValueError('Wrong number of values: %s != %s.' %
+                                 (np.size(value), exposures.gdf.shape[0]))
+            value = np.asarray(value).ravel()
+        if frequency is not None:
+            if np.size(frequency) != hazard.size:
+                raise ValueError('Wrong number of frequencies: %s != %s.' %
+                                 (np.size(frequency), hazard.size))
+            frequency = np.asarray(frequency, dtype=float).ravel()
+        imp = Impact()
+        # pylint: disable=protected-access
+        imp._calc(exposures, impact_funcs, hazard, save_mat, n_workers, self._haz_cache,
+                  value=value, frequency=frequency)
+        return imp
+
+    def clear(self):
+        """Free the hazard columns kept from previous computations."""
+        self._haz_cache = dict()
@@ -78,6 +78,9 @@ class TestCalc(unittest.TestCase):
         self.assertIsInstance(forecast.hazard[0], StormEurope)
         self.assertIsInstance(forecast.exposure, Exposures)
         self.assertIsInstance(forecast.vulnerability, ImpactFuncSet)
+        forecast.hazard = []
+        with self.assertRaises(ValueError):
+            forecast.calc()
 
     def test_Forecast_init_raise(self):
         """Test calc and propety functions from the Forecast class"""
@@ -98,6 +101,8 @@ class TestCalc(unittest.TestCase):
         #create and calculate Forecast
         with self.assertRaises(ValueError):
             Forecast({dt.datetime(2018,1,1): storms}, expo, impact_function_set)
+        with self.assertRaises(ValueError):
+            Forecast({}, expo, impact_function_set)
 
 
 class TestPlot(unittest.TestCase):
@@ -19,18 +19,23 @@ with CLIMADA. If not, see <https://www.gnu.org/licenses/>.
 Test Impact class.
 """
 import unittest
+import copy
+import tempfile
 from pathlib import Path
+import h5py
 import numpy as np
 from scipy import sparse
 
+from climada import CONFIG
 from climada.entity.tag import Tag
 from climada.hazard.tag import Tag as TagHaz
 from climada.entity.entity_def import Entity
 from climada.hazard.base import Hazard
-from climada.engine.impact import Impact
+from climada.engine.impact import Impact, ImpactGroups
 from climada.util.constants import ENT_DEMO_TODAY, DEF_CRS, DEMO_DIR
 from climada.util.api_client import Client
 import climada.util.coordinates as u_coord
+import climada.util.dates_times as u_dt
 import climada.engine.test as engine_test
 
 
@@ -157,7 +162,7 @@ class TestOneExposure(unittest.TestCase):
         events_pos = hazard.intensity[:, ent.exposures.gdf.centr_TC[iexp]].nonzero()[0]
         res_exp = np.zeros((ent.exposures.gdf.shape[0]))
         res_exp[iexp] = np.sum(impact.at_event[events_pos] * hazard.frequency[events_pos])
-        np.testing.assert_array_equal(res_exp, impact.eai_exp)
+        np.testing.assert_allclose(res_exp, impact.eai_exp, rtol=1e-15)
 
         self.assertEqual(0, impact.at_event[12])
         # Check first 3 values
@@ -180,6 +185,20 @@ class TestOneExposure(unittest.TestCase):
 class TestCalc(unittest.TestCase):
     """Test impact calc method."""
 
+    @staticmethod
+    def _ent_haz_two_impf():
+        """Demo entity with assigned centroids of the test hazard and a second
+        TC impact function of id 2, not used by any exposure yet"""
+        ent = Entity.from_excel(ENT_DEMO_TODAY)
+        ent.check()
+        hazard = Hazard.from_mat(HAZ_TEST_MAT)
+        ent.exposures.assign_centroids(hazard)
+        imp_fun = copy.deepcopy(ent.impact_funcs.get_func('TC', 1))
+        imp_fun.id = 2
+        imp_fun.mdd = np.sqrt(imp_fun.mdd)
+        ent.impact_funcs.append(imp_fun)
+        return ent, hazard
+
     def test_ref_value_pass(self):
         """Test result against reference value"""
         # Read default entity values
@@ -248,6 +267,55 @@ class TestCalc(unittest.TestCase):
             np.sum(impact.imp_mat.toarray() * impact.frequency[:, None], axis=0).reshape(-1),
             impact.eai_exp)
 
+    def test_exp_chunks_pass(self):
+        """Test splitting exposures by number of nonzero hazard values"""
+        exp_chunks = Impact._exp_chunks(np.array([3, 4, 0, 2, 9, 1]), 7)
+        self.assertEqual(exp_chunks, [slice(0, 3), slice(3, 4), slice(4, 5), slice(5, 6)])
+        self.assertEqual(Impact._exp_chunks(np.array([], int), 7), [])
+
+    def test_calc_insure_sparse_pass(self):
+        """Deductible and cover applied to the nonzeros equal the dense computation"""
+        ent = Entity.from_excel(ENT_DEMO_TODAY)
+        ent.check()
+        hazard = Hazard.from_mat(HAZ_TEST_MAT)
+        ent.exposures.assign_centroids(hazard)
+        ent.exposures.gdf['deductible'] = ent.exposures.gdf.value * 1e-3
+        ent.exposures.gdf['cover'] = ent.exposures.gdf.value * 0.05
+        ent.exposures.gdf.cover.values[::7] = 0
+        impact = Impact()
+        impact.calc(ent.exposures, ent.impact_funcs, hazard, save_mat=True)
+
+        exp_gdf = ent.exposures.gdf
+        imp_fun = ent.impact_funcs.get_func('TC', 1)
+        inten = hazard.intensity[:, exp_gdf.centr_TC.values].toarray()
+        imp_ref = hazard.fraction[:, exp_gdf.centr_TC.values].toarray() \
+            * imp_fun.calc_mdr(inten) * exp_gdf.value.values
+        imp_ref -= exp_gdf.deductible.values * np.interp(inten, imp_fun.intensity, imp_fun.paa)
+        imp_ref = np.clip(imp_ref, 0, exp_gdf.cover.values)
+
+        self.assertEqual(impact.imp_mat.nnz, np.count_nonzero(imp_ref))
+        np.testing.assert_array_equal(impact.imp_mat.toarray(), imp_ref)
+        np.testing.assert_allclose(impact.at_event, imp_ref.sum(axis=1), rtol=1e-12)
+        np.testing.assert_allclose(impact.eai_exp, imp_ref.T @ hazard.frequency, rtol=1e-12)
+
+    def test_stitch_imp_mat_pass(self):
+        """Test building the impact matrix from chunks of nonzeros"""
+        chunks = ([np.array([1., 2.]), np.array([3.])],
+                  ([np.array([0, 2]), np.array([1])], [np.array([1, 3]), np.array([0])]))
+        imp_mat = Impact._stitch_imp_mat(chunks, (3, 4))
+        self.assertIsInstance(imp_mat, sparse.csr_matrix)
+        np.testing.assert_array_equal(imp_mat.toarray(), [[0, 1, 0, 0],
+                                                          [3, 0, 0, 0],
+                                                          [0, 0, 0, 2]])
+        self.assertEqual(imp_mat.indices.dtype, np.int32)
+        self.assertEqual(imp_mat.dtype, np.float64)
+        self.assertEqual(chunks, ([], ([], [])))
+
+        imp_mat = Impact._stitch_imp_mat(([], ([], [])), (3, 4), dtype=np.float32)
+        self.assertEqual(imp_mat.shape, (3, 4))
+        self.assertEqual(imp_mat.nnz, 0)
+        self.assertEqual(imp_mat.dtype, np.float32)
+
     def test_calc_impf_pass(self):
         """Execute when no impf_HAZ present, but only impf_"""
         ent = Entity.from_excel(ENT_DEMO_TODAY)
@@ -287,6 +355,361 @@ class TestCalc(unittest.TestCase):
         self.assertAlmostEqual(6.512201157564421e+09, impact.aai_agg, 5)
         self.assertAlmostEqual(6.512201157564421e+09, impact.aai_agg, 5)
 
+    def test_calc_several_impf_pass(self):
+        """Single pass over several impact functions equals one pass per function"""
+        ent, hazard = self._ent_haz_two_impf()
+        # second impact function used by every other exposure
+        ent.exposures.gdf.impf_TC.values[::2] = 2
+
+        impact = Impact()
+        impact.calc(ent.exposures, ent.impact_funcs, hazard, save_mat=True)
+
+        imp_ref = Impact()
+        imp_ref.at_event = np.zeros(hazard.size)
+        imp_ref.eai_exp = np.zeros(ent.exposures.gdf.shape[0])
+        imp_ref.imp_mat = ([], ([], []))
+        for fun in ent.impact_funcs.get_func('TC'):
+            exp_iimp = np.where(ent.exposures.gdf.impf_TC.values == fun.id)[0]
+            imp_ref._exp_impact(exp_iimp, ent.exposures, hazard, fun, True)
+        imp_ref.imp_mat = Impact._stitch_imp_mat(imp_ref.imp_mat, impact.imp_mat.shape)
+
+        np.testing.assert_allclose(impact.at_event, imp_ref.at_event, rtol=1e-14)
+        np.testing.assert_allclose(impact.eai_exp, imp_ref.eai_exp, rtol=1e-14)
+        np.testing.assert_array_equal(impact.imp_mat.toarray(), imp_ref.imp_mat.toarray())
+        self.assertEqual(impact.tot_value, imp_ref.tot_value)
+        np.testing.assert_allclose(impact.aai_agg, sum(imp_ref.at_event * hazard.frequency),
+                                   rtol=1e-14)
+
+    def test_calc_threads_pass(self):
+        """Thread-parallel calc is identical to the serial calc"""
+        ent, hazard = self._ent_haz_two_impf()
+        ent.exposures.gdf.impf_TC.values[::3] = 2
+
+        max_matrix_size = CONFIG.max_matrix_size._val
+        for mat_size in [max_matrix_size, hazard.intensity.nnz // 10]:
+            CONFIG.max_matrix_size._val = mat_size
+            try:
+                for insure in [True, False]:
+                    exp = ent.exposures.copy()
+                    if not insure:
+                        exp.gdf.cover = 0
+                    imp_ser = Impact()
+                    imp_ser.calc(exp, ent.impact_funcs, hazard, save_mat=True)
+                    imp_par = Impact()
+                    imp_par.calc(exp, ent.impact_funcs, hazard, save_mat=True, n_workers=3)
+                    np.testing.assert_array_equal(imp_par.at_event, imp_ser.at_event)
+                    np.testing.assert_array_equal(imp_par.eai_exp, imp_ser.eai_exp)
+                    self.assertEqual(imp_par.aai_agg, imp_ser.aai_agg)
+                    self.assertEqual(imp_par.tot_value, imp_ser.tot_value)
+                    self.assertEqual((imp_par.imp_mat != imp_ser.imp_mat).nnz, 0)
+            finally:
+                CONFIG.max_matrix_size._val = max_matrix_size
+
+    def test_calc_metrics_pass(self):
+        """Metrics without impact matrix are identical to the ones with matrix"""
+        ent, hazard = self._ent_haz_two_impf()
+        imp_fun = ent.impact_funcs.get_func('TC', 2)
+        ent.exposures.gdf.impf_TC.values[::3] = 2
+        # fraction not stored at every nonzero intensity
+        hazard.fraction = hazard.fraction.multiply(
+            np.random.default_rng(3).uniform(size=hazard.fraction.shape[1]) > 0.2).tocsr()
+
+        for insure in [True, False]:
+            exp = ent.exposures.copy()
+            if not insure:
+                exp.gdf.cover = 0
+            imp_mat = Impact()
+            imp_mat.calc(exp, ent.impact_funcs, hazard, save_mat=True)
+            imp_met = Impact()
+            imp_met.calc(exp, ent.impact_funcs, hazard)
+            np.testing.assert_array_equal(imp_met.at_event, imp_mat.at_event)
+            np.testing.assert_array_equal(imp_met.eai_exp, imp_mat.eai_exp)
+            self.assertEqual(imp_met.aai_agg, imp_mat.aai_agg)
+            self.assertEqual(imp_met.tot_value, imp_mat.tot_value)
+
+        class ImpactFuncHalf(type(imp_fun)):
+            """impact function with another mdr"""
+            def calc_mdr(self, inten):
+                return super().calc_mdr(inten) / 2
+        imp_fun.__class__ = ImpactFuncHalf
+        imp_half = Impact()
+        imp_half.calc(exp, ent.impact_funcs, hazard)
+        self.assertLess(imp_half.aai_agg, imp_met.aai_agg)
+
+    def test_update_pass(self):
+        """Update of changed exposures equals the impact computed again"""
+        ent, hazard = self._ent_haz_two_impf()
+        impact = Impact()
+        impact.calc(ent.exposures, ent.impact_funcs, hazard, save_mat=True)
+
+        changed_idx = np.array([3, 17, 18, 40])
+        ent.exposures.gdf.value.values[[3, 17]] *= 2
+        ent.exposures.gdf.value.values[18] = 0
+        ent.exposures.gdf.impf_TC.values[40] = 2
+        impact.update(ent.exposures, ent.impact_funcs, hazard, changed_idx)
+        imp_ref = Impact()
+        imp_ref.calc(ent.exposures, ent.impact_funcs, hazard, save_mat=True)
+        self.assertEqual((impact.imp_mat != imp_ref.imp_mat).nnz, 0)
+        self.assertEqual(impact.imp_mat.nnz, imp_ref.imp_mat.nnz)
+        np.testing.assert_array_equal(impact.eai_exp, imp_ref.eai_exp)
+        np.testing.assert_allclose(impact.at_event, imp_ref.at_event, rtol=1e-12, atol=1e-3)
+        np.testing.assert_allclose(impact.aai_agg, imp_ref.aai_agg, rtol=1e-12)
+        np.testing.assert_allclose(impact.tot_value, imp_ref.tot_value, rtol=1e-12)
+        self.assertEqual(impact.eai_exp[18], 0)
+
+        impact = Impact()
+        impact.calc(ent.exposures, ent.impact_funcs, hazard)
+        with self.assertRaises(ValueError):
+            impact.update(ent.exposures, ent.impact_funcs, hazard, changed_idx)
+
+    def test_calc_hazards_pass(self):
+        """Impacts of several hazards in one pass equal the ones of calc"""
+        ent, hazard = self._ent_haz_two_impf()
+        hazard.event_name = [str(ev_id) for ev_id in hazard.event_id]
+        haz_list = [hazard.select(orig=True), copy.deepcopy(hazard)]
+        haz_list[1].intensity = haz_list[1].intensity * 0.8
+        haz_list[1].frequency = haz_list[1].frequency * 2
+
+        for save_mat in [False, True]:
+            imp_list = Impact.calc_hazards(ent.exposures, ent.impact_funcs, haz_list,
+                                           save_mat=save_mat)
+            self.assertEqual(len(imp_list), 2)
+            for imp, haz in zip(imp_list, haz_list):
+                imp_ref = Impact()
+                imp_ref.calc(ent.exposures, ent.impact_funcs, haz, save_mat=save_mat)
+                np.testing.assert_array_equal(imp.event_id, imp_ref.event_id)
+                np.testing.assert_array_equal(imp.frequency, imp_ref.frequency)
+                np.testing.assert_array_equal(imp.coord_exp, imp_ref.coord_exp)
+                np.testing.assert_array_equal(imp.at_event, imp_ref.at_event)
+                np.testing.assert_array_equal(imp.eai_exp, imp_ref.eai_exp)
+                self.assertEqual(imp.aai_agg, imp_ref.aai_agg)
+                self.assertEqual(imp.tot_value, imp_ref.tot_value)
+                self.assertEqual((imp.imp_mat != imp_ref.imp_mat).nnz, 0)
+                self.assertIs(imp.tag['haz'], haz.tag)
+
+        imp_comb = Impact.calc_hazards(ent.exposures, ent.impact_funcs, haz_list,
+                                       save_mat=True, combine=True)
+        np.testing.assert_array_equal(
+            imp_comb.at_event, np.concatenate([imp.at_event for imp in imp_list]))
+        np.testing.assert_allclose(imp_comb.eai_exp, imp_list[0].eai_exp + imp_list[1].eai_exp,
+                                   rtol=1e-12)
+        self.assertEqual(imp_comb.imp_mat.shape, (hazard.size + haz_list[0].size, 50))
+
+        haz_list[1].tag.haz_type = 'FL'
+        with self.assertRaises(ValueError):
+            Impact.calc_hazards(ent.exposures, ent.impact_funcs, haz_list)
+
+    def test_calc_intensity_modified_pass(self):
+        """In-place changes of the intensity between two calculations are used
+        after clearing the CSC cache"""
+        ent = Entity.from_excel(ENT_DEMO_TODAY)
+        ent.check()
+        hazard = Hazard.from_mat(HAZ_TEST_MAT)
+        imp = Impact()
+        imp.calc(ent.exposures, ent.impact_funcs, hazard)
+        hazard.intensity.data *= 0.5
+        hazard.clear_csc_cache()
+        imp_half = Impact()
+        imp_half.calc(ent.exposures, ent.impact_funcs, hazard)
+        imp_ref = Impact()
+        imp_ref.calc(ent.exposures, ent.impact_funcs, copy.deepcopy(hazard))
+        self.assertLess(imp_half.aai_agg, imp.aai_agg)
+        self.assertEqual(imp_half.aai_agg, imp_ref.aai_agg)
+
+    def test_calc_float32_pass(self):
+        """Single precision hazard and impact matrices, double precision metrics"""
+        ent = Entity.from_excel(ENT_DEMO_TODAY)
+        ent.check()
+        hazard = Hazard.from_mat(HAZ_TEST_MAT)
+        imp_ref = Impact()
+        imp_ref.calc(ent.exposures, ent.impact_funcs, hazard, save_mat=True)
+        float_dtype = CONFIG.float_dtype._val
+        try:
+            CONFIG.float_dtype._val = 'float32'
+            hazard = Hazard.from_mat(HAZ_TEST_MAT)
+            imp = Impact()
+            imp.calc(ent.exposures, ent.impact_funcs, hazard, save_mat=True)
+        finally:
+            CONFIG.float_dtype._val = float_dtype
+        self.assertEqual(hazard.intensity.dtype, np.float32)
+        self.assertEqual(imp.imp_mat.dtype, np.float32)
+        self.assertEqual(imp.at_event.dtype, np.float64)
+        self.assertEqual(imp.eai_exp.dtype, np.float64)
+        # the rounding of the intensity is amplified by the impact functions
+        np.testing.assert_allclose(imp.at_event, imp_ref.at_event, rtol=1e-4)
+        np.testing.assert_allclose(imp.eai_exp, imp_ref.eai_exp, rtol=1e-4)
+        np.testing.assert_allclose(imp.imp_mat.toarray(), imp_ref.imp_mat.toarray(), rtol=1e-4)
+        self.assertAlmostEqual(imp.aai_agg / imp_ref.aai_agg, 1, places=4)
+
+    def test_calc_implicit_fraction_pass(self):
+        """Implicit fraction gives the impact of a fraction of one at every intensity"""
+        ent = Entity.from_excel(ENT_DEMO_TODAY)
+        ent.check()
+        haz_expl = Hazard.from_mat(HAZ_TEST_MAT)
+        haz_expl.fraction = haz_expl.intensity.copy()
+        haz_expl.fraction.data.fill(1)
+        haz_impl = copy.deepcopy(haz_expl)
+        haz_impl.set_implicit_fraction()
+        self.assertTrue(haz_impl.implicit_fraction)
+        self.assertFalse(haz_expl.implicit_fraction)
+        for save_mat in [False, True]:
+            imp_ref = Impact()
+            imp_ref.calc(ent.exposures, ent.impact_funcs, haz_expl, save_mat=save_mat)
+            imp = Impact()
+            imp.calc(ent.exposures, ent.impact_funcs, haz_impl, save_mat=save_mat)
+            np.testing.assert_allclose(imp.at_event, imp_ref.at_event, rtol=1e-12)
+            np.testing.assert_allclose(imp.eai_exp, imp_ref.eai_exp, rtol=1e-12)
+            if save_mat:
+                self.assertEqual((imp.imp_mat != imp_ref.imp_mat).nnz, 0)
+        # stacked with an explicit fraction
+        imp_list = Impact.calc_hazards(ent.exposures, ent.impact_funcs, [haz_impl, haz_expl])
+        np.testing.assert_allclose(imp_list[0].at_event, imp_list[1].at_event, rtol=1e-12)
+
+    def test_calc_zero_fraction_pass(self):
+        """An explicit fraction without stored values gives no impact"""
+        ent = Entity.from_excel(ENT_DEMO_TODAY)
+        ent.check()
+        haz_zero = Hazard.from_mat(HAZ_TEST_MAT)
+        haz_zero.fraction = sparse.csr_matrix(haz_zero.intensity.shape)
+        self.assertFalse(haz_zero.implicit_fraction)
+        for save_mat in [False, True]:
+            imp = Impact()
+            imp.calc(ent.exposures, ent.impact_funcs, haz_zero, save_mat=save_mat)
+            self.assertEqual(imp.aai_agg, 0)
+            self.assertEqual(np.count_nonzero(imp.at_event), 0)
+        haz_sel = haz_zero.select(event_names=haz_zero.event_name[:10])
+        imp = Impact()
+        imp.calc(ent.exposures, ent.impact_funcs, haz_sel)
+        self.assertEqual(imp.aai_agg, 0)
+        haz_impl = copy.deepcopy(haz_zero)
+        haz_impl.implicit_fraction = True
+        imp_list = Impact.calc_hazards(ent.exposures, ent.impact_funcs, [haz_zero, haz_impl])
+        self.assertEqual(imp_list[0].aai_agg, 0)
+        self.assertGreater(imp_list[1].aai_agg, 0)
+
+    def test_calc_quantized_pass(self):
+        """Quantized intensities are decoded in the impact calculation"""
+        ent = Entity.from_excel(ENT_DEMO_TODAY)
+        ent.check()
+        haz_quant = Hazard.from_mat(HAZ_TEST_MAT)
+        haz_quant.quantize_intensity()
+        haz_ref = copy.deepcopy(haz_quant)
+        haz_ref.dequantize_intensity()
+        for save_mat in [False, True]:
+            imp_ref = Impact()
+            imp_ref.calc(ent.exposures, ent.impact_funcs, haz_ref, save_mat=save_mat)
+            imp = Impact()
+            imp.calc(ent.exposures, ent.impact_funcs, haz_quant, save_mat=save_mat)
+            np.testing.assert_allclose(imp.at_event, imp_ref.at_event, rtol=1e-12)
+            np.testing.assert_allclose(imp.eai_exp, imp_ref.eai_exp, rtol=1e-12)
+            if save_mat:
+                np.testing.assert_allclose(imp.imp_mat.toarray(), imp_ref.imp_mat.toarray(),
+                                           rtol=1e-12)
+        imp_list = Impact.calc_hazards(ent.exposures, ent.impact_funcs, [haz_quant, haz_ref])
+        np.testing.assert_allclose(imp_list[0].at_event, imp_list[1].at_event, rtol=1e-12)
+
+    def test_calc_quantized_float32_pass(self):
+        """Quantized intensities are decoded in single precision in the metrics
+        and in the impact matrix computations"""
+        ent = Entity.from_excel(ENT_DEMO_TODAY)
+        ent.check()
+        float_dtype = CONFIG.float_dtype._val
+        try:
+            CONFIG.float_dtype._val = 'float32'
+            haz_quant = Hazard.from_mat(HAZ_TEST_MAT)
+            haz_quant.quantize_intensity()
+            haz_ref = copy.deepcopy(haz_quant)
+            haz_ref.dequantize_intensity()
+            self.assertEqual(haz_ref.intensity.dtype, np.float32)
+            imp_list = []
+            for haz, save_mat in [(haz_quant, False), (haz_quant, True), (haz_ref, False)]:
+                imp = Impact()
+                imp.calc(ent.exposures, ent.impact_funcs, haz, save_mat=save_mat)
+                imp_list.append(imp)
+        finally:
+            CONFIG.float_dtype._val = float_dtype
+        for imp in imp_list[1:]:
+            np.testing.assert_allclose(imp.at_event, imp_list[0].at_event, rtol=1e-12)
+            np.testing.assert_allclose(imp.eai_exp, imp_list[0].eai_exp, rtol=1e-12)
+
+    def test_calc_event_blocks_pass(self):
+        """Impact of a hazard read in event blocks equals impact of whole hazard"""
+        ent, hazard = self._ent_haz_two_impf()
+        hazard.event_name = list(map(str, hazard.event_name))
+        impact = Impact()
+        impact.calc(ent.exposures, ent.impact_funcs, hazard, save_mat=True)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            haz_file = str(Path(tmp_dir, 'test_haz_blocks.h5'))
+            mat_file = str(Path(tmp_dir, 'test_imp_mat_blocks.h5'))
+            hazard.write_hdf5(haz_file)
+            imp_blk = Impact()
+            imp_blk.calc_event_blocks(ent.exposures, ent.impact_funcs,
+                                      Hazard.from_hdf5_event_blocks(haz_file, 5000),
+                                      mat_file)
+
+            np.testing.assert_array_equal(imp_blk.event_id, impact.event_id)
+            self.assertEqual(imp_blk.event_name, impact.event_name)
+            np.testing.assert_array_equal(imp_blk.date, impact.date)
+            np.testing.assert_array_equal(imp_blk.frequency, impact.frequency)
+            np.testing.assert_array_equal(imp_blk.at_event, impact.at_event)
+            np.testing.assert_allclose(imp_blk.eai_exp, impact.eai_exp, rtol=1e-12)
+            np.testing.assert_allclose(imp_blk.aai_agg, impact.aai_agg, rtol=1e-12)
+            self.assertEqual(imp_blk.tot_value, impact.tot_value)
+            self.assertEqual(imp_blk.imp_mat.shape, (0, 0))
+            with h5py.File(mat_file, 'r') as hf_data:
+                hf_csr = hf_data['imp_mat']
+                imp_mat = sparse.csr_matrix((hf_csr['data'][:], hf_csr['indices'][:],
+                                             hf_csr['indptr'][:]), hf_csr.attrs['shape'])
+            np.testing.assert_array_equal(imp_mat.toarray(), impact.imp_mat.toarray())
+
+        with self.assertRaises(ValueError):
+            imp_blk.calc_event_blocks(ent.exposures, ent.impact_funcs, [])
+
+    def test_concat_exposures_pass(self):
+        """Impacts on partitions of the exposures concatenate to the impact on all"""
+        ent, hazard = self._ent_haz_two_impf()
+        impact = Impact()
+        impact.calc(ent.exposures, ent.impact_funcs, hazard, save_mat=True)
+
+        imp_parts = []
+        for ini, end in [(0, 20), (20, 21), (21, 50)]:
+            exp_part = ent.exposures.copy()
+            exp_part.gdf = exp_part.gdf.iloc[ini:end].reset_index(drop=True)
+            imp_parts.append(Impact())
+            imp_parts[-1].calc(exp_part, ent.impact_funcs, hazard, save_mat=True)
+        imp_concat = Impact.concat_exposures(imp_parts)
+
+        np.testing.assert_array_equal(imp_concat.event_id, impact.event_id)
+        np.testing.assert_array_equal(imp_concat.frequency, impact.frequency)
+        np.testing.assert_array_equal(imp_concat.coord_exp, impact.coord_exp)
+        np.testing.assert_array_equal(imp_concat.eai_exp, impact.eai_exp)
+        np.testing.assert_allclose(imp_concat.at_event, impact.at_event, rtol=1e-12)
+        np.testing.assert_allclose(imp_concat.aai_agg, impact.aai_agg, rtol=1e-12)
+        np.testing.assert_allclose(imp_concat.tot_value, impact.tot_value, rtol=1e-12)
+        self.assertEqual((imp_concat.imp_mat != impact.imp_mat).nnz, 0)
+        self.assertEqual(imp_parts[0].eai_exp.size, 20)
+
+        # select on the concatenated impact
+        event_id = impact.event_id[[10, 500, 7000]]
+        imp_sel = imp_concat.select(event_ids=event_id)
+        imp_ref = impact.select(event_ids=event_id)
+        np.testing.assert_allclose(imp_sel.at_event, imp_ref.at_event, rtol=1e-12)
+        np.testing.assert_array_equal(imp_sel.eai_exp, imp_ref.eai_exp)
+        imp_concat = Impact.concat_exposures([imp_parts[0].select(event_ids=event_id),
+                                              imp_parts[2].select(event_ids=event_id)])
+        np.testing.assert_array_equal(imp_concat.eai_exp, imp_ref.eai_exp[np.r_[0:20, 21:50]])
+
+        imp_parts[1].imp_mat = sparse.csr_matrix(np.empty((0, 0)))
+        self.assertEqual(Impact.concat_exposures(imp_parts).imp_mat.shape, (0, 0))
+        imp_parts[1].frequency = imp_parts[1].frequency * 2
+        with self.assertRaises(ValueError):
+            Impact.concat_exposures(imp_parts)
+        imp_parts[1].event_id = imp_parts[1].event_id[1:]
+        with self.assertRaises(ValueError):
+            Impact.concat_exposures(imp_parts)
+        self.assertEqual(Impact.concat_exposures([]).event_id.size, 0)
+
 class TestImpactYearSet(unittest.TestCase):
     """Test calc_impact_year_set method"""
 
@@ -334,6 +757,12 @@ class TestImpactYearSet(unittest.TestCase):
         self.assertFalse(2007 in iys_yr)
         self.assertFalse(1959 in iys_yr)
         self.assertEqual(len(iys_all_yr_1940), 61)
+        # same result as arrays
+        years, year_imp = imp.calc_impact_year_set(year_range=(1975, 2000), as_array=True)
+        np.testing.assert_array_equal(years, list(iys_all_yr.keys()))
+        np.testing.assert_array_equal(year_imp, list(iys_all_yr.values()))
+        self.assertEqual(iys_all_yr[1978],
+                         sum(imp.at_event[u_dt.ordinal_to_year(imp.date) == 1978]))
 
     def test_impact_year_set_empty(self):
         """Test result for empty impact"""
@@ -342,6 +771,9 @@ class TestImpactYearSet(unittest.TestCase):
         iys = imp.calc_impact_year_set(all_years=False)
         self.assertEqual(len(iys), 0)
         self.assertEqual(len(iys_all), 0)
+        years, year_imp = imp.calc_impact_year_set(as_array=True)
+        self.assertEqual(years.size, 0)
+        self.assertEqual(year_imp.size, 0)
 
 class TestIO(unittest.TestCase):
     """Test impact input/output methods."""
@@ -469,6 +901,111 @@ class TestIO(unittest.TestCase):
             np.testing.assert_array_equal(
                 read_imp_mat[irow, :].toarray(), impact.imp_mat[irow, :].toarray())
 
+    def test_write_read_imp_mat_mmap_pass(self):
+        """Test write_sparse_csr to a directory and memory-mapped read"""
+        imp = dummy_impact()
+        dir_name = DATA_FOLDER.joinpath('test_imp_mat_dir')
+        imp.write_sparse_csr(dir_name, as_dir=True)
+        read_imp_mat = Impact.read_sparse_csr(dir_name)
+        self.assertEqual((read_imp_mat != imp.imp_mat).nnz, 0)
+        self.assertEqual(read_imp_mat.shape, (6, 2))
+
+        imp_mmap = dummy_impact()
+        imp_mmap.imp_mat = Impact.read_sparse_csr(dir_name, mmap_mode='r')
+        self.assertEqual((imp_mmap.imp_mat != imp.imp_mat).nnz, 0)
+        self.assertFalse(imp_mmap.imp_mat.data.flags.owndata)
+        self.assertFalse(imp_mmap.imp_mat.data.flags.writeable)
+        sel_imp = imp_mmap.select(event_ids=[11, 14])
+        np.testing.assert_array_equal(sel_imp.imp_mat.toarray(), [[1, 1], [30, 30]])
+        np.testing.assert_array_equal(sel_imp.at_event, [2, 60])
+        self.assertIsNot(imp_mmap.select().imp_mat, imp_mmap.imp_mat)
+        exp = imp_mmap._build_exp_event(event_id=13)
+        np.testing.assert_array_equal(exp.gdf['value'], [3, 3])
+
+    def test_write_read_hdf5_pass(self):
+        """Test write and read in hdf5, with selection of events and exposures"""
+        ent = Entity.from_excel(ENT_DEMO_TODAY)
+        ent.check()
+        hazard = Hazard.from_mat(HAZ_TEST_MAT)
+        imp_write = Impact()
+        imp_write.calc(ent.exposures, ent.impact_funcs, hazard, save_mat=True)
+        file_name = DATA_FOLDER.joinpath('test_imp.h5')
+        imp_write.write_hdf5(file_name)
+
+        imp_read = Impact.from_hdf5(file_name)
+        for var_name in ['event_id', 'date', 'coord_exp', 'eai_exp', 'at_event', 'frequency']:
+            np.testing.assert_array_equal(getattr(imp_write, var_name),
+                                          getattr(imp_read, var_name))
+        self.assertEqual(imp_write.event_name, imp_read.event_name)
+        self.assertEqual(imp_write.tot_value, imp_read.tot_value)
+        self.assertEqual(imp_write.aai_agg, imp_read.aai_agg)
+        self.assertEqual(imp_write.unit, imp_read.unit)
+        self.assertTrue(u_coord.equal_crs(imp_write.crs, imp_read.crs))
+        self.assertEqual(imp_read.tag['haz'].haz_type, 'TC')
+        self.assertEqual(imp_read.tag['exp'].description, imp_write.tag['exp'].description)
+        self.assertEqual((imp_write.imp_mat != imp_read.imp_mat).nnz, 0)
+
+        # aggregates only
+        imp_read = Impact.from_hdf5(file_name, imp_mat=False)
+        np.testing.assert_array_equal(imp_write.eai_exp, imp_read.eai_exp)
+        np.testing.assert_array_equal(imp_write.at_event, imp_read.at_event)
+        self.assertEqual(imp_read.imp_mat.shape, (0, 0))
+
+        # same as select for a subset of events
+        event_id = imp_write.event_id[[3, 4, 5, 100, 2000, 14449]]
+        imp_sel = imp_write.select(event_ids=event_id)
+        imp_read = Impact.from_hdf5(file_name, event_id=event_id)
+        np.testing.assert_array_equal(imp_sel.event_id, imp_read.event_id)
+        self.assertEqual(imp_sel.event_name, imp_read.event_name)
+        np.testing.assert_array_equal(imp_sel.at_event, imp_read.at_event)
+        np.testing.assert_array_equal(imp_sel.eai_exp, imp_read.eai_exp)
+        self.assertEqual(imp_sel.aai_agg, imp_read.aai_agg)
+        self.assertEqual((imp_sel.imp_mat != imp_read.imp_mat).nnz, 0)
+        imp_read = Impact.from_hdf5(file_name, event_id=event_id, imp_mat=False)
+        np.testing.assert_array_equal(imp_sel.at_event, imp_read.at_event)
+        self.assertEqual(imp_read.eai_exp.size, 0)
+
+        # range of exposures
+        imp_read = Impact.from_hdf5(file_name, exp_range=(10, 20))
+        np.testing.assert_array_equal(imp_write.coord_exp[10:20], imp_read.coord_exp)
+        np.testing.assert_array_equal(imp_write.eai_exp[10:20], imp_read.eai_exp)
+        self.assertEqual((imp_write.imp_mat[:, 10:20] != imp_read.imp_mat).nnz, 0)
+        np.testing.assert_array_equal(imp_write.imp_mat[:, 10:20].sum(axis=1).A1,
+                                      imp_read.at_event)
+        self.assertIsNone(imp_read.tot_value)
+        imp_read = Impact.from_hdf5(file_name, event_id=event_id, exp_range=(10, 20))
+        self.assertEqual((imp_sel.imp_mat[:, 10:20] != imp_read.imp_mat).nnz, 0)
+        with self.assertRaises(ValueError):
+            Impact.from_hdf5(file_name, event_id=event_id, exp_range=(10, 20), imp_mat=False)
+
+    def test_write_read_hdf5_event_name_pass(self):
+        """Test write and read in hdf5 of integer and string event names"""
+        imp_write = dummy_impact()
+        imp_write.event_name[4] = np.int64(30)
+        file_name = DATA_FOLDER.joinpath('test_imp_names.h5')
+        imp_write.write_hdf5(file_name)
+        imp_read = Impact.from_hdf5(file_name)
+        self.assertEqual(imp_read.event_name, [0, 1, 'two', 'three', 30, 31])
+        self.assertEqual([type(name) for name in imp_read.event_name],
+                         [int, int, str, str, int, int])
+        imp_read = Impact.from_hdf5(file_name, event_id=[12, 14])
+        self.assertEqual(imp_read.event_name, ['two', 30])
+
+        imp_write.event_name = [str(name) for name in imp_write.event_name]
+        imp_write.write_hdf5(file_name)
+        imp_read = Impact.from_hdf5(file_name)
+        self.assertEqual(imp_read.event_name, ['0', '1', 'two', 'three', '30', '31'])
+
+    def test_write_read_hdf5_empty_pass(self):
+        """Test write and read in hdf5 of an empty impact"""
+        file_name = DATA_FOLDER.joinpath('test_imp_empty.h5')
+        Impact().write_hdf5(file_name, compression=None)
+        imp_read = Impact.from_hdf5(file_name)
+        self.assertEqual(imp_read.event_id.size, 0)
+        self.assertEqual(imp_read.event_name, [])
+        self.assertEqual(imp_read.imp_mat.shape, (0, 0))
+        self.assertEqual(imp_read.tag, dict())
+
 class TestRPmatrix(unittest.TestCase):
     """Test computation of impact per return period for whole exposure"""
     def test_local_exceedance_imp_pass(self):
@@ -494,6 +1031,11 @@ class TestRPmatrix(unittest.TestCase):
         self.assertAlmostEqual(np.max(impact_rp), 2916964966.388219, places=5)
         self.assertAlmostEqual(np.min(impact_rp), 444457580.131494, places=5)
 
+        # same as the fit of the dense impact columns
+        impact_ref = np.zeros(impact_rp.shape)
+        impact._loc_return_imp(np.array([10, 40]), impact.imp_mat.toarray(), impact_ref)
+        np.testing.assert_allclose(impact_rp, impact_ref, rtol=1e-10)
+
 class TestRiskTrans(unittest.TestCase):
     """Test risk transfer methods"""
     def test_risk_trans_pass(self):
@@ -806,6 +1348,70 @@ class TestSelect(unittest.TestCase):
         self.assertEqual(exp.value_unit, imp.unit)
         self.assertEqual(exp.ref_year, 0)
 
+class TestGroups(unittest.TestCase):
+    """Test impact aggregation per group of exposures"""
+
+    def setUp(self):
+        self.ent = Entity.from_excel(ENT_DEMO_TODAY)
+        self.ent.check()
+        self.hazard = Hazard.from_mat(HAZ_TEST_MAT)
+        self.ent.exposures.gdf['region_id'] = np.arange(50) % 3 + 10
+
+    def test_calc_groups_pass(self):
+        """Impact per group computed during calc equals aggregated imp_mat"""
+        impact = Impact()
+        impact.calc(self.ent.exposures, self.ent.impact_funcs, self.hazard, save_mat=True)
+        imp_ref = impact.aggregate_groups(self.ent.exposures.gdf.region_id.values)
+        np.testing.assert_array_equal(imp_ref.group_id, [10, 11, 12])
+        self.assertEqual(imp_ref.at_event.shape, (impact.event_id.size, 3))
+        np.testing.assert_allclose(imp_ref.at_event.sum(axis=1).A1, impact.at_event,
+                                   rtol=1e-12)
+        np.testing.assert_allclose(imp_ref.eai,
+                                   [impact.eai_exp[reg::3].sum() for reg in range(3)])
+        self.assertEqual(imp_ref.aai_agg, impact.aai_agg)
+
+        max_matrix_size = CONFIG.max_matrix_size._val
+        CONFIG.max_matrix_size._val = self.hazard.intensity.nnz // 10
+        try:
+            for n_workers in [None, 3]:
+                imp_grp = Impact()
+                imp_grp = imp_grp.calc_groups(self.ent.exposures, self.ent.impact_funcs,
+                                              self.hazard, 'region_id', n_workers)
+                np.testing.assert_array_equal(imp_grp.group_id, imp_ref.group_id)
+                np.testing.assert_allclose(imp_grp.at_event.toarray(),
+                                           imp_ref.at_event.toarray(), rtol=1e-12)
+                np.testing.assert_array_equal(imp_grp.eai, imp_ref.eai)
+                if n_workers:
+                    self.assertEqual((imp_grp.at_event != imp_ser.at_event).nnz, 0)
+                imp_ser = imp_grp
+        finally:
+            CONFIG.max_matrix_size._val = max_matrix_size
+
+        with self.assertRaises(ValueError):
+            impact.aggregate_groups(np.ones(3))
+        impact = Impact()
+        impact.calc(self.ent.exposures, self.ent.impact_funcs, self.hazard)
+        with self.assertRaises(ValueError):
+            impact.aggregate_groups(self.ent.exposures.gdf.region_id.values)
+
+    def test_freq_curve_pass(self):
+        """Exceedance curve of a single group equals the one of the impact"""
+        impact = Impact()
+        imp_grp = impact.calc_groups(self.ent.exposures, self.ent.impact_funcs, self.hazard,
+                                     np.zeros(50))
+        return_per = np.array([50, 100, 250, 1000])
+        np.testing.assert_allclose(imp_grp.calc_freq_curve(return_per)[:, 0],
+                                   impact.calc_freq_curve(return_per).impact, rtol=1e-12)
+        np.testing.assert_array_equal(imp_grp.calc_freq_curve([0.1]), [[0]])
+
+        imp_grp = ImpactGroups()
+        imp_grp.group_id = np.array([1, 2])
+        imp_grp.frequency = np.array([0.5, 0.25, 0.25])
+        imp_grp.at_event = sparse.csr_matrix(np.array([[1., 0.], [3., 0.], [2., 4.]]))
+        # group 1: 3 exceeded every 4 years, 2 every 2 years, 1 every year
+        # group 2: 4 exceeded every 4 years, 0 every year
+        np.testing.assert_allclose(imp_grp.calc_freq_curve([1, 2, 4]),
+                                   [[1, 0], [2, 4 / 3], [3, 4]])
 
 # Execute Tests
 if __name__ == "__main__":
@@ -817,4 +1423,5 @@ if __name__ == "__main__":
     TESTS.addTests(unittest.TestLoader().loadTestsFromTestCase(TestRPmatrix))
     TESTS.addTests(unittest.TestLoader().loadTestsFromTestCase(TestRiskTrans))
     TESTS.addTests(unittest.TestLoader().loadTestsFromTestCase(TestSelect))
+    TESTS.addTests(unittest.TestLoader().loadTestsFromTestCase(TestGroups))
     unittest.TextTestRunner(verbosity=2).run(TESTS)
@@ -0,0 +1,154 @@
+"""
+This file is part of CLIMADA.
+
+Copyright (C) 2017 ETH Zurich, CLIMADA contributors listed in AUTHORS.
+
+CLIMADA is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free
+Software Foundation, version 3.
+
+CLIMADA is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with CLIMADA. If not, see <https://www.gnu.org/licenses/>.
+
+---
+
+Test ImpactCalculator class.
+"""
+import unittest
+import copy
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+from climada.entity.entity_def import Entity
+from climada.hazard.base import Hazard
+from climada.engine.impact import Impact
+from climada.engine.impact_calc import ImpactCalculator
+from climada.util.constants import ENT_DEMO_TODAY
+from climada.util.api_client import Client
+
+
+def get_haz_test_file(ds_name):
+    client = Client()
+    test_ds = client.get_dataset_info(name=ds_name, status='test_dataset')
+    _, [haz_test_file] = client.download_dataset(test_ds)
+    return haz_test_file
+
+
+HAZ_TEST_MAT = get_haz_test_file('atl_prob_no_name')
+
+
+class TestImpactCalculator(unittest.TestCase):
+    """Test ImpactCalculator against Impact.calc"""
+
+    def setUp(self):
+        self.ent = Entity.from_excel(ENT_DEMO_TODAY)
+        self.ent.check()
+        self.hazard = Hazard.from_mat(HAZ_TEST_MAT)
+
+    def assert_impact_equal(self, imp, imp_ref):
+        """Check that both impacts are identical"""
+        np.testing.assert_array_equal(imp.event_id, imp_ref.event_id)
+        np.testing.assert_array_equal(imp.frequency, imp_ref.frequency)
+        np.testing.assert_array_equal(imp.at_event, imp_ref.at_event)
+        np.testing.assert_array_equal(imp.eai_exp, imp_ref.eai_exp)
+        self.assertEqual(imp.aai_agg, imp_ref.aai_agg)
+        self.assertEqual(imp.tot_value, imp_ref.tot_value)
+        self.assertEqual((imp.imp_mat != imp_ref.imp_mat).nnz, 0)
+
+    def test_impact_pass(self):
+        """Several impact function sets give the same impacts as Impact.calc"""
+        imp_calc = ImpactCalculator(self.ent.exposures, self.hazard)
+        self.assertIn('centr_TC', self.ent.exposures.gdf)
+        for mdd_fact in [1, 0.5]:
+            impf_set = copy.deepcopy(self.ent.impact_funcs)
+            for imp_fun in impf_set.get_func('TC'):
+                imp_fun.mdd = imp_fun.mdd * mdd_fact
+            imp = imp_calc.impact(impf_set, save_mat=True)
+            imp_ref = Impact()
+            imp_ref.calc(self.ent.exposures, impf_set, self.hazard, save_mat=True)
+            self.assert_impact_equal(imp, imp_ref)
+        self.assertEqual(len(imp_calc._haz_cache), 1)
+
+        imp_calc.clear()
+        self.assertEqual(len(imp_calc._haz_cache), 0)
+
+        # the columns are also kept when only the metrics are computed
+        imp = imp_calc.impact(self.ent.impact_funcs)
+        self.assertEqual(len(imp_calc._haz_cache), 1)
+        haz_cols = list(imp_calc._haz_cache.values())[0]
+        imp = imp_calc.impact(self.ent.impact_funcs)
+        self.assertIs(list(imp_calc._haz_cache.values())[0], haz_cols)
+        imp_ref = Impact()
+        imp_ref.calc(self.ent.exposures, self.ent.impact_funcs, self.hazard)
+        self.assert_impact_equal(imp, imp_ref)
+
+    def test_haz_columns_bounded_pass(self):
+        """The cache of hazard columns drops the oldest columns beyond its size"""
+        haz_cache = dict()
+        haz_csc = (self.hazard.intensity_csc, self.hazard.fraction_csc)
+        icens_list = [np.array([0, 1]), np.array([2]), np.array([3, 4, 5])]
+        for icens in icens_list:
+            inten_csc, fract = Impact._haz_columns(haz_csc, icens, haz_cache,
+                                                   max_size=1)
+            np.testing.assert_array_equal(inten_csc.toarray(),
+                                          self.hazard.intensity[:, icens].toarray())
+            np.testing.assert_array_equal(fract.toarray(),
+                                          self.hazard.fraction[:, icens].toarray())
+        # only the last columns are kept
+        self.assertEqual(len(haz_cache), 1)
+        self.assertIs(list(haz_cache.values())[0][0], inten_csc)
+
+        haz_cache = dict()
+        for icens in icens_list:
+            Impact._haz_columns(haz_csc, icens, haz_cache)
+        self.assertEqual(len(haz_cache), 3)
+
+    def test_haz_columns_threads_pass(self):
+        """The bounded cache of hazard columns can be shared by threads"""
+        haz_cache = dict()
+        haz_csc = (self.hazard.intensity_csc, self.hazard.fraction_csc)
+        icens_list = [np.array([i_cen % 7, i_cen % 5]) for i_cen in range(200)]
+
+        def haz_columns(icens):
+            return Impact._haz_columns(haz_csc, icens, haz_cache, max_size=1)[0]
+
+        with ThreadPoolExecutor(8) as executor:
+            for icens, inten_csc in zip(icens_list, executor.map(haz_columns, icens_list)):
+                np.testing.assert_array_equal(inten_csc.toarray(),
+                                              self.hazard.intensity[:, icens].toarray())
+
+    def test_impact_value_freq_pass(self):
+        """Values and frequencies given to impact replace the ones of exposures and hazard"""
+        imp_calc = ImpactCalculator(self.ent.exposures, self.hazard)
+        value = self.ent.exposures.gdf.value.values * 2
+        frequency = self.hazard.frequency * 3
+        inten_csc = self.hazard.intensity_csc
+        imp = imp_calc.impact(self.ent.impact_funcs, value=value, frequency=frequency)
+        # the hazard is not copied
+        self.assertIs(self.hazard.intensity_csc, inten_csc)
+
+        exp_ref = self.ent.exposures.copy()
+        exp_ref.gdf['value'] = value
+        haz_ref = copy.deepcopy(self.hazard)
+        haz_ref.frequency = frequency
+        imp_ref = Impact()
+        imp_ref.calc(exp_ref, self.ent.impact_funcs, haz_ref)
+        self.assert_impact_equal(imp, imp_ref)
+        # inputs are unchanged
+        np.testing.assert_array_equal(self.ent.exposures.gdf.value.values, value / 2)
+        np.testing.assert_array_equal(self.hazard.frequency, frequency / 3)
+
+        with self.assertRaises(ValueError):
+            imp_calc.impact(self.ent.impact_funcs, value=value[1:])
+        with self.assertRaises(ValueError):
+            imp_calc.impact(self.ent.impact_funcs, frequency=frequency[1:])
+
+
+# Execute Tests
+if __name__ == "__main__":
+    TESTS = unittest.TestLoader().loadTestsFromTestCase(TestImpactCalculator)
+    unittest.TextTestRunner(verbosity=2).run(TESTS)
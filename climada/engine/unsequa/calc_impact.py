@@ -27,7 +27,7 @@ import time
 import pandas as pd
 import numpy as np
 
-from climada.engine import Impact
+from climada.engine import ImpactCalculator
 from climada.engine.unsequa import Calc, InputVar, UncImpactOutput
 from climada.util import log_level
 
@@ -91,6 +91,7 @@ class CalcImpact(Calc):
                              'eai_exp', 'tot_value')
         self.value_unit = self.exp_input_var.evaluate().value_unit
         self.check_distr()
+        self._impact_calc = None
 
 
     def uncertainty(self,
@@ -183,6 +184,8 @@ class CalcImpact(Calc):
         with log_level(level='ERROR', name_prefix='climada'):
             if pool:
                 LOGGER.info('Using %s CPUs.', pool.ncpus)
+                # do not send the cached hazard columns to the workers
+                self._impact_calc = None
                 chunksize = min(unc_sample.n_samples // pool.ncpus, 100)
                 imp_metrics = pool.map(self._map_impact_calc,
                                         samples_df.iterrows(),
@@ -197,6 +200,7 @@ class CalcImpact(Calc):
             [aai_agg_list, freq_curve_list,
              eai_exp_list, at_event_list,
              tot_value_list] = list(zip(*imp_metrics))
+        self._impact_calc = None
 
         # Assign computed impact distribution data to self
         aai_agg_unc_df  = pd.DataFrame(aai_agg_list,
@@ -260,9 +264,11 @@ class CalcImpact(Calc):
         impf = self.impf_input_var.evaluate(**impf_samples)
         haz = self.haz_input_var.evaluate(**haz_samples)
 
-        imp = Impact()
-
-        imp.calc(exposures=exp, impact_funcs=impf, hazard=haz)
+        # reuse the hazard columns of the previous sample if exp and haz are unchanged
+        if self._impact_calc is None or self._impact_calc.exposures is not exp \
+        or self._impact_calc.hazard is not haz:
+            self._impact_calc = ImpactCalculator(exp, haz)
+        imp = self._impact_calc.impact(impf)
 
         # Extract from climada.impact the chosen metrics
         freq_curve = imp.calc_freq_curve(self.rp).impact
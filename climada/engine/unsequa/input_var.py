@@ -630,12 +630,15 @@ class InputVar():
 
 #Hazard
 def _haz_uncfunc(HE, HI, HF, haz, n_ev):
-    haz_tmp = copy.deepcopy(haz)
     if HE is not None:
         rng = np.random.RandomState(int(HE))
-        event_names = list(rng.choice(haz_tmp.event_name, int(n_ev)))
-        haz_tmp = haz_tmp.select(event_names=event_names)
+        event_names = list(rng.choice(haz.event_name, int(n_ev)))
+        # select returns a new hazard and reuses the event index of haz
+        haz_tmp = haz.select(event_names=event_names)
+    else:
+        haz_tmp = copy.deepcopy(haz)
     if HI is not None:
+        haz_tmp.dequantize_intensity()
         haz_tmp.intensity = haz_tmp.intensity.multiply(HI)
     if HF is not None:
         haz_tmp.frequency = np.multiply(haz_tmp.frequency, HF)
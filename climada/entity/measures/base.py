@@ -121,7 +121,7 @@ class Measure():
         u_check.size(2, self.mdd_impact, 'Measure.mdd_impact')
         u_check.size(2, self.paa_impact, 'Measure.paa_impact')
 
-    def calc_impact(self, exposures, imp_fun_set, hazard):
+    def calc_impact(self, exposures, imp_fun_set, hazard, impact_calc=None):
         """
         Apply measure and compute impact and risk transfer of measure
         implemented over inputs.
@@ -134,6 +134,9 @@ class Measure():
             impact function set instance
         hazard : climada.hazard.Hazard
             hazard instance
+        impact_calc : climada.engine.ImpactCalculator, optional
+            calculator of exposures and hazard, reused if the measure
+            does not change them. Default: None
 
         Returns
         -------
@@ -141,10 +144,10 @@ class Measure():
             resulting impact and risk transfer of measure
         """
 
-        new_exp, new_impfs, new_haz = self.apply(exposures, imp_fun_set, hazard)
-        return self._calc_impact(new_exp, new_impfs, new_haz)
+        new_exp, new_impfs, new_haz = self.apply(exposures, imp_fun_set, hazard, impact_calc)
+        return self._calc_impact(new_exp, new_impfs, new_haz, impact_calc)
 
-    def apply(self, exposures, imp_fun_set, hazard):
+    def apply(self, exposures, imp_fun_set, hazard, impact_calc=None):
         """
         Implement measure with all its defined parameters.
 
@@ -156,6 +159,9 @@ class Measure():
             impact function set instance
         hazard : climada.hazard.Hazard
             hazard instance
+        impact_calc : climada.engine.ImpactCalculator, optional
+            calculator of exposures and hazard, reused if the measure
+            does not change them. Default: None
 
         Returns
         -------
@@ -173,14 +179,14 @@ class Measure():
         # change impact functions
         new_impfs = self._change_imp_func(imp_fun_set)
         # cutoff events whose damage happen with high frequency (in region impf specified)
-        new_haz = self._cutoff_hazard_damage(new_exp, new_impfs, new_haz)
+        new_haz = self._cutoff_hazard_damage(new_exp, new_impfs, new_haz, impact_calc)
         # apply all previous changes only to the selected exposures
         new_exp, new_impfs, new_haz = self._filter_exposures(
             exposures, imp_fun_set, hazard, new_exp, new_impfs, new_haz)
 
         return new_exp, new_impfs, new_haz
 
-    def _calc_impact(self, new_exp, new_impfs, new_haz):
+    def _calc_impact(self, new_exp, new_impfs, new_haz, impact_calc=None):
         """Compute impact and risk transfer of measure implemented over inputs.
 
         Parameters
@@ -191,16 +197,37 @@ class Measure():
             impact function set once measure applied
         new_haz  : climada.hazard.Hazard
             hazard once measure applied
+        impact_calc : climada.engine.ImpactCalculator, optional
+            calculator reused if it has new_exp and new_haz. Default: None
 
         Returns
         -------
             : climada.engine.Impact
         """
-        from climada.engine.impact import Impact
-        imp = Impact()
-        imp.calc(new_exp, new_impfs, new_haz)
+        imp = self._impact_calc(new_exp, new_haz, impact_calc).impact(new_impfs)
         return imp.calc_risk_transfer(self.risk_transf_attach, self.risk_transf_cover)
 
+    @staticmethod
+    def _impact_calc(exposures, hazard, impact_calc=None):
+        """Get impact_calc if it computes the impact of exposures and hazard,
+        a new ImpactCalculator otherwise.
+
+        Parameters
+        ----------
+        exposures : climada.entity.Exposures
+        hazard : climada.hazard.Hazard
+        impact_calc : climada.engine.ImpactCalculator, optional
+
+        Returns
+        -------
+        climada.engine.ImpactCalculator
+        """
+        if impact_calc is not None and impact_calc.exposures is exposures \
+        and impact_calc.hazard is hazard:
+            return impact_calc
+        from climada.engine.impact_calc import ImpactCalculator
+        return ImpactCalculator(exposures, hazard)
+
     def _change_all_hazard(self, hazard):
         """
         Change hazard to provided hazard_set.
@@ -325,7 +352,7 @@ class Measure():
 
         return new_imp_set
 
-    def _cutoff_hazard_damage(self, exposures, impf_set, hazard):
+    def _cutoff_hazard_damage(self, exposures, impf_set, hazard, impact_calc=None):
         """Cutoff of hazard events which generate damage with a frequency higher
         than hazard_freq_cutoff.
 
@@ -337,6 +364,8 @@ class Measure():
             impact function set instance
         hazard : climada.hazard.Hazard
             hazard instance
+        impact_calc : climada.engine.ImpactCalculator, optional
+            calculator reused if it has exposures and hazard. Default: None
 
         Returns
         -------
@@ -356,13 +385,13 @@ class Measure():
         else:
             exp_imp = exposures
 
-        from climada.engine.impact import Impact
-        imp = Impact()
-        imp.calc(exp_imp, impf_set, hazard)
+        imp = self._impact_calc(exp_imp, hazard, impact_calc).impact(impf_set)
 
         LOGGER.debug('Cutting events whose damage have a frequency > %s.',
                      self.hazard_freq_cutoff)
         new_haz = copy.deepcopy(hazard)
+        # a quantized intensity of 0 is not a zero value
+        new_haz.dequantize_intensity()
         sort_idxs = np.argsort(imp.at_event)[::-1]
         exceed_freq = np.cumsum(imp.frequency[sort_idxs])
         cutoff = exceed_freq > self.hazard_freq_cutoff
@@ -459,8 +488,9 @@ class Measure():
                 centr = exposures.gdf[INDICATOR_CENTR + self.haz_type].values[chg_reg]
 
             centr = np.delete(np.arange(hazard.intensity.shape[1]), np.unique(centr))
-            new_haz_inten = new_haz.intensity.tolil()
-            new_haz_inten[:, centr] = hazard.intensity[:, centr]
+            new_haz_inten = new_haz.get_intensity().tolil()
+            new_haz_inten[:, centr] = hazard.get_intensity()[:, centr]
             new_haz.intensity = new_haz_inten.tocsr()
+            new_haz.intensity_quantization = None
 
         return new_exp, new_impfs, new_haz
@@ -106,6 +106,28 @@ class TestApply(unittest.TestCase):
             self.assertEqual(new_haz.intensity[i_ev, :].max(), 0)
 
 
+    def test_cutoff_hazard_quantized_pass(self):
+        """Test _cutoff_hazard_damage with a quantized intensity"""
+        meas = MeasureSet.from_mat(ENT_TEST_MAT)
+        act_1 = meas.get_measure(name='Seawall')[0]
+
+        haz = Hazard.from_mat(HAZ_TEST_MAT)
+        exp = Exposures.from_mat(ENT_TEST_MAT)
+        exp.gdf.rename(columns={'impf': 'impf_TC'}, inplace=True)
+        exp.check()
+        imp_set = ImpactFuncSet.from_mat(ENT_TEST_MAT)
+        haz_quant = copy.deepcopy(haz)
+        haz_quant.quantize_intensity()
+
+        new_haz = act_1._cutoff_hazard_damage(exp, imp_set, haz)
+        new_haz_quant = act_1._cutoff_hazard_damage(exp, imp_set, haz_quant)
+        self.assertIsNone(new_haz_quant.intensity_quantization)
+        self.assertIsNotNone(haz_quant.intensity_quantization)
+        # the values of the kept events, their minimum included, are kept
+        self.assertEqual(new_haz_quant.intensity.nnz, new_haz.intensity.nnz)
+        np.testing.assert_allclose(new_haz_quant.intensity.toarray(),
+                                   new_haz.intensity.toarray(), atol=1e-3)
+
     def test_cutoff_hazard_region_pass(self):
         """Test _cutoff_hazard_damage in specific region"""
         meas = MeasureSet.from_mat(ENT_TEST_MAT)
@@ -19,14 +19,16 @@ with CLIMADA. If not, see <https://www.gnu.org/licenses/>.
 Define Hazard.
 """
 
-__all__ = ['Hazard']
+__all__ = ['Hazard', 'LazyHazard']
 
+from concurrent.futures import ThreadPoolExecutor
 import copy
 import datetime as dt
 import itertools
 import logging
 import pathlib
 import warnings
+import weakref
 
 import geopandas as gpd
 import h5py
@@ -44,8 +46,10 @@ from climada.hazard.centroids.centr import Centroids
 import climada.util.plot as u_plot
 import climada.util.checker as u_check
 import climada.util.dates_times as u_dt
+import climada.util.dtype as u_dtype
 from climada import CONFIG
 import climada.util.hdf5_handler as u_hdf5
+import climada.util.interpolation as u_interp
 import climada.util.coordinates as u_coord
 from climada.util.constants import ONE_LAT_KM
 from climada.util.coordinates import NEAREST_NEIGHBOR_THRESHOLD
@@ -92,6 +96,20 @@ DEF_VAR_MAT = {'field_name': 'hazard',
                }
 """MATLAB variable names"""
 
+HDF5_EVENTS_PER_CHUNK = 1000
+"""Default number of events per chunk of the compressed datasets of write_hdf5"""
+
+HDF5_MAX_CHUNK_SIZE = 2**24
+"""Maximum number of elements of a chunk of the datasets of write_hdf5"""
+
+_CSC_CACHE = weakref.WeakKeyDictionary()
+"""Column-major (CSC) copies of the hazard matrices, per hazard and attribute name.
+Each entry is a second full copy of the matrix, kept alive as long as the hazard
+(see Hazard.clear_csc_cache)"""
+
+_EVENT_INDEX_CACHE = weakref.WeakKeyDictionary()
+"""Event lookup indices per hazard, see Hazard._event_index"""
+
 
 class Hazard():
     """
@@ -123,12 +141,23 @@ class Hazard():
         intensity of the events at centroids
     fraction : sparse.csr_matrix
         fraction of affected exposures for each
-        event at each centroid
+        event at each centroid. If `implicit_fraction` is set, a matrix
+        without stored values, and the fraction is 1 at every stored intensity
+        value.
     """
     intensity_thres = 10
     """Intensity threshold per hazard used to filter lower intensities. To be
     set for every hazard type"""
 
+    intensity_quantization = None
+    """(scale, offset) of a quantized intensity, see quantize_intensity. None
+    if the intensity values are not quantized."""
+
+    implicit_fraction = False
+    """Whether the fraction is implicit, see set_implicit_fraction. Then
+    `fraction` has the shape of `intensity` but no stored values, and the
+    fraction is 1 at every stored intensity value."""
+
     vars_oblig = {'tag',
                   'units',
                   'centroids',
@@ -221,7 +250,7 @@ class Hazard():
     def from_raster(cls, files_intensity, files_fraction=None, attrs=None,
                     band=None, haz_type=None, pool=None, src_crs=None, window=False,
                     geometry=False, dst_crs=False, transform=None, width=None,
-                    height=None, resampling=Resampling.nearest):
+                    height=None, resampling=Resampling.nearest, n_workers=None):
         """Create Hazard with intensity and fraction values from raster files
 
         If raster files are masked, the masked values are set to 0.
@@ -229,6 +258,10 @@ class Hazard():
         Files can be partially read using either window or geometry. Additionally, the data is
         reprojected when custom dst_crs and/or transform, width and height are specified.
 
+        Without geometry, reprojection and pool, the files are read block of rows by block of
+        rows, directly into sparse rows (see `climada.util.coordinates.read_raster_sparse`), and
+        optionally by several threads.
+
         Parameters
         ----------
         files_intensity : list(str)
@@ -263,6 +296,9 @@ class Hazard():
             number of lats for transform
         resampling : rasterio.warp.Resampling, optional
             resampling function used for reprojection to dst_crs
+        n_workers : int, optional
+            number of threads reading the files concurrently, when neither geometry,
+            reprojection nor pool are used. Default: None (serial)
 
         Return
         ------
@@ -292,40 +328,50 @@ class Hazard():
 
         haz.tag.file_name = str(files_intensity) + ' ; ' + str(files_fraction)
 
-        haz.centroids = Centroids.from_raster_file(
-            files_intensity[0], src_crs=src_crs, window=window, geometry=geometry, dst_crs=dst_crs,
-            transform=transform, width=width, height=height, resampling=resampling)
-        if haz.pool:
-            chunksize = min(len(files_intensity) // haz.pool.ncpus, 1000)
-            inten_list = haz.pool.map(
-                haz.centroids.values_from_raster_files,
-                [[f] for f in files_intensity],
-                itertools.repeat(band), itertools.repeat(src_crs),
-                itertools.repeat(window), itertools.repeat(geometry),
-                itertools.repeat(dst_crs), itertools.repeat(transform),
-                itertools.repeat(width), itertools.repeat(height),
-                itertools.repeat(resampling), chunksize=chunksize)
-            haz.intensity = sparse.vstack(inten_list, format='csr')
+        if not (haz.pool or geometry or dst_crs or transform):
+            meta, haz.intensity = cls._read_raster_files_sparse(
+                files_intensity, band, window, n_workers)
+            haz.centroids = Centroids()
+            haz.centroids.meta = meta
             if files_fraction is not None:
-                fract_list = haz.pool.map(
+                _, haz.fraction = cls._read_raster_files_sparse(
+                    files_fraction, band, window, n_workers, meta)
+        else:
+            haz.centroids = Centroids.from_raster_file(
+                files_intensity[0], src_crs=src_crs, window=window, geometry=geometry,
+                dst_crs=dst_crs, transform=transform, width=width, height=height,
+                resampling=resampling)
+            if haz.pool:
+                chunksize = min(len(files_intensity) // haz.pool.ncpus, 1000)
+                inten_list = haz.pool.map(
                     haz.centroids.values_from_raster_files,
-                    [[f] for f in files_fraction],
+                    [[f] for f in files_intensity],
                     itertools.repeat(band), itertools.repeat(src_crs),
                     itertools.repeat(window), itertools.repeat(geometry),
                     itertools.repeat(dst_crs), itertools.repeat(transform),
                     itertools.repeat(width), itertools.repeat(height),
                     itertools.repeat(resampling), chunksize=chunksize)
-                haz.fraction = sparse.vstack(fract_list, format='csr')
-        else:
-            haz.intensity = haz.centroids.values_from_raster_files(
-                files_intensity, band=band, src_crs=src_crs, window=window, geometry=geometry,
-                dst_crs=dst_crs, transform=transform, width=width, height=height,
-                resampling=resampling)
-            if files_fraction is not None:
-                haz.fraction = haz.centroids.values_from_raster_files(
-                    files_fraction, band=band, src_crs=src_crs, window=window, geometry=geometry,
-                    dst_crs=dst_crs, transform=transform, width=width, height=height,
-                    resampling=resampling)
+                haz.intensity = sparse.vstack(inten_list, format='csr')
+                if files_fraction is not None:
+                    fract_list = haz.pool.map(
+                        haz.centroids.values_from_raster_files,
+                        [[f] for f in files_fraction],
+                        itertools.repeat(band), itertools.repeat(src_crs),
+                        itertools.repeat(window), itertools.repeat(geometry),
+                        itertools.repeat(dst_crs), itertools.repeat(transform),
+                        itertools.repeat(width), itertools.repeat(height),
+                        itertools.repeat(resampling), chunksize=chunksize)
+                    haz.fraction = sparse.vstack(fract_list, format='csr')
+            else:
+                haz.intensity = haz.centroids.values_from_raster_files(
+                    files_intensity, band=band, src_crs=src_crs, window=window,
+                    geometry=geometry, dst_crs=dst_crs, transform=transform, width=width,
+                    height=height, resampling=resampling)
+                if files_fraction is not None:
+                    haz.fraction = haz.centroids.values_from_raster_files(
+                        files_fraction, band=band, src_crs=src_crs, window=window,
+                        geometry=geometry, dst_crs=dst_crs, transform=transform, width=width,
+                        height=height, resampling=resampling)
 
         if files_fraction is None:
             haz.fraction = haz.intensity.copy()
@@ -354,8 +400,54 @@ class Hazard():
         if 'unit' in attrs:
             haz.unit = attrs['unit']
 
+        haz._set_float_dtype()
         return haz
 
+    @classmethod
+    def _read_raster_files_sparse(cls, file_names, band, window, n_workers=None, meta=None):
+        """Read the bands of raster files as rows of a sparse matrix, the files
+        being read by a pool of threads.
+
+        Parameters
+        ----------
+        file_names : list(str)
+            raster files, each band is an event
+        band : list(int)
+            bands to read
+        window : rasterio.windows.Window
+            window to read
+        n_workers : int, optional
+            number of threads. Default: None (serial)
+        meta : dict, optional
+            raster meta all files must comply with. Default: meta of the first file
+
+        Returns
+        -------
+        meta : dict
+            raster meta of the files
+        matrix : sparse.csr_matrix
+            one row per band of each file
+
+        Raises
+        ------
+        ValueError
+        """
+        def read_file(file_name):
+            return u_coord.read_raster_sparse(file_name, band=band, window=window)
+
+        mat_list = []
+        with ThreadPoolExecutor(n_workers or 1) as executor:
+            for file_meta, mat in executor.map(read_file, file_names):
+                if meta is None:
+                    meta = file_meta
+                elif (file_meta['crs'] != meta['crs']
+                      or file_meta['transform'] != meta['transform']
+                      or file_meta['height'] != meta['height']
+                      or file_meta['width'] != meta['width']):
+                    raise ValueError('Raster data is inconsistent with contained raster.')
+                mat_list.append(mat)
+        return meta, cls._stack_csr(mat_list, meta['height'] * meta['width'])
+
     def set_raster(self, *args, **kwargs):
         """This function is deprecated, use Hazard.from_raster."""
         LOGGER.warning("The use of Hazard.set_raster is deprecated."
@@ -452,6 +544,7 @@ class Hazard():
         if 'unit' in attrs:
             haz.unit = attrs['unit']
 
+        haz._set_float_dtype()
         return haz
 
     def reproject_raster(self, dst_crs=False, transform=None, width=None, height=None,
@@ -492,6 +585,7 @@ class Hazard():
         dst_meta.update({'crs': dst_crs, 'transform': transform,
                          'width': width, 'height': height
                          })
+        self.dequantize_intensity()
         intensity = np.zeros((self.size, dst_meta['height'], dst_meta['width']))
         fraction = np.zeros((self.size, dst_meta['height'], dst_meta['width']))
         kwargs = {'src_transform': self.centroids.meta['transform'],
@@ -505,7 +599,7 @@ class Hazard():
                 destination=intensity[idx_ev, :, :],
                 **kwargs)
         kwargs.update(resampling=resampl_fract)
-        for idx_ev, fract in enumerate(self.fraction.toarray()):
+        for idx_ev, fract in enumerate(self.get_fraction().toarray()):
             reproject(
                 source=np.asarray(
                     fract.reshape((self.centroids.meta['height'],
@@ -551,15 +645,17 @@ class Hazard():
             used for dask map_partitions. “threads”,
             “synchronous” or “processes”
         """
+        self.dequantize_intensity()
         points_df = gpd.GeoDataFrame()
         points_df['latitude'] = self.centroids.lat
         points_df['longitude'] = self.centroids.lon
         val_names = ['val' + str(i_ev) for i_ev in range(2 * self.size)]
+        fraction = self.get_fraction()
         for i_ev, inten_name in enumerate(val_names):
             if i_ev < self.size:
                 points_df[inten_name] = np.asarray(self.intensity[i_ev, :].toarray()).reshape(-1)
             else:
-                points_df[inten_name] = np.asarray(self.fraction[i_ev - self.size, :].toarray()). \
+                points_df[inten_name] = np.asarray(fraction[i_ev - self.size, :].toarray()). \
                     reshape(-1)
         raster, meta = u_coord.points_to_raster(points_df, val_names,
                                                 crs=self.centroids.geometry.crs,
@@ -618,6 +714,7 @@ class Hazard():
             haz._read_att_mat(data, file_name, var_names)
         except KeyError as var_err:
             raise KeyError("Variable not in MAT file: " + str(var_err)) from var_err
+        haz._set_float_dtype()
         return haz
 
     def read_excel(self, *args, **kwargs):
@@ -663,6 +760,7 @@ class Hazard():
             haz._read_att_excel(file_name, var_names)
         except KeyError as var_err:
             raise KeyError("Variable not in Excel file: " + str(var_err)) from var_err
+        haz._set_float_dtype()
         return haz
 
     def select(self, event_names=None, date=None, orig=None, reg_id=None,
@@ -694,57 +792,35 @@ class Hazard():
         haz : Hazard or None
             If no event matching the specified criteria is found, None is returned.
         """
+        sel = self._select_idx(event_names, date, orig, reg_id, extent)
+        if sel is None:
+            return None
+        sel_ev, sel_cen = sel
+
         if type(self) is Hazard:
             haz = Hazard(self.tag.haz_type)
         else:
             haz = self.__class__()
 
-        #filter events
-        sel_ev = np.ones(self.event_id.size, dtype=bool)
-
-        # filter events by date
-        if date is not None:
-            date_ini, date_end = date
-            if isinstance(date_ini, str):
-                date_ini = u_dt.str_to_date(date[0])
-                date_end = u_dt.str_to_date(date[1])
-            sel_ev &= (date_ini <= self.date) & (self.date <= date_end)
-            if not np.any(sel_ev):
-                LOGGER.info('No hazard in date range %s.', date)
-                return None
-
-        # filter events hist/synthetic
-        if isinstance(orig, bool):
-            sel_ev &= (self.orig.astype(bool) == orig)
-            if not np.any(sel_ev):
-                LOGGER.info('No hazard with %s tracks.', str(orig))
-                return None
-
-        # filter events based on name
-        sel_ev = np.argwhere(sel_ev).reshape(-1)
-        if isinstance(event_names, list):
-            filtered_events = [self.event_name[i] for i in sel_ev]
-            try:
-                new_sel = [filtered_events.index(n) for n in event_names]
-            except ValueError as err:
-                name = str(err).replace(" is not in list", "")
-                LOGGER.info('No hazard with name %s', name)
-                return None
-            sel_ev = sel_ev[new_sel]
-
-        # filter centroids
-        sel_cen = self.centroids.select_mask(reg_id=reg_id, extent=extent)
-        if not np.any(sel_cen):
-            LOGGER.info('No hazard centroids within extent and region')
-            return None
-
+        all_cen = np.all(sel_cen)
+        # a window of a raster: shift the columns of the selected events
+        window = None if all_cen else self.centroids.select_window(sel_cen)
         sel_cen = sel_cen.nonzero()[0]
         for (var_name, var_val) in self.__dict__.items():
             if isinstance(var_val, np.ndarray) and var_val.ndim == 1 \
                     and var_val.size > 0:
                 setattr(haz, var_name, var_val[sel_ev])
             elif isinstance(var_val, sparse.csr_matrix):
-                setattr(haz, var_name, var_val[sel_ev, :][:, sel_cen])
+                if all_cen:
+                    setattr(haz, var_name, var_val[sel_ev, :])
+                elif window is not None:
+                    setattr(haz, var_name, self._shift_grid_columns(
+                        var_val[sel_ev, :], self.centroids.meta['width'],
+                        (window.height, window.width), (-window.row_off, -window.col_off)))
+                else:
+                    # select the centroids on the column-major matrix
+                    setattr(haz, var_name,
+                            self._get_csc(var_name)[:, sel_cen][sel_ev, :].tocsr())
             elif isinstance(var_val, list) and var_val:
                 setattr(haz, var_name, [var_val[idx] for idx in sel_ev])
             elif var_name == 'centroids':
@@ -767,6 +843,65 @@ class Hazard():
         haz.sanitize_event_ids()
         return haz
 
+    def _select_idx(self, event_names=None, date=None, orig=None, reg_id=None,
+                    extent=None):
+        """Positions of the events and centroids matching the criteria of
+        select, see select.
+
+        Returns
+        -------
+        sel_ev : np.array
+            positions of the selected events
+        sel_cen : np.array
+            mask of the selected centroids
+        None if no event or no centroid matches the criteria.
+        """
+        #filter events
+        sel_ev = np.ones(self.event_id.size, dtype=bool)
+
+        # filter events by date
+        if date is not None:
+            date_ini, date_end = date
+            if isinstance(date_ini, str):
+                date_ini = u_dt.str_to_date(date[0])
+                date_end = u_dt.str_to_date(date[1])
+            date_sort, date_sorted = self._event_index('date')
+            sel_date = np.zeros(self.event_id.size, dtype=bool)
+            sel_date[date_sort[np.searchsorted(date_sorted, date_ini, side='left'):
+                               np.searchsorted(date_sorted, date_end, side='right')]] = True
+            sel_ev &= sel_date
+            if not np.any(sel_ev):
+                LOGGER.info('No hazard in date range %s.', date)
+                return None
+
+        # filter events hist/synthetic
+        if isinstance(orig, bool):
+            sel_ev &= (self.orig.astype(bool) == orig)
+            if not np.any(sel_ev):
+                LOGGER.info('No hazard with %s tracks.', str(orig))
+                return None
+
+        # filter events based on name: first event of each name among the
+        # ones selected so far
+        if isinstance(event_names, list):
+            new_sel = []
+            for name in event_names:
+                row = next((row for row in self._event_name_pos(name) if sel_ev[row]), None)
+                if row is None:
+                    LOGGER.info('No hazard with name %s', name)
+                    return None
+                new_sel.append(row)
+            sel_ev = np.array(new_sel, dtype=int)
+        else:
+            sel_ev = np.argwhere(sel_ev).reshape(-1)
+
+        # filter centroids
+        sel_cen = self.centroids.select_mask(reg_id=reg_id, extent=extent)
+        if not np.any(sel_cen):
+            LOGGER.info('No hazard centroids within extent and region')
+            return None
+        return sel_ev, sel_cen
+
     def select_tight(self, buffer=NEAREST_NEIGHBOR_THRESHOLD/ONE_LAT_KM,
                      val='intensity'):
         """
@@ -798,9 +933,9 @@ class Hazard():
         """
 
         if val == 'intensity':
-            cent_nz = (self.intensity != 0).sum(axis=0).nonzero()[1]
+            cent_nz = (self.get_intensity() != 0).sum(axis=0).nonzero()[1]
         if val == 'fraction':
-            cent_nz = (self.fraction != 0).sum(axis=0).nonzero()[1]
+            cent_nz = (self.get_fraction() != 0).sum(axis=0).nonzero()[1]
         lon_nz = self.centroids.lon[cent_nz]
         lat_nz = self.centroids.lat[cent_nz]
         ext = u_coord.latlon_bounds(lat=lat_nz, lon=lon_nz, buffer=buffer)
@@ -824,25 +959,32 @@ class Hazard():
                 LOGGER.warning('Return period %1.1f exceeds max. event return period.', period)
         LOGGER.info('Computing exceedance intenstiy map for return periods: %s',
                     return_periods)
+        intensity, intensity_csc = self.intensity, self.intensity_csc
+        if self.intensity_quantization is not None:
+            intensity = self.get_intensity()
+            intensity_csc = sparse.csc_matrix(
+                (u_dtype.dequantize(intensity_csc.data, *self.intensity_quantization),
+                 intensity_csc.indices, intensity_csc.indptr), shape=intensity_csc.shape)
         num_cen = self.intensity.shape[1]
         inten_stats = np.zeros((len(return_periods), num_cen))
         cen_step = CONFIG.max_matrix_size.int() // self.intensity.shape[0]
         if not cen_step:
             raise ValueError('Increase max_matrix_size configuration parameter to > %s'
                              % str(self.intensity.shape[0]))
-        # separte in chunks
-        chk = -1
-        for chk in range(int(num_cen / cen_step)):
-            self._loc_return_inten(
-                np.array(return_periods),
-                self.intensity[:, chk * cen_step:(chk + 1) * cen_step].toarray(),
-                inten_stats[:, chk * cen_step:(chk + 1) * cen_step])
-        self._loc_return_inten(
-            np.array(return_periods),
-            self.intensity[:, (chk + 1) * cen_step:].toarray(),
-            inten_stats[:, (chk + 1) * cen_step:])
+        # separte in chunks, fitted from the nonzeros of each column if
+        # the intensities below threshold, zeros included, are not fitted
+        for ini in range(0, num_cen, cen_step):
+            if self.intensity_thres >= 0:
+                inten_stats[:, ini:ini + cen_step] = u_interp.local_exceedance_fit(
+                    intensity_csc[:, ini:ini + cen_step], self.frequency,
+                    np.array(return_periods), self.intensity_thres)
+            else:
+                self._loc_return_inten(
+                    np.array(return_periods),
+                    intensity[:, ini:ini + cen_step].toarray(),
+                    inten_stats[:, ini:ini + cen_step])
         # set values below 0 to zero if minimum of hazard.intensity >= 0:
-        if self.intensity.min() >= 0 and np.min(inten_stats) < 0:
+        if intensity.min() >= 0 and np.min(inten_stats) < 0:
             LOGGER.warning('Exceedance intenstiy values below 0 are set to 0. \
                    Reason: no negative intensity values were found in hazard.')
             inten_stats[inten_stats < 0] = 0
@@ -924,12 +1066,12 @@ class Hazard():
         if event is not None:
             if isinstance(event, str):
                 event = self.get_event_id(event)
-            return self._event_plot(event, self.intensity, col_label,
+            return self._event_plot(event, self.get_intensity(), col_label,
                                     smooth, crs_epsg, axis, adapt_fontsize=adapt_fontsize, **kwargs)
         if centr is not None:
             if isinstance(centr, tuple):
                 _, _, centr = self.centroids.get_closest_point(centr[0], centr[1])
-            return self._centr_plot(centr, self.intensity, col_label, axis, **kwargs)
+            return self._centr_plot(centr, self.get_intensity(), col_label, axis, **kwargs)
 
         raise ValueError("Provide one event id or one centroid id.")
 
@@ -973,12 +1115,12 @@ class Hazard():
         if event is not None:
             if isinstance(event, str):
                 event = self.get_event_id(event)
-            return self._event_plot(event, self.fraction, col_label, smooth, axis,
+            return self._event_plot(event, self.get_fraction(), col_label, smooth, axis,
                                     **kwargs)
         if centr is not None:
             if isinstance(centr, tuple):
                 _, _, centr = self.centroids.get_closest_point(centr[0], centr[1])
-            return self._centr_plot(centr, self.fraction, col_label, axis, **kwargs)
+            return self._centr_plot(centr, self.get_fraction(), col_label, axis, **kwargs)
 
         raise ValueError("Provide one event id or one centroid id.")
 
@@ -1001,8 +1143,7 @@ class Hazard():
         -------
         list_id: np.array(int)
         """
-        list_id = self.event_id[[i_name for i_name, val_name in enumerate(self.event_name)
-                                 if val_name == event_name]]
+        list_id = self.event_id[self._event_name_pos(event_name)]
         if list_id.size == 0:
             raise ValueError("No event with name: %s" % event_name)
         return list_id
@@ -1023,11 +1164,10 @@ class Hazard():
         ------
             ValueError
         """
-        try:
-            return self.event_name[np.argwhere(
-                self.event_id == event_id)[0][0]]
-        except IndexError as err:
-            raise ValueError(f"No event with id: {event_id}") from err
+        ev_pos = self._event_id_pos(event_id)
+        if ev_pos < 0:
+            raise ValueError(f"No event with id: {event_id}")
+        return self.event_name[ev_pos]
 
     def get_event_date(self, event=None):
         """Return list of date strings for given event or for all events,
@@ -1046,11 +1186,12 @@ class Hazard():
             l_dates = [u_dt.date_to_str(date) for date in self.date]
         elif isinstance(event, str):
             ev_ids = self.get_event_id(event)
-            l_dates = [
-                u_dt.date_to_str(self.date[np.argwhere(self.event_id == ev_id)[0][0]])
-                for ev_id in ev_ids]
+            l_dates = [u_dt.date_to_str(self.date[self._event_id_pos(ev_id)])
+                       for ev_id in ev_ids]
         else:
-            ev_idx = np.argwhere(self.event_id == event)[0][0]
+            ev_idx = self._event_id_pos(event)
+            if ev_idx < 0:
+                raise IndexError(f"No event with id: {event}")
             l_dates = [u_dt.date_to_str(self.date[ev_idx])]
         return l_dates
 
@@ -1063,20 +1204,16 @@ class Hazard():
             key are years, values array with event_ids of that year
 
         """
-        orig_year = np.array([dt.datetime.fromordinal(date).year
-                              for date in self.date[self.orig]])
-        orig_yearset = {}
-        for year in np.unique(orig_year):
-            orig_yearset[year] = self.event_id[self.orig][orig_year == year]
-        return orig_yearset
+        orig_year = u_dt.ordinal_to_year(self.date[self.orig])
+        year_sort = np.argsort(orig_year, kind='stable')
+        years, year_ini = np.unique(orig_year[year_sort], return_index=True)
+        return dict(zip(years, np.split(self.event_id[self.orig][year_sort], year_ini[1:])))
 
     def remove_duplicates(self):
         """Remove duplicate events (events with same name and date)."""
-        events = list(zip(self.event_name, self.date))
-        set_ev = set(events)
-        if len(set_ev) == self.event_id.size:
+        unique_pos = self._unique_events_pos()
+        if unique_pos.size == self.event_id.size:
             return
-        unique_pos = sorted([events.index(event) for event in set_ev])
         for var_name, var_val in vars(self).items():
             if isinstance(var_val, sparse.csr.csr_matrix):
                 setattr(self, var_name, var_val[unique_pos, :])
@@ -1112,6 +1249,131 @@ class Hazard():
         """Return number of events."""
         return self.event_id.size
 
+    @property
+    def intensity_csc(self):
+        """Intensity matrix in compressed sparse column format.
+
+        Selecting centroids (columns) is much faster on this matrix than on the
+        row-major `intensity`. It is built on first access and kept, as a
+        second full copy of the matrix, as long as the hazard lives. It is
+        rebuilt when `intensity` is replaced by another matrix or when its shape
+        or arrays are reallocated. Modifications of the values of `intensity`
+        in place (e.g. ``haz.intensity.data *= 2``) are not detected, call
+        `clear_csc_cache` after them.
+
+        Returns
+        -------
+        sparse.csc_matrix
+        """
+        return self._get_csc('intensity')
+
+    @property
+    def fraction_csc(self):
+        """Fraction matrix in compressed sparse column format. See `intensity_csc`.
+
+        Returns
+        -------
+        sparse.csc_matrix
+        """
+        return self._get_csc('fraction')
+
+    def set_implicit_fraction(self):
+        """Replace a fraction which is 1 at every stored intensity value by an
+        implicit fraction, see `implicit_fraction`. This is the fraction of
+        the readers without fraction data, e.g. from_raster without
+        files_fraction, and halves the memory of the hazard and the size of
+        its hdf5 files.
+
+        `fraction` then has no stored values: use get_fraction for the
+        explicit matrix. The methods of the hazard and the impact calculation
+        handle the implicit fraction, append and concat keep it only if it is
+        implicit in all hazards.
+
+        Raises
+        ------
+        ValueError
+            if the fraction is not 1 at every stored intensity value
+        """
+        if self.implicit_fraction:
+            return
+        ones = self._intensity_ones(self.fraction.dtype)
+        if self.fraction.shape != ones.shape \
+        or (ones - self.fraction.multiply(ones)).count_nonzero():
+            raise ValueError('The fraction is not 1 at every intensity value.')
+        self.fraction = sparse.csr_matrix(self.intensity.shape, dtype=self.fraction.dtype)
+        self.implicit_fraction = True
+
+    def get_fraction(self):
+        """Fraction matrix, made explicit if the fraction is implicit.
+
+        Returns
+        -------
+        sparse.csr_matrix
+            `fraction`, or, if the fraction is implicit, a new matrix with
+            value 1 at every stored intensity value
+        """
+        if not self.implicit_fraction:
+            return self.fraction
+        return self._intensity_ones(self.fraction.dtype)
+
+    def _intensity_ones(self, dtype):
+        """Matrix with value 1 at every stored intensity value.
+
+        Parameters
+        ----------
+        dtype : np.dtype
+            data type of the values
+
+        Returns
+        -------
+        sparse.csr_matrix
+        """
+        nnz = self.intensity.indptr[-1]
+        return sparse.csr_matrix((np.ones(nnz, dtype=dtype),
+                                  self.intensity.indices[:nnz].copy(),
+                                  self.intensity.indptr.copy()),
+                                 shape=self.intensity.shape)
+
+    def quantize_intensity(self):
+        """Store the intensity values as integers with a scale and an offset,
+        see climada.util.dtype.quantize. This divides the memory of the
+        values by 4 (float64) or 2 (float32), with an error of at most
+        (max - min) / 131068 of the intensity. The stored entries of
+        `intensity` are kept: no value is encoded as 0.
+
+        `intensity` then holds the integer codes, use get_intensity for the
+        values. The methods of the hazard, the impact calculation and the
+        measures decode them, methods which modify the intensity decode it
+        in place, see dequantize_intensity.
+        """
+        if self.intensity_quantization is not None:
+            return
+        data, scale, offset = u_dtype.quantize(self.intensity.data)
+        self.intensity = sparse.csr_matrix(
+            (data, self.intensity.indices, self.intensity.indptr), shape=self.intensity.shape)
+        self.intensity_quantization = (scale, offset)
+
+    def dequantize_intensity(self):
+        """Decode a quantized intensity, see quantize_intensity."""
+        self.intensity = self.get_intensity()
+        self.intensity_quantization = None
+
+    def get_intensity(self):
+        """Intensity matrix, decoded if it is quantized.
+
+        Returns
+        -------
+        sparse.csr_matrix
+            `intensity`, or, if it is quantized, a new matrix of the decoded
+            values
+        """
+        if self.intensity_quantization is None:
+            return self.intensity
+        return sparse.csr_matrix(
+            (u_dtype.dequantize(self.intensity.data, *self.intensity_quantization),
+             self.intensity.indices.copy(), self.intensity.indptr.copy()),
+            shape=self.intensity.shape)
+
     def write_raster(self, file_name, intensity=True):
         """Write intensity or fraction as GeoTIFF file. Each band is an event
 
@@ -1122,9 +1384,9 @@ class Hazard():
         intensity: bool
             if True, write intensity, otherwise write fraction
         """
-        variable = self.intensity
+        variable = self.get_intensity()
         if not intensity:
-            variable = self.fraction
+            variable = self.get_fraction()
         if self.centroids.meta:
             u_coord.write_raster(file_name, variable.toarray(), self.centroids.meta)
         else:
@@ -1142,18 +1404,61 @@ class Hazard():
                         all_touched=True, dtype=profile['dtype'], )
                     dst.write(raster.astype(profile['dtype']), i_ev + 1)
 
-    def write_hdf5(self, file_name, todense=False):
+    def write_hdf5(self, file_name, todense=False, compression=None, events_per_chunk=None,
+                   quantize=False):
         """Write hazard in hdf5 format.
 
+        The datasets of the events (rows of the matrices, 1-dimensional arrays
+        of size num_events) are chunked by blocks of events, so that reading
+        a block of events, e.g. with from_hdf5_event_blocks or LazyHazard,
+        only decompresses the chunks of this block. Without compression and
+        chunking, the datasets are contiguous and can be memory-mapped by
+        LazyHazard.
+
         Parameters
         ----------
         file_name: str
             file name to write, with h5 format
+        todense: bool, optional
+            write the matrices as dense arrays instead of csr groups.
+            Default: False
+        compression : str, optional
+            hdf5 compression filter, e.g. 'gzip' or 'lzf'. Default: None
+        events_per_chunk : int, optional
+            number of events per chunk of the event datasets. For the data
+            and indices of the csr matrices, the average number of nonzeros of
+            this number of events. Default: None, contiguous datasets without
+            compression, HDF5_EVENTS_PER_CHUNK with compression
+        quantize : bool, optional
+            write the intensity values quantized, see quantize_intensity. A
+            quantized intensity is always written quantized. The reader
+            decodes them. Default: False
+
+        Raises
+        ------
+        ValueError
+            if a quantized intensity is written dense
         """
+        quantization = self.intensity_quantization
+        intensity = self.intensity
+        if quantize and quantization is None:
+            data, scale, offset = u_dtype.quantize(self.intensity.data)
+            intensity = sparse.csr_matrix((data, intensity.indices, intensity.indptr),
+                                          shape=intensity.shape)
+            quantization = (scale, offset)
+        if todense and quantization is not None:
+            raise ValueError('A quantized intensity can not be written dense.')
         LOGGER.info('Writing %s', file_name)
+        if compression is not None and events_per_chunk is None:
+            events_per_chunk = HDF5_EVENTS_PER_CHUNK
+        num_ev = self.event_id.size
         hf_data = h5py.File(file_name, 'w')
         str_dt = h5py.special_dtype(vlen=str)
         for (var_name, var_val) in self.__dict__.items():
+            if var_name == 'intensity':
+                var_val = intensity
+            if var_name in ('intensity_quantization', 'implicit_fraction'):
+                continue
             if var_name == 'centroids':
                 self.centroids.write_hdf5(hf_data.create_group(var_name))
             elif var_name == 'tag':
@@ -1165,24 +1470,66 @@ class Hazard():
                 hf_str[0] = str(var_val.description)
             elif isinstance(var_val, sparse.csr_matrix):
                 if todense:
-                    hf_data.create_dataset(var_name, data=var_val.toarray())
+                    self._write_hdf5_dataset(hf_data, var_name, var_val.toarray(),
+                                             events_per_chunk, compression)
+                    hf_csr = hf_data[var_name]
                 else:
                     hf_csr = hf_data.create_group(var_name)
-                    hf_csr.create_dataset('data', data=var_val.data)
-                    hf_csr.create_dataset('indices', data=var_val.indices)
-                    hf_csr.create_dataset('indptr', data=var_val.indptr)
+                    nnz_per_chunk = None if events_per_chunk is None else \
+                        -(-var_val.nnz * events_per_chunk // max(var_val.shape[0], 1))
+                    self._write_hdf5_dataset(hf_csr, 'data', var_val.data,
+                                             nnz_per_chunk, compression)
+                    self._write_hdf5_dataset(hf_csr, 'indices', var_val.indices,
+                                             nnz_per_chunk, compression)
+                    self._write_hdf5_dataset(hf_csr, 'indptr', var_val.indptr,
+                                             events_per_chunk, compression)
                     hf_csr.attrs['shape'] = var_val.shape
+                if var_name == 'intensity' and quantization is not None:
+                    hf_csr.attrs['scale'], hf_csr.attrs['offset'] = quantization
+                if var_name == 'fraction' and self.implicit_fraction:
+                    hf_csr.attrs['implicit'] = True
             elif isinstance(var_val, str):
                 hf_str = hf_data.create_dataset(var_name, (1,), dtype=str_dt)
                 hf_str[0] = var_val
             elif isinstance(var_val, list) and var_val and isinstance(var_val[0], str):
-                hf_str = hf_data.create_dataset(var_name, (len(var_val),), dtype=str_dt)
-                for i_ev, var_ev in enumerate(var_val):
-                    hf_str[i_ev] = var_ev
+                hf_data.create_dataset(var_name, data=np.array(var_val, dtype=object),
+                                       dtype=str_dt)
+            elif isinstance(var_val, np.ndarray) and var_val.ndim == 1 \
+            and var_val.size == num_ev:
+                self._write_hdf5_dataset(hf_data, var_name, var_val,
+                                         events_per_chunk, compression)
             elif var_val is not None and var_name != 'pool':
                 hf_data.create_dataset(var_name, data=var_val)
         hf_data.close()
 
+    @staticmethod
+    def _write_hdf5_dataset(hf_group, name, data, chunk_len, compression):
+        """Create a dataset chunked along its first dimension.
+
+        Parameters
+        ----------
+        hf_group : h5py.Group
+            group of the dataset
+        name : str
+            name of the dataset
+        data : np.array
+            values of the dataset
+        chunk_len : int or None
+            length of the chunks along the first dimension, reduced to the
+            length of the data and to at most HDF5_MAX_CHUNK_SIZE elements per
+            chunk. None for a contiguous dataset without compression.
+        compression : str or None
+            hdf5 compression filter
+        """
+        data = np.asarray(data)
+        if chunk_len is None or not data.size:
+            hf_group.create_dataset(name, data=data)
+            return
+        row_size = data.size // data.shape[0]
+        chunk_len = max(1, min(int(chunk_len), data.shape[0], HDF5_MAX_CHUNK_SIZE // row_size))
+        hf_group.create_dataset(name, data=data, chunks=(chunk_len,) + data.shape[1:],
+                                compression=compression)
+
     def read_hdf5(self, *args, **kwargs):
         """This function is deprecated, use Hazard.from_hdf5."""
         LOGGER.warning("The use of Hazard.read_hdf5 is deprecated."
@@ -1190,23 +1537,72 @@ class Hazard():
         self.__dict__ = Hazard.from_hdf5(*args, **kwargs).__dict__
 
     @classmethod
-    def from_hdf5(cls, file_name):
+    def from_hdf5(cls, file_name, lazy=False, quantized=False):
         """Read hazard in hdf5 format.
 
         Parameters
         ----------
         file_name: str
             file name to read, with h5 format
+        lazy : bool, optional
+            if True, keep the file open and only read the matrices when they
+            are accessed, see LazyHazard. Default: False
+        quantized : bool, optional
+            keep a quantized intensity of the file quantized in memory, see
+            quantize_intensity. Not applied with lazy. Default: False
 
         Returns
         -------
-        haz : climada.hazard.Hazard
+        haz : climada.hazard.Hazard or climada.hazard.LazyHazard
             Hazard object from the provided MATLAB file
 
         """
+        if lazy:
+            return LazyHazard(file_name, cls)
         LOGGER.info('Reading %s', file_name)
-        haz = cls()
         hf_data = h5py.File(file_name, 'r')
+        haz = cls._read_hdf5_data(hf_data)
+        haz._set_hdf5_quantization(hf_data, quantized)
+        hf_data.close()
+        haz._set_float_dtype()
+        return haz
+
+    def _set_hdf5_quantization(self, hf_data, quantized):
+        """Decode the intensity read from a file written by write_hdf5 if it
+        is quantized in the file, or keep it quantized.
+
+        Parameters
+        ----------
+        hf_data : h5py.File
+            open hdf5 file
+        quantized : bool
+            keep the intensity quantized
+        """
+        hf_csr = hf_data.get('intensity')
+        if not isinstance(hf_csr, h5py.Group) or 'scale' not in hf_csr.attrs:
+            return
+        self.intensity_quantization = (float(hf_csr.attrs['scale']),
+                                       float(hf_csr.attrs['offset']))
+        if not quantized:
+            self.dequantize_intensity()
+
+    @classmethod
+    def _read_hdf5_data(cls, hf_data, read_matrices=True):
+        """Build a hazard from an open hdf5 file written by write_hdf5.
+
+        Parameters
+        ----------
+        hf_data : h5py.File
+            open hdf5 file
+        read_matrices : bool, optional
+            if False, the sparse matrices are empty matrices of the shape of
+            the ones in the file. Default: True
+
+        Returns
+        -------
+        haz : climada.hazard.Hazard
+        """
+        haz = cls()
         for (var_name, var_val) in haz.__dict__.items():
             if var_name != 'tag' and var_name not in hf_data.keys():
                 continue
@@ -1220,7 +1616,9 @@ class Hazard():
                 setattr(haz, var_name, np.array(hf_data.get(var_name)))
             elif isinstance(var_val, sparse.csr_matrix):
                 hf_csr = hf_data.get(var_name)
-                if isinstance(hf_csr, h5py.Dataset):
+                if not read_matrices:
+                    setattr(haz, var_name, sparse.csr_matrix(cls._hdf5_matrix_shape(hf_csr)))
+                elif isinstance(hf_csr, h5py.Dataset):
                     setattr(haz, var_name, sparse.csr_matrix(hf_csr))
                 else:
                     setattr(haz, var_name, sparse.csr_matrix((hf_csr['data'][:],
@@ -1234,21 +1632,268 @@ class Hazard():
                 setattr(haz, var_name, var_value)
             else:
                 setattr(haz, var_name, hf_data.get(var_name))
-
-        hf_data.close()
+        if cls._hdf5_implicit_fraction(hf_data):
+            haz.implicit_fraction = True
         return haz
 
+    @staticmethod
+    def _hdf5_implicit_fraction(hf_data):
+        """Whether the fraction of a file written by write_hdf5 is implicit,
+        see implicit_fraction.
+
+        Parameters
+        ----------
+        hf_data : h5py.File
+            open hdf5 file
+
+        Returns
+        -------
+        bool
+        """
+        hf_fract = hf_data.get('fraction')
+        return hf_fract is not None and bool(hf_fract.attrs.get('implicit', False))
+
+    @classmethod
+    def from_hdf5_event_blocks(cls, file_name, events_per_block, quantized=False):
+        """Read hazard in hdf5 format as successive blocks of events.
+
+        Only the rows of the intensity and fraction matrices belonging to a
+        block are read from the file, so that hazards which do not fit in
+        memory can be processed block by block, e.g. with
+        Impact.calc_event_blocks. All blocks share the same Centroids object.
+
+        Parameters
+        ----------
+        file_name: str
+            file name to read, with h5 format
+        events_per_block: int
+            maximum number of events per block
+        quantized : bool, optional
+            keep a quantized intensity of the file quantized in memory, see
+            quantize_intensity. Default: False
+
+        Yields
+        ------
+        haz : climada.hazard.Hazard
+            Hazard object with the next events_per_block events of the file
+        """
+        if events_per_block < 1:
+            raise ValueError('events_per_block must be positive: %s' % events_per_block)
+        LOGGER.info('Reading %s in blocks of %s events', file_name, events_per_block)
+        with h5py.File(file_name, 'r') as hf_data:
+            centroids = Centroids.from_hdf5(hf_data.get('centroids'))
+            num_ev = hf_data.get('event_id').size
+            for ini in range(0, num_ev, events_per_block):
+                end = min(ini + events_per_block, num_ev)
+                haz = cls()
+                for (var_name, var_val) in haz.__dict__.items():
+                    if var_name != 'tag' and var_name not in hf_data.keys():
+                        continue
+                    if var_name == 'centroids':
+                        haz.centroids = centroids
+                    elif var_name == 'tag':
+                        haz.tag.haz_type = u_hdf5.to_string(hf_data.get('haz_type')[0])
+                        haz.tag.file_name = u_hdf5.to_string(hf_data.get('file_name')[0])
+                        haz.tag.description = u_hdf5.to_string(hf_data.get('description')[0])
+                    elif isinstance(var_val, np.ndarray) and var_val.ndim == 1:
+                        setattr(haz, var_name, np.array(hf_data.get(var_name)[ini:end]))
+                    elif isinstance(var_val, sparse.csr_matrix):
+                        setattr(haz, var_name,
+                                cls._read_hdf5_csr_rows(hf_data.get(var_name), ini, end))
+                    elif isinstance(var_val, str):
+                        setattr(haz, var_name, u_hdf5.to_string(hf_data.get(var_name)[0]))
+                    elif isinstance(var_val, list):
+                        setattr(haz, var_name, [x for x in map(
+                            u_hdf5.to_string, np.array(hf_data.get(var_name)[ini:end]).tolist())])
+                    else:
+                        setattr(haz, var_name, hf_data.get(var_name))
+                if cls._hdf5_implicit_fraction(hf_data):
+                    haz.implicit_fraction = True
+                haz._set_hdf5_quantization(hf_data, quantized)
+                haz._set_float_dtype()
+                yield haz
+
+    @staticmethod
+    def _hdf5_matrix_shape(hf_csr):
+        """Shape of a sparse matrix written by write_hdf5, either as csr group
+        or as dense dataset.
+
+        Parameters
+        ----------
+        hf_csr : h5py.Group or h5py.Dataset
+            matrix in the hdf5 file
+
+        Returns
+        -------
+        tuple(int, int)
+        """
+        shape = hf_csr.shape if isinstance(hf_csr, h5py.Dataset) else hf_csr.attrs['shape']
+        return int(shape[0]), int(shape[1])
+
+    @staticmethod
+    def _read_hdf5_csr_rows(hf_csr, ini, end):
+        """Read rows ini to end (excluded) of a sparse matrix written by
+        write_hdf5, either as csr group or as dense dataset.
+
+        Parameters
+        ----------
+        hf_csr : h5py.Group or h5py.Dataset
+            matrix in the hdf5 file
+        ini : int
+            first row to read
+        end : int
+            row after the last row to read
+
+        Returns
+        -------
+        sparse.csr_matrix
+        """
+        if isinstance(hf_csr, h5py.Dataset):
+            return sparse.csr_matrix(hf_csr[ini:end])
+        indptr = hf_csr['indptr'][ini:end + 1]
+        return sparse.csr_matrix((hf_csr['data'][indptr[0]:indptr[-1]],
+                                  hf_csr['indices'][indptr[0]:indptr[-1]],
+                                  indptr - indptr[0]),
+                                 shape=(end - ini, hf_csr.attrs['shape'][1]))
+
+    def clear_csc_cache(self):
+        """Drop the cached CSC copies of `intensity` and `fraction` (see
+        `intensity_csc`). Call it after modifying the values of these matrices
+        in place, or to release the memory of the copies.
+        """
+        _CSC_CACHE.pop(self, None)
+
+    def _get_csc(self, attr_name):
+        """Get the cached CSC copy of a sparse matrix attribute, build it if the
+        attribute has been replaced or reallocated since the last call.
+
+        Parameters
+        ----------
+        attr_name : str
+            name of the sparse matrix attribute, e.g. 'intensity'
+
+        Returns
+        -------
+        sparse.csc_matrix
+        """
+        matrix = getattr(self, attr_name)
+        signature = self._csr_signature(matrix)
+        haz_cache = _CSC_CACHE.setdefault(self, dict())
+        if attr_name in haz_cache:
+            matrix_ref, matrix_signature, matrix_csc = haz_cache[attr_name]
+            if matrix_ref() is matrix and matrix_signature == signature:
+                return matrix_csc
+        matrix_csc = matrix.tocsc()
+        haz_cache[attr_name] = (weakref.ref(matrix), signature, matrix_csc)
+        return matrix_csc
+
+    @staticmethod
+    def _csr_signature(matrix):
+        """Shape, dtype and buffer addresses of a sparse matrix. Detects in
+        constant time the modifications which reallocate its arrays (e.g.
+        eliminate_zeros, setting new entries), but not value changes in place.
+
+        Parameters
+        ----------
+        matrix : sparse.csr_matrix
+
+        Returns
+        -------
+        tuple
+        """
+        return (matrix.shape, matrix.nnz, matrix.data.dtype.str,
+                matrix.data.__array_interface__['data'][0],
+                matrix.indices.__array_interface__['data'][0],
+                matrix.indptr.__array_interface__['data'][0])
+
+    def _set_float_dtype(self):
+        """Store the sparse matrices with the data type of the float_dtype
+        configuration parameter, see climada.util.dtype.as_float_dtype"""
+        for var_name, var_val in list(self.__dict__.items()):
+            if var_name == 'intensity' and self.intensity_quantization is not None:
+                continue
+            if isinstance(var_val, sparse.csr_matrix):
+                setattr(self, var_name, u_dtype.as_float_dtype(var_val))
+
     def _set_coords_centroids(self):
         """If centroids are raster, set lat and lon coordinates"""
         if self.centroids.meta and not self.centroids.coord.size:
             self.centroids.set_meta_to_lat_lon()
 
-    def _events_set(self):
-        """Generate set of tuples with (event_name, event_date)"""
-        ev_set = set()
-        for ev_name, ev_date in zip(self.event_name, self.date):
-            ev_set.add((ev_name, ev_date))
-        return ev_set
+    def _event_index(self, index_name):
+        """Lookup index of the events, built on first use and rebuilt when
+        event_name, event_id or date are replaced or resized. Changes of
+        single elements in place are not detected.
+
+        Parameters
+        ----------
+        index_name : str
+            'name': dict of the first position of every event name, and dict of
+            all the positions, ascending, of the names of several events.
+            'id': positions sorting event_id.
+            'date': positions sorting date and the sorted dates.
+
+        Returns
+        -------
+        tuple(dict, dict) or np.array or tuple(np.array, np.array)
+        """
+        ev_attrs = (self.event_name, self.event_id, self.date)
+        ev_sizes = tuple(len(ev_attr) for ev_attr in ev_attrs)
+        ev_index = _EVENT_INDEX_CACHE.get(self)
+        if ev_index is None or ev_index['sizes'] != ev_sizes \
+        or any(attr is not attr_idx for attr, attr_idx in zip(ev_attrs, ev_index['attrs'])):
+            ev_index = {'attrs': ev_attrs, 'sizes': ev_sizes}
+            _EVENT_INDEX_CACHE[self] = ev_index
+        if index_name not in ev_index:
+            if index_name == 'name':
+                num_ev = len(self.event_name)
+                first_rows = dict(zip(reversed(self.event_name), range(num_ev - 1, -1, -1)))
+                name_rows = dict()
+                if len(first_rows) < num_ev:
+                    for row, name in enumerate(self.event_name):
+                        if first_rows[name] != row:
+                            name_rows.setdefault(name, [first_rows[name]]).append(row)
+                ev_index[index_name] = (first_rows, name_rows)
+            elif index_name == 'id':
+                ev_index[index_name] = np.argsort(self.event_id, kind='stable')
+            elif index_name == 'date':
+                date_sort = np.argsort(self.date, kind='stable')
+                ev_index[index_name] = (date_sort, self.date[date_sort])
+            else:
+                raise ValueError(f"Unknown event index: {index_name}")
+        return ev_index[index_name]
+
+    def _event_name_pos(self, event_name):
+        """Positions of the events with the given name, ascending"""
+        first_rows, name_rows = self._event_index('name')
+        if event_name in name_rows:
+            return name_rows[event_name]
+        if event_name in first_rows:
+            return [first_rows[event_name]]
+        return []
+
+    def _event_id_pos(self, event_id):
+        """Position of the first event with the given id, -1 if not found"""
+        id_sort = self._event_index('id')
+        pos = np.searchsorted(self.event_id, event_id, sorter=id_sort)
+        if pos < id_sort.size and self.event_id[id_sort[pos]] == event_id:
+            return id_sort[pos]
+        return -1
+
+    def _unique_events_pos(self):
+        """Positions of the first event of every (event_name, date) pair,
+        ascending"""
+        first_rows, name_rows = self._event_index('name')
+        if not name_rows:
+            return np.arange(len(self.event_name))
+        unique_pos = [row for name, row in first_rows.items() if name not in name_rows]
+        for rows in name_rows.values():
+            dates = set()
+            for row in rows:
+                if self.date[row] not in dates:
+                    dates.add(self.date[row])
+                    unique_pos.append(row)
+        return np.sort(np.array(unique_pos, dtype=int))
 
     def _event_plot(self, event_id, mat_var, col_name, smooth, crs_espg, axis=None,
                     figsize=(9, 13), adapt_fontsize=True, **kwargs):
@@ -1414,6 +2059,8 @@ class Hazard():
 
         u_check.check_oligatories(self.__dict__, self.vars_oblig, 'Hazard.',
                                   num_ev, num_ev, num_cen)
+        if self.implicit_fraction and self.fraction.nnz:
+            raise ValueError("An implicit fraction has stored values.")
         u_check.check_optionals(self.__dict__, self.vars_opt, 'Hazard.', num_ev)
         self.event_name = u_check.array_default(num_ev, self.event_name,
                                                 'Hazard.event_name', list(self.event_id))
@@ -1421,7 +2068,7 @@ class Hazard():
                                           np.ones(self.event_id.shape, dtype=int))
         self.orig = u_check.array_default(num_ev, self.orig, 'Hazard.orig',
                                           np.zeros(self.event_id.shape, dtype=bool))
-        if len(self._events_set()) != num_ev:
+        if self._unique_events_pos().size != num_ev:
             raise ValueError("There are events with same date and name.")
 
     @staticmethod
@@ -1550,6 +2197,10 @@ class Hazard():
         - Lists, 1-dimensional arrays (NumPy) and sparse CSR matrices (SciPy) are concatenated.
         Sparse matrices are concatenated along the first (vertical) axis.
 
+        - The fraction stays implicit if it is implicit in all hazards (see
+        `implicit_fraction`), otherwise the implicit fractions are made explicit.
+        Quantized intensities are decoded (see `quantize_intensity`).
+
         - All `tag` attributes are appended to `self.tag`.
 
         For any other type of attribute: A ValueError is raised if an attribute of that name is
@@ -1616,32 +2267,104 @@ class Hazard():
                 self.tag.append(haz.tag)
 
         # map individual centroids objects to union
-        centroids = Centroids.union(*[haz.centroids for haz in haz_list])
-        hazcent_in_cent_idx_list = [
-            u_coord.assign_coordinates(haz.centroids.coord, centroids.coord, threshold=0)
-            for haz in haz_list_nonempty
-        ]
+        cent_list = [haz.centroids for haz in haz_list
+                     if haz.centroids.size > 0 or haz.centroids.meta]
+        if self._same_centroids(cent_list):
+            # the union is any of the centroids and the columns are unchanged
+            centroids = copy.deepcopy(cent_list[0] if cent_list else self.centroids)
+            hazcent_in_cent_idx_list = None
+        else:
+            centroids = Centroids.union(*[haz.centroids for haz in haz_list])
+            hazcent_in_cent_idx_list = [
+                u_coord.assign_coordinates(haz.centroids.coord, centroids.coord, threshold=0)
+                for haz in haz_list_nonempty
+            ]
+
+        # implicit fractions are made explicit if appended to explicit ones,
+        # quantized intensities are decoded
+        mat_lists = dict()
+        implicit_fract = all(haz.implicit_fraction for haz in haz_list_nonempty)
+        if not implicit_fract:
+            mat_lists['fraction'] = [haz.get_fraction() for haz in haz_list_nonempty]
+        if haz_list_nonempty:
+            self.implicit_fraction = implicit_fract
+        if any(haz.intensity_quantization is not None for haz in haz_list_nonempty):
+            mat_lists['intensity'] = [haz.get_intensity() for haz in haz_list_nonempty]
+            self.intensity_quantization = None
 
         # concatenate array and list attributes of non-empty hazards
         for attr_name in attributes:
-            attr_val_list = [getattr(haz, attr_name) for haz in haz_list_nonempty]
+            attr_val_list = mat_lists.get(attr_name,
+                                          [getattr(haz, attr_name) for haz in haz_list_nonempty])
             if isinstance(attr_val_list[0], sparse.csr.csr_matrix):
                 # map sparse matrix onto centroids
-                setattr(self, attr_name, sparse.vstack([
-                    sparse.csr_matrix(
-                        (matrix.data, cent_idx[matrix.indices], matrix.indptr),
-                        shape=(matrix.shape[0], centroids.size)
-                    )
-                    for matrix, cent_idx in zip(attr_val_list, hazcent_in_cent_idx_list)
-                ], format='csr'))
+                setattr(self, attr_name, self._stack_csr(attr_val_list, centroids.size,
+                                                         hazcent_in_cent_idx_list))
             elif isinstance(attr_val_list[0], np.ndarray) and attr_val_list[0].ndim == 1:
                 setattr(self, attr_name, np.hstack(attr_val_list))
             elif isinstance(attr_val_list[0], list):
-                setattr(self, attr_name, sum(attr_val_list, []))
+                setattr(self, attr_name, list(itertools.chain.from_iterable(attr_val_list)))
 
         self.centroids = centroids
+        self._set_float_dtype()
         self.sanitize_event_ids()
 
+    @staticmethod
+    def _same_centroids(cent_list):
+        """Check if all centroids are identical, by identity or with
+        Centroids.equal once per distinct object.
+
+        Parameters
+        ----------
+        cent_list : list(Centroids)
+
+        Returns
+        -------
+        bool
+        """
+        cent_ids = {id(cent_list[0])} if cent_list else set()
+        for centr in cent_list[1:]:
+            if id(centr) in cent_ids:
+                continue
+            if not cent_list[0].equal(centr):
+                return False
+            cent_ids.add(id(centr))
+        return True
+
+    @staticmethod
+    def _stack_csr(mat_list, num_cols, col_map_list=None):
+        """Stack csr matrices vertically, building the result directly from the
+        concatenated data and indices and the cumulated indptr.
+
+        Parameters
+        ----------
+        mat_list : list(sparse.csr_matrix)
+            matrices to stack
+        num_cols : int
+            number of columns of the result
+        col_map_list : list(np.array), optional
+            column of the result of every column of each matrix. Default:
+            None, the columns are unchanged
+
+        Returns
+        -------
+        sparse.csr_matrix
+        """
+        nnz = np.cumsum([0] + [mat.indptr[-1] for mat in mat_list])
+        idx_dtype = u_dtype.index_dtype(max(nnz[-1], num_cols))
+        if col_map_list is None:
+            indices = [mat.indices[:mat.indptr[-1]] for mat in mat_list]
+        else:
+            indices = [col_map[mat.indices[:mat.indptr[-1]]]
+                       for mat, col_map in zip(mat_list, col_map_list)]
+        indptr = [np.zeros(1, dtype=idx_dtype)] + [
+            mat.indptr[1:] + mat_nnz for mat, mat_nnz in zip(mat_list, nnz[:-1])]
+        return sparse.csr_matrix(
+            (np.concatenate([mat.data[:mat.indptr[-1]] for mat in mat_list]),
+             np.concatenate(indices).astype(idx_dtype, copy=False),
+             np.concatenate(indptr).astype(idx_dtype, copy=False)),
+            shape=(sum(mat.shape[0] for mat in mat_list), num_cols))
+
     @classmethod
     def concat(cls, haz_list):
         """
@@ -1719,11 +2442,41 @@ class Hazard():
         ValueError
 
 
+        If both centroids are rasters of the same grid and the raster of
+        self.centroids lies within centroids.meta, the intensity and fraction
+        columns are shifted instead of assigned to the nearest centroids. The
+        returned hazard then shares the arrays of the events (e.g. event_id,
+        date, frequency) with self: replace them instead of modifying them in
+        place. Lists (e.g. event_name) and the tag are copied.
+
         See Also
         --------
         util.coordinates.assign_coordinates: algorithm to match centroids.
 
         """
+        mat_names = ["intensity", "fraction"]
+        if self.centroids.meta and centroids.meta:
+            offset = self._grid_offset(self.centroids.meta, centroids.meta)
+            if offset is not None \
+            and 0 <= offset[0] <= centroids.meta['height'] - self.centroids.meta['height'] \
+            and 0 <= offset[1] <= centroids.meta['width'] - self.centroids.meta['width']:
+                # the event arrays are shared, the containers are copied
+                haz_new_cent = copy.copy(self)
+                for attr_name, attr_val in self.__dict__.items():
+                    if attr_name in ["centroids", "intensity", "fraction"] \
+                    or isinstance(attr_val, np.ndarray):
+                        continue
+                    if isinstance(attr_val, list):
+                        setattr(haz_new_cent, attr_name, list(attr_val))
+                    else:
+                        setattr(haz_new_cent, attr_name, copy.deepcopy(attr_val))
+                haz_new_cent.centroids = centroids
+                for attr_name in mat_names:
+                    setattr(haz_new_cent, attr_name, self._shift_grid_columns(
+                        getattr(self, attr_name), self.centroids.meta['width'],
+                        centroids.shape, offset))
+                return haz_new_cent
+
         # define empty hazard
         haz_new_cent = copy.deepcopy(self)
         haz_new_cent.centroids = centroids
@@ -1755,7 +2508,7 @@ class Hazard():
                              "are not of lower resolution.")
 
         # re-assign attributes intensity and fraction
-        for attr_name in ["intensity", "fraction"]:
+        for attr_name in mat_names:
             matrix = getattr(self, attr_name)
             setattr(haz_new_cent, attr_name,
                     sparse.csr_matrix(
@@ -1764,3 +2517,238 @@ class Hazard():
                     ))
 
         return haz_new_cent
+
+    @staticmethod
+    def _grid_offset(meta, meta_dst):
+        """Offset of a raster within a destination raster of the same grid.
+
+        Parameters
+        ----------
+        meta : dict
+            raster meta (crs, transform)
+        meta_dst : dict
+            destination raster meta (crs, transform)
+
+        Returns
+        -------
+        tuple(int, int) or None
+            (row, column) in the destination raster of the first point of the
+            raster. None if the rasters are not aligned: different crs,
+            resolution or rotation, or an offset of a fraction of pixel.
+        """
+        trans, trans_dst = meta['transform'], meta_dst['transform']
+        if not u_coord.equal_crs(meta['crs'], meta_dst['crs']) \
+        or trans.b or trans.d or trans_dst.b or trans_dst.d \
+        or not np.allclose([trans.a, trans.e], [trans_dst.a, trans_dst.e]):
+            return None
+        offset = np.array([(trans.f - trans_dst.f) / trans_dst.e,
+                           (trans.c - trans_dst.c) / trans_dst.a])
+        if not np.allclose(offset, np.round(offset), rtol=0, atol=1e-6):
+            return None
+        return tuple(np.round(offset).astype(int))
+
+    @staticmethod
+    def _shift_grid_columns(mat, width, shape_dst, offset):
+        """Move the columns of a matrix on the points of a raster onto the
+        points of a destination raster of the same grid. Points outside of the
+        destination raster are dropped.
+
+        Parameters
+        ----------
+        mat : sparse.csr_matrix
+            matrix with one column per raster point
+        width : int
+            width of the raster
+        shape_dst : tuple(int, int)
+            (height, width) of the destination raster
+        offset : tuple(int, int)
+            (row, column) in the destination raster of the first raster point
+
+        Returns
+        -------
+        sparse.csr_matrix
+            matrix with one column per destination raster point
+        """
+        num_cols = int(shape_dst[0] * shape_dst[1])
+        row, col = np.divmod(mat.indices[:mat.indptr[-1]].astype(np.int64), width)
+        row += offset[0]
+        col += offset[1]
+        in_dst = (row >= 0) & (row < shape_dst[0]) & (col >= 0) & (col < shape_dst[1])
+        indices = row * shape_dst[1] + col
+        if in_dst.all():
+            data, indptr = mat.data[:mat.indptr[-1]].copy(), mat.indptr.copy()
+        else:
+            # row-major order is kept: the indices stay sorted in every row
+            data, indices = mat.data[:mat.indptr[-1]][in_dst], indices[in_dst]
+            indptr = np.append(0, np.cumsum(in_dst))[mat.indptr]
+        idx_dtype = u_dtype.index_dtype(max(indices.size, num_cols))
+        return sparse.csr_matrix((data, indices.astype(idx_dtype),
+                                  indptr.astype(idx_dtype, copy=False)),
+                                 shape=(mat.shape[0], num_cols))
+
+
+class LazyHazard():
+    """Hazard of an hdf5 file written by Hazard.write_hdf5, of which the
+    sparse matrices (intensity, fraction) are only read when accessed.
+
+    The event attributes and the centroids are read when the file is opened.
+    select only restricts the events and centroids to read, and load reads
+    the selected rows of every matrix, by consecutive runs of rows through
+    their range in 'indptr'. Datasets stored contiguously and without
+    compression are memory-mapped instead of read through h5py.
+
+    The other attributes are the ones of the selected hazard, e.g. event_id,
+    centroids or size.
+
+    Attributes
+    ----------
+    file_name : str
+        name of the hdf5 file
+    """
+
+    def __init__(self, file_name, haz_class=Hazard):
+        """Open the hdf5 file and read the event attributes and centroids.
+
+        Parameters
+        ----------
+        file_name : str
+            file name to read, with h5 format
+        haz_class : type, optional
+            class of the loaded hazards. Default: Hazard
+        """
+        LOGGER.info('Opening %s', file_name)
+        self.file_name = str(file_name)
+        self._hf_data = h5py.File(file_name, 'r')
+        self._haz = haz_class._read_hdf5_data(self._hf_data, read_matrices=False)
+        self._matrix_names = [var_name for var_name, var_val in self._haz.__dict__.items()
+                              if isinstance(var_val, sparse.csr_matrix)
+                              and var_name in self._hf_data.keys()]
+        self._sel_ev = np.arange(self._haz.size)
+        self._sel_cen = np.arange(self._haz.centroids.size)
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if name in self._matrix_names:
+            return self._read_matrix(name)
+        return getattr(self._haz, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Close the hdf5 file. Loaded hazards remain valid."""
+        self._hf_data.close()
+
+    def select(self, event_names=None, date=None, orig=None, reg_id=None,
+               extent=None, reset_frequency=False):
+        """Select events and centroids matching provided criteria, without
+        reading the matrices. See Hazard.select.
+
+        Returns
+        -------
+        haz : LazyHazard or None
+            If no event matching the specified criteria is found, None is returned.
+        """
+        sel = self._haz._select_idx(event_names, date, orig, reg_id, extent)
+        if sel is None:
+            return None
+        lazy_haz = copy.copy(self)
+        lazy_haz._haz = self._haz.select(event_names=event_names, date=date, orig=orig,
+                                         reg_id=reg_id, extent=extent,
+                                         reset_frequency=reset_frequency)
+        lazy_haz._sel_ev = self._sel_ev[sel[0]]
+        lazy_haz._sel_cen = self._sel_cen[sel[1]]
+        return lazy_haz
+
+    def load(self):
+        """Read the selected events and centroids of the matrices.
+
+        Returns
+        -------
+        haz : climada.hazard.Hazard
+            hazard of the class given at opening. Attributes other than the
+            matrices are shared with this LazyHazard.
+        """
+        LOGGER.info('Reading %s events of %s', self._sel_ev.size, self.file_name)
+        haz = copy.copy(self._haz)
+        for var_name in self._matrix_names:
+            setattr(haz, var_name, self._read_matrix(var_name))
+        return haz
+
+    def get_fraction(self):
+        """Read the fraction of the selected events and centroids, made
+        explicit if it is implicit. See Hazard.get_fraction.
+
+        Returns
+        -------
+        sparse.csr_matrix
+        """
+        haz = copy.copy(self._haz)
+        haz.fraction = self.fraction
+        if haz.implicit_fraction:
+            haz.intensity = self.intensity
+        return haz.get_fraction()
+
+    def _read_matrix(self, var_name):
+        """Read the selected rows and columns of a matrix written by
+        Hazard.write_hdf5, either as csr group or as dense dataset.
+
+        Parameters
+        ----------
+        var_name : str
+            name of the matrix, e.g. 'intensity'
+
+        Returns
+        -------
+        sparse.csr_matrix
+        """
+        hf_mat = self._hf_data[var_name]
+        # read the rows in ascending order, then reorder them as selected
+        rows, row_pos = np.unique(self._sel_ev, return_inverse=True)
+        if isinstance(hf_mat, h5py.Dataset):
+            mat = sparse.csr_matrix(self._hdf5_array(hf_mat)[rows, :])
+        else:
+            num_cen = int(hf_mat.attrs['shape'][1])
+            data = self._hdf5_array(hf_mat['data'])
+            indices = self._hdf5_array(hf_mat['indices'])
+            indptr = hf_mat['indptr'][:]
+            runs = np.split(rows, np.flatnonzero(np.diff(rows) != 1) + 1)
+            mat = [sparse.csr_matrix((data[indptr[run[0]]:indptr[run[-1] + 1]],
+                                      indices[indptr[run[0]]:indptr[run[-1] + 1]],
+                                      indptr[run[0]:run[-1] + 2] - indptr[run[0]]),
+                                     shape=(run.size, num_cen))
+                   for run in runs if run.size]
+            mat = mat[0] if len(mat) == 1 else \
+                sparse.vstack([sparse.csr_matrix((0, num_cen))] + mat, format='csr')
+        if rows.size != row_pos.size or np.any(np.diff(row_pos) != 1):
+            mat = mat[row_pos]
+        if self._sel_cen.size < mat.shape[1]:
+            mat = mat.tocsc()[:, self._sel_cen].tocsr()
+        if 'scale' in hf_mat.attrs:
+            mat.data = u_dtype.dequantize(mat.data, hf_mat.attrs['scale'], hf_mat.attrs['offset'])
+        return u_dtype.as_float_dtype(mat)
+
+    @staticmethod
+    def _hdf5_array(hf_dset):
+        """Memory map of a dataset stored contiguously and without
+        compression, or the dataset itself.
+
+        Parameters
+        ----------
+        hf_dset : h5py.Dataset
+
+        Returns
+        -------
+        np.memmap or h5py.Dataset
+            Changes to the memory map are not written to the file.
+        """
+        if hf_dset.chunks is None and hf_dset.compression is None and hf_dset.size:
+            offset = hf_dset.id.get_offset()
+            if offset is not None:
+                return np.memmap(hf_dset.file.filename, dtype=hf_dset.dtype, mode='c',
+                                 offset=offset, shape=hf_dset.shape)
+        return hf_dset
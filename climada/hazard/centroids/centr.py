@@ -1009,6 +1009,31 @@ class Centroids():
             )
         return sel_cen
 
+    def select_window(self, sel_cen):
+        """Raster window of the selected centroids, if they form one.
+
+        Parameters
+        ----------
+        sel_cen : np.array
+            1d mask of selected centroids, e.g. from select_mask
+
+        Returns
+        -------
+        rasterio.windows.Window or None
+            None if the centroids are not a raster or the selected centroids
+            are not a rectangle of it
+        """
+        if not self.meta or sel_cen.size != self.size:
+            return None
+        sel_cen = sel_cen.reshape(self.shape)
+        rows = np.flatnonzero(sel_cen.any(axis=1))
+        cols = np.flatnonzero(sel_cen.any(axis=0))
+        if not rows.size or rows[-1] - rows[0] + 1 != rows.size \
+        or cols[-1] - cols[0] + 1 != cols.size \
+        or np.count_nonzero(sel_cen) != rows.size * cols.size:
+            return None
+        return rasterio.windows.Window(cols[0], rows[0], cols.size, rows.size)
+
     def set_lat_lon_to_meta(self, min_resol=1.0e-8):
         """Compute meta from lat and lon values.
 
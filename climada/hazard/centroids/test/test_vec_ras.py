@@ -712,6 +712,21 @@ class TestCentroidsFuncs(unittest.TestCase):
         np.testing.assert_array_equal(ext_centr.lon, np.array([-180, -175, 170, 175]))
         np.testing.assert_array_equal(ext_centr.lat, np.array([-5, -3, 3, 5]))
 
+    def test_select_window_pass(self):
+        """Test window of selected raster points"""
+        centr = Centroids.from_pnt_bounds((0, 0, 4, 3), 1)
+        self.assertEqual(centr.shape, (4, 5))
+        sel_cen = np.zeros(centr.shape, dtype=bool)
+        sel_cen[1:3, 2:5] = True
+        self.assertEqual(centr.select_window(sel_cen.flatten()), Window(2, 1, 3, 2))
+        # not a rectangle
+        sel_cen[0, 0] = True
+        self.assertIsNone(centr.select_window(sel_cen.flatten()))
+        self.assertIsNone(centr.select_window(np.zeros(centr.size, dtype=bool)))
+        # not a raster
+        centr = Centroids.from_lat_lon(np.array([0, 1]), np.array([0, 1]))
+        self.assertIsNone(centr.select_window(np.ones(2, dtype=bool)))
+
 # Execute Tests
 if __name__ == "__main__":
     TESTS = unittest.TestLoader().loadTestsFromTestCase(TestRaster)
@@ -577,6 +577,7 @@ class StormEurope(Hazard):
         event_ids : array
             two consecutive event ids
         """
+        self.dequantize_intensity()
         select_event_ids = np.isin(self.event_id, event_ids)
         select_other_events = np.invert(select_event_ids)
         intensity_tmp = self.intensity[select_event_ids, :].max(axis=0)
@@ -656,7 +657,7 @@ class StormEurope(Hazard):
             else:
                 pass
         else:
-            intensity = self.intensity
+            intensity = self.get_intensity()
 
         if threshold is not None:
             assert threshold >= self.intensity_thres, \
@@ -807,7 +808,7 @@ class StormEurope(Hazard):
         ssi = np.zeros(n_out)
 
         LOGGER.info('Commencing probabilistic calculations')
-        for index, intensity1d in enumerate(self.intensity):
+        for index, intensity1d in enumerate(self.get_intensity()):
             # indices for return matrix
             start = index * N_PROB_EVENTS
             end = (index + 1) * N_PROB_EVENTS
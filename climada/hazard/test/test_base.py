@@ -20,14 +20,17 @@ Test Hazard base class.
 """
 
 import unittest
+import copy
 import datetime as dt
 from pathlib import Path
+import h5py
 import numpy as np
 from scipy import sparse
+from rasterio.windows import Window
 from pathos.pools import ProcessPool as Pool
 
 from climada import CONFIG
-from climada.hazard.base import Hazard
+from climada.hazard.base import Hazard, LazyHazard, HDF5_EVENTS_PER_CHUNK
 from climada.hazard.centroids.centr import Centroids
 import climada.util.dates_times as u_dt
 from climada.util.constants import HAZ_TEMPLATE_XLS, HAZ_DEMO_FL
@@ -294,6 +297,28 @@ class TestSelect(unittest.TestCase):
         self.assertIsInstance(sel_haz.intensity, sparse.csr_matrix)
         self.assertIsInstance(sel_haz.fraction, sparse.csr_matrix)
 
+    def test_select_event_name_index_pass(self):
+        """Select events by name with repeated names, and after changing the names."""
+        haz = dummy_hazard()
+        haz.event_name = ['ev1', 'ev2', 'ev1', 'ev4']
+        sel_haz = haz.select(event_names=['ev4', 'ev1', 'ev1'])
+        np.testing.assert_array_equal(sel_haz.date, [4, 1, 1])
+        sel_haz = haz.select(event_names=['ev1'], orig=False)
+        np.testing.assert_array_equal(sel_haz.date, [3])
+        self.assertIsNone(haz.select(event_names=['ev1', 'ev3']))
+        np.testing.assert_array_equal(haz.get_event_id('ev1'), [1, 3])
+
+        # the index follows the replaced attributes
+        haz.event_name = ['ev1', 'ev2', 'ev3', 'ev4']
+        haz.event_id = np.array([10, 20, 30, 40])
+        np.testing.assert_array_equal(haz.select(event_names=['ev3']).date, [3])
+        np.testing.assert_array_equal(haz.get_event_id('ev1'), [10])
+        self.assertEqual(haz.get_event_name(30), 'ev3')
+        with self.assertRaises(ValueError):
+            haz.get_event_name(3)
+        haz.date = np.array([4, 3, 2, 1])
+        np.testing.assert_array_equal(haz.select(date=(2, 3)).event_name, ['ev2', 'ev3'])
+
     def test_select_orig_pass(self):
         """Test select historical events."""
         haz = dummy_hazard()
@@ -452,6 +477,108 @@ class TestSelect(unittest.TestCase):
         self.assertIsInstance(sel_haz.intensity, sparse.csr_matrix)
         self.assertIsInstance(sel_haz.fraction, sparse.csr_matrix)
 
+    def test_select_extent_pass(self):
+        """Test select extent of centroids."""
+        haz = dummy_hazard()
+        sel_haz = haz.select(extent=(3, 7, 2, 6))
+
+        np.testing.assert_array_equal(sel_haz.centroids.coord, haz.centroids.coord[1:, :])
+        np.testing.assert_array_equal(sel_haz.event_id, haz.event_id)
+        np.testing.assert_array_equal(sel_haz.intensity.toarray(),
+                                      haz.intensity.toarray()[:, 1:])
+        np.testing.assert_array_equal(sel_haz.fraction.toarray(),
+                                      haz.fraction.toarray()[:, 1:])
+        self.assertIsInstance(sel_haz.intensity, sparse.csr_matrix)
+        self.assertIsInstance(sel_haz.fraction, sparse.csr_matrix)
+
+    def test_select_extent_raster_pass(self):
+        """Test select extent of raster centroids."""
+        haz = Hazard.from_raster([HAZ_DEMO_FL, HAZ_DEMO_FL], window=Window(10, 20, 50, 60))
+        haz.event_name = ['ev1', 'ev2']
+        haz.centroids.set_meta_to_lat_lon()
+        extent = (-69.2, -69.0, 10.0, 10.2)
+        sel_cen = haz.centroids.select_mask(extent=extent)
+        sel_haz = haz.select(event_names=['ev2'], extent=extent)
+
+        np.testing.assert_array_equal(sel_haz.centroids.coord, haz.centroids.coord[sel_cen])
+        self.assertTrue(sel_haz.intensity.has_sorted_indices)
+        np.testing.assert_array_equal(sel_haz.intensity.toarray(),
+                                      haz.intensity.toarray()[1:, sel_cen])
+        np.testing.assert_array_equal(sel_haz.get_fraction().toarray(),
+                                      haz.get_fraction().toarray()[1:, sel_cen])
+
+    def test_set_implicit_fraction_pass(self):
+        """Test set_implicit_fraction of a fraction of ones."""
+        haz = dummy_hazard()
+        self.assertFalse(haz.implicit_fraction)
+        with self.assertRaises(ValueError):
+            haz.set_implicit_fraction()
+        self.assertFalse(haz.implicit_fraction)
+        haz.fraction = haz.intensity.copy()
+        haz.fraction.data.fill(1)
+        haz.set_implicit_fraction()
+        self.assertTrue(haz.implicit_fraction)
+        self.assertEqual(haz.fraction.shape, (4, 3))
+        self.assertEqual(haz.fraction.nnz, 0)
+        haz.check()
+        np.testing.assert_array_equal(haz.get_fraction().toarray(), np.ones((4, 3)))
+        # stored values contradict the flag
+        haz.fraction = haz.get_fraction()
+        with self.assertRaises(ValueError):
+            haz.check()
+
+    def test_select_implicit_fraction_pass(self):
+        """Test select keeps an implicit fraction."""
+        haz = dummy_hazard()
+        haz.fraction = haz.intensity.copy()
+        haz.fraction.data.fill(1)
+        haz.set_implicit_fraction()
+        sel_haz = haz.select(event_names=['ev4', 'ev2'], extent=(3, 7, 2, 6))
+        self.assertTrue(sel_haz.implicit_fraction)
+        self.assertEqual(sel_haz.fraction.shape, (2, 2))
+        self.assertEqual(sel_haz.fraction.nnz, 0)
+        np.testing.assert_array_equal(sel_haz.get_fraction().toarray(), np.ones((2, 2)))
+
+    def test_select_zero_fraction_pass(self):
+        """Test select keeps an explicit fraction without stored values."""
+        haz = dummy_hazard()
+        haz.fraction = sparse.csr_matrix(haz.intensity.shape)
+        self.assertFalse(haz.implicit_fraction)
+        np.testing.assert_array_equal(haz.get_fraction().toarray(), np.zeros((4, 3)))
+        sel_haz = haz.select(event_names=['ev4', 'ev2'], extent=(3, 7, 2, 6))
+        self.assertFalse(sel_haz.implicit_fraction)
+        self.assertEqual(sel_haz.fraction.shape, (2, 2))
+        self.assertEqual(sel_haz.fraction.nnz, 0)
+
+    def test_csc_cache_pass(self):
+        """Test column-major copies of intensity and fraction."""
+        haz = dummy_hazard()
+        inten_csc = haz.intensity_csc
+        self.assertIsInstance(inten_csc, sparse.csc_matrix)
+        np.testing.assert_array_equal(inten_csc.toarray(), haz.intensity.toarray())
+        np.testing.assert_array_equal(haz.fraction_csc.toarray(), haz.fraction.toarray())
+        # cached until the matrix is replaced
+        self.assertIs(haz.intensity_csc, inten_csc)
+        haz.intensity = haz.intensity * 2
+        self.assertIsNot(haz.intensity_csc, inten_csc)
+        np.testing.assert_array_equal(haz.intensity_csc.toarray(), haz.intensity.toarray())
+        # rebuilt after reallocations and explicit invalidation
+        inten_csc = haz.intensity_csc
+        haz.intensity[0, 0] = 0
+        haz.intensity.eliminate_zeros()
+        self.assertIsNot(haz.intensity_csc, inten_csc)
+        np.testing.assert_array_equal(haz.intensity_csc.toarray(), haz.intensity.toarray())
+        inten_csc = haz.intensity_csc
+        haz.intensity.data *= 3
+        self.assertIs(haz.intensity_csc, inten_csc)
+        haz.clear_csc_cache()
+        self.assertIsNot(haz.intensity_csc, inten_csc)
+        np.testing.assert_array_equal(haz.intensity_csc.toarray(), haz.intensity.toarray())
+        # not shared with selections or copies
+        sel_haz = haz.select(event_names=['ev1', 'ev2'])
+        np.testing.assert_array_equal(sel_haz.intensity_csc.toarray(),
+                                      haz.intensity.toarray()[:2])
+
     def test_select_tight_pass(self):
         """Test select tight box around hazard"""
 
@@ -628,6 +755,38 @@ class TestAppend(unittest.TestCase):
         self.assertEqual(haz1.tag.description,
                          [haz1_orig.tag.description, haz2.tag.description])
 
+    def test_concat_same_centroids_pass(self):
+        """Concatenate many hazards sharing the same centroids."""
+        centroids = Centroids.from_lat_lon(np.array([1, 3, 5]), np.array([2, 4, 6]))
+        haz_list = []
+        for i_haz in range(20):
+            haz = dummy_hazard()
+            haz.event_name = ['ev%s_%s' % (i_haz, name) for name in haz.event_name]
+            haz.intensity = haz.intensity * (i_haz + 1)
+            # the same object, or an identical copy
+            haz.centroids = centroids if i_haz % 2 else copy.deepcopy(centroids)
+            haz_list.append(haz)
+        haz_list[3].intensity = sparse.csr_matrix((4, 3))
+
+        haz = Hazard.concat(haz_list)
+        haz.check()
+        self.assertIsNot(haz.centroids, centroids)
+        np.testing.assert_array_equal(haz.centroids.coord, centroids.coord)
+        self.assertEqual(haz.event_id.size, 80)
+        self.assertEqual(haz.event_name, sum([haz.event_name for haz in haz_list], []))
+        for var_name in ['intensity', 'fraction']:
+            self.assertTrue(sparse.isspmatrix_csr(getattr(haz, var_name)))
+            np.testing.assert_array_equal(
+                getattr(haz, var_name).toarray(),
+                sparse.vstack([getattr(haz, var_name) for haz in haz_list]).toarray())
+
+        # different centroids are mapped onto the union
+        haz_list[5].centroids = Centroids.from_lat_lon(np.array([5, 3, 1]), np.array([6, 4, 2]))
+        haz = Hazard.concat(haz_list)
+        self.assertEqual(haz.centroids.size, 3)
+        np.testing.assert_array_equal(haz.intensity[20:24].toarray(),
+                                      haz_list[5].intensity.toarray()[:, ::-1])
+
     def test_incompatible_type_fail(self):
         """Raise error when append two incompatible hazards."""
         haz1 = dummy_hazard()
@@ -846,6 +1005,43 @@ class TestAppend(unittest.TestCase):
         with self.assertRaises(ValueError):
              Hazard.concat([haz1, haz4])
 
+    def test_append_implicit_fraction_pass(self):
+        """Append implicit fractions to implicit and explicit fractions"""
+        haz_1 = dummy_hazard()
+        haz_1.fraction = haz_1.intensity.copy()
+        haz_1.fraction.data.fill(1)
+        haz_1.set_implicit_fraction()
+        haz_2 = dummy_hazard()
+        haz_2.event_name = ['ev5', 'ev6', 'ev7', 'ev8']
+        haz_2.intensity[0, 1] = 0
+        haz_2.intensity.eliminate_zeros()
+        haz_2.fraction = haz_2.intensity.copy()
+        haz_2.fraction.data.fill(1)
+        haz_2.set_implicit_fraction()
+
+        haz = Hazard.concat([haz_1, haz_2])
+        self.assertTrue(haz.implicit_fraction)
+        self.assertEqual(haz.fraction.shape, (8, 3))
+        self.assertEqual(haz.fraction.nnz, 0)
+        haz.check()
+
+        haz_3 = dummy_hazard()
+        haz_3.event_name = ['ev5', 'ev6', 'ev7', 'ev8']
+        haz = Hazard.concat([haz_1, haz_2, haz_3])
+        self.assertFalse(haz.implicit_fraction)
+        np.testing.assert_array_equal(
+            haz.fraction.toarray(),
+            np.vstack([np.ones((4, 3)), haz_2.get_fraction().toarray(),
+                       haz_3.fraction.toarray()]))
+        self.assertEqual(haz.fraction[4, 1], 0)
+
+        # explicit fractions without stored values stay zero
+        haz_3.fraction = sparse.csr_matrix(haz_3.intensity.shape)
+        haz = Hazard.concat([haz_1, haz_3])
+        self.assertFalse(haz.implicit_fraction)
+        np.testing.assert_array_equal(haz.fraction.toarray(),
+                                      np.vstack([np.ones((4, 3)), np.zeros((4, 3))]))
+
     def test_change_centroids(self):
         """Set new centroids for hazard"""
         cent1 = Centroids()
@@ -926,6 +1122,51 @@ class TestAppend(unittest.TestCase):
         self.assertTrue(np.array_equal(haz_4.orig, [True]))
         self.assertEqual(haz_4.tag.description, 'Description 1')
 
+    def test_change_centroids_raster_window(self):
+        """Set centroids of a larger raster of the same grid"""
+        haz = Hazard.from_raster([HAZ_DEMO_FL, HAZ_DEMO_FL], window=Window(10, 20, 50, 60))
+        haz.event_name = ['ev1', 'ev2']
+        centroids = Centroids.from_raster_file(HAZ_DEMO_FL, window=Window(5, 10, 70, 80))
+
+        haz_new = haz.change_centroids(centroids)
+
+        self.assertIs(haz_new.centroids, centroids)
+        np.testing.assert_array_equal(haz_new.event_id, haz.event_id)
+        self.assertEqual(haz_new.event_name, haz.event_name)
+        self.assertEqual(haz_new.intensity.shape, (2, 80 * 70))
+        inten = haz_new.intensity.toarray().reshape(2, 80, 70)
+        np.testing.assert_array_equal(inten[:, 10:70, 5:55],
+                                      haz.intensity.toarray().reshape(2, 60, 50))
+        self.assertEqual(haz_new.intensity.nnz, haz.intensity.nnz)
+        self.assertEqual(haz_new.fraction.shape, (2, 80 * 70))
+        self.assertEqual(haz_new.fraction.nnz, haz.fraction.nnz)
+
+        # same result from the coordinates of the points
+        haz.centroids.set_meta_to_lat_lon()
+        centroids_pnt = copy.deepcopy(centroids)
+        centroids_pnt.set_meta_to_lat_lon()
+        centroids_pnt.meta = dict()
+        haz_pnt = haz.change_centroids(centroids_pnt)
+        self.assertEqual((haz_pnt.intensity != haz_new.intensity).nnz, 0)
+        self.assertEqual((haz_pnt.fraction != haz_new.fraction).nnz, 0)
+
+        # the event arrays are shared with self, lists and matrices are not
+        self.assertIs(haz_new.frequency, haz.frequency)
+        self.assertIs(haz_new.event_id, haz.event_id)
+        self.assertIsNot(haz_new.tag, haz.tag)
+        inten_orig = haz.intensity.copy()
+        haz_new.event_name[0] = 'ev3'
+        haz_new.intensity.data *= 2
+        self.assertEqual(haz.event_name, ['ev1', 'ev2'])
+        self.assertEqual((haz.intensity != inten_orig).nnz, 0)
+
+        # an implicit fraction stays implicit
+        haz.set_implicit_fraction()
+        haz_new = haz.change_centroids(centroids)
+        self.assertTrue(haz_new.implicit_fraction)
+        self.assertEqual(haz_new.fraction.shape, (2, 80 * 70))
+        self.assertEqual(haz_new.fraction.nnz, 0)
+
 
 class TestStats(unittest.TestCase):
     """Test return period statistics"""
@@ -953,6 +1194,31 @@ class TestStats(unittest.TestCase):
         self.assertAlmostEqual(inten_stats[3][33], 88.510983305123631)
         self.assertAlmostEqual(inten_stats[2][99], 79.717518054203623)
 
+    def test_dense_reference_pass(self):
+        """Sparse fit equals the fit of the dense intensity columns."""
+        haz = Hazard.from_mat(HAZ_TEST_MAT)
+        return_period = np.array([25, 50, 100, 250])
+        inten_stats = haz.local_exceedance_inten(return_period)
+        inten_ref = np.zeros(inten_stats.shape)
+        haz._loc_return_inten(return_period, haz.intensity.toarray(), inten_ref)
+        np.testing.assert_allclose(inten_stats, inten_ref, rtol=1e-10)
+
+    def test_quantized_pass(self):
+        """Statistics of a quantized intensity are computed on the decoded values."""
+        haz = Hazard.from_mat(HAZ_TEST_MAT)
+        haz_quant = copy.deepcopy(haz)
+        haz_quant.quantize_intensity()
+        # no stored intensity is encoded as zero
+        self.assertEqual(haz_quant.intensity.nnz, haz.intensity.nnz)
+        self.assertEqual(np.count_nonzero(haz_quant.intensity.data), haz.intensity.nnz)
+        return_period = np.array([25, 50, 100, 250])
+        for inten_thres in [haz.intensity_thres, -1]:
+            haz.intensity_thres = haz_quant.intensity_thres = inten_thres
+            np.testing.assert_allclose(haz_quant.local_exceedance_inten(return_period),
+                                       haz.local_exceedance_inten(return_period),
+                                       rtol=1e-3)
+        self.assertIsNotNone(haz_quant.intensity_quantization)
+
 class TestYearset(unittest.TestCase):
     """Test return period statistics"""
 
@@ -1142,6 +1408,208 @@ class TestHDF5(unittest.TestCase):
             self.assertTrue(np.array_equal(hazard.fraction.toarray(), haz_read.fraction.toarray()))
             self.assertIsInstance(haz_read.fraction, sparse.csr_matrix)
 
+    def test_write_compression_pass(self):
+        """Compressed and chunked files are read by all readers"""
+        file_name = str(DATA_DIR.joinpath('test_haz.h5'))
+        hazard = Hazard.from_mat(HAZ_TEST_MAT)
+        hazard.event_name = [str(ev_id) for ev_id in hazard.event_id]
+        for compression, todense_flag in [('gzip', False), ('lzf', False), ('gzip', True)]:
+            hazard.write_hdf5(file_name, todense=todense_flag, compression=compression,
+                              events_per_chunk=2000)
+            with h5py.File(file_name, 'r') as hf_data:
+                if todense_flag:
+                    self.assertEqual(hf_data['intensity'].chunks, (2000, 100))
+                else:
+                    self.assertEqual(hf_data['intensity/indptr'].chunks, (2000,))
+                    self.assertEqual(hf_data['intensity/data'].compression, compression)
+                self.assertEqual(hf_data['frequency'].chunks, (2000,))
+                self.assertEqual(hf_data['event_id'].compression, compression)
+
+            haz_read = Hazard.from_hdf5(file_name)
+            haz_blocks = list(Hazard.from_hdf5_event_blocks(file_name, 3000))
+            with Hazard.from_hdf5(file_name, lazy=True) as haz_lazy:
+                haz_sel = haz_lazy.select(event_names=['10', '7000']).load()
+            self.assertEqual(haz_read.event_name, hazard.event_name)
+            np.testing.assert_array_equal(haz_read.frequency, hazard.frequency)
+            for var_name in ['intensity', 'fraction']:
+                self.assertEqual((getattr(haz_read, var_name)
+                                  != getattr(hazard, var_name)).nnz, 0)
+                self.assertEqual((sparse.vstack([getattr(haz, var_name) for haz in haz_blocks])
+                                  != getattr(hazard, var_name)).nnz, 0)
+                self.assertEqual((getattr(haz_sel, var_name)
+                                  != getattr(hazard, var_name)[[9, 6999]]).nnz, 0)
+
+        # default chunks with compression
+        hazard.write_hdf5(file_name, compression='gzip')
+        with h5py.File(file_name, 'r') as hf_data:
+            self.assertEqual(hf_data['intensity/indptr'].chunks, (HDF5_EVENTS_PER_CHUNK,))
+
+    def test_read_lazy_pass(self):
+        """Read only the selected events and centroids of a hazard file"""
+        file_name = str(DATA_DIR.joinpath('test_haz.h5'))
+        hazard = Hazard.from_mat(HAZ_TEST_MAT)
+        hazard.event_name = [str(ev_id) for ev_id in hazard.event_id]
+        ev_names = [hazard.event_name[ev_pos] for ev_pos in [500, 3, 4, 5, 10000, 2]]
+        extent = (-80, -60, 10, 30)
+        haz_ref = hazard.select(event_names=ev_names, extent=extent)
+        for todense_flag in [False, True]:
+            hazard.write_hdf5(file_name, todense=todense_flag)
+            with Hazard.from_hdf5(file_name, lazy=True) as haz_lazy:
+                self.assertIsInstance(haz_lazy, LazyHazard)
+                self.assertEqual(haz_lazy.size, hazard.size)
+                self.assertEqual(haz_lazy.centroids.size, hazard.centroids.size)
+                self.assertEqual((haz_lazy.intensity != hazard.intensity).nnz, 0)
+                if not todense_flag:
+                    self.assertIsInstance(
+                        haz_lazy._hdf5_array(haz_lazy._hf_data['intensity']['data']),
+                        np.memmap)
+                self.assertIsNone(haz_lazy.select(event_names=['unknown']))
+
+                haz_sel = haz_lazy.select(event_names=ev_names, extent=extent)
+                self.assertIsInstance(haz_sel, LazyHazard)
+                haz = haz_sel.load()
+            self.assertIsInstance(haz, Hazard)
+            np.testing.assert_array_equal(haz.event_id, haz_ref.event_id)
+            self.assertEqual(haz.event_name, ev_names)
+            np.testing.assert_array_equal(haz.centroids.coord, haz_ref.centroids.coord)
+            for var_name in ['intensity', 'fraction']:
+                self.assertIsInstance(getattr(haz, var_name), sparse.csr_matrix)
+                self.assertEqual(getattr(haz, var_name).shape, getattr(haz_ref, var_name).shape)
+                self.assertEqual((getattr(haz, var_name) != getattr(haz_ref, var_name)).nnz, 0)
+
+    def test_write_read_implicit_fraction_pass(self):
+        """Write and read a hazard with implicit fraction"""
+        file_name = str(DATA_DIR.joinpath('test_haz.h5'))
+        hazard = dummy_hazard()
+        hazard.fraction = hazard.intensity.copy()
+        hazard.fraction.data.fill(1)
+        hazard.set_implicit_fraction()
+        hazard.write_hdf5(file_name)
+        with h5py.File(file_name, 'r') as hf_data:
+            self.assertEqual(hf_data['fraction']['data'].size, 0)
+
+        haz_read = Hazard.from_hdf5(file_name)
+        self.assertTrue(haz_read.implicit_fraction)
+        self.assertEqual(haz_read.fraction.shape, (4, 3))
+        haz_read.check()
+        with Hazard.from_hdf5(file_name, lazy=True) as haz_lazy:
+            haz_sel = haz_lazy.select(event_names=['ev2', 'ev3'])
+            self.assertTrue(haz_sel.implicit_fraction)
+            np.testing.assert_array_equal(haz_sel.get_fraction().toarray(), np.ones((2, 3)))
+            self.assertTrue(haz_sel.load().implicit_fraction)
+        haz_blocks = list(Hazard.from_hdf5_event_blocks(file_name, 3))
+        self.assertTrue(all(haz.implicit_fraction for haz in haz_blocks))
+        hazard.write_hdf5(file_name, todense=True)
+        self.assertTrue(Hazard.from_hdf5(file_name).implicit_fraction)
+
+        # an explicit fraction without stored values stays explicit
+        hazard.fraction = sparse.csr_matrix(hazard.intensity.shape)
+        hazard.implicit_fraction = False
+        hazard.write_hdf5(file_name)
+        haz_read = Hazard.from_hdf5(file_name)
+        self.assertFalse(haz_read.implicit_fraction)
+        self.assertEqual(haz_read.fraction.shape, (4, 3))
+        with Hazard.from_hdf5(file_name, lazy=True) as haz_lazy:
+            self.assertFalse(haz_lazy.implicit_fraction)
+            np.testing.assert_array_equal(haz_lazy.get_fraction().toarray(), np.zeros((4, 3)))
+
+    def test_write_read_quantized_pass(self):
+        """Write quantized intensities and decode them or keep them quantized"""
+        file_name = str(DATA_DIR.joinpath('test_haz.h5'))
+        hazard = Hazard.from_mat(HAZ_TEST_MAT)
+        hazard.event_name = [str(ev_id) for ev_id in hazard.event_id]
+        haz_quant = copy.deepcopy(hazard)
+        haz_quant.quantize_intensity()
+        self.assertEqual(haz_quant.intensity.dtype, np.uint16)
+        scale, _ = haz_quant.intensity_quantization
+        self.assertLessEqual(abs(haz_quant.get_intensity() - hazard.intensity).max(), scale)
+        with self.assertRaises(ValueError):
+            haz_quant.write_hdf5(file_name, todense=True)
+
+        hazard.write_hdf5(file_name, quantize=True)
+        with h5py.File(file_name, 'r') as hf_data:
+            self.assertEqual(hf_data['intensity']['data'].dtype, np.uint16)
+        haz_read = Hazard.from_hdf5(file_name)
+        self.assertIsNone(haz_read.intensity_quantization)
+        self.assertEqual((haz_read.intensity != haz_quant.get_intensity()).nnz, 0)
+        haz_read = Hazard.from_hdf5(file_name, quantized=True)
+        self.assertEqual(haz_read.intensity_quantization, haz_quant.intensity_quantization)
+        self.assertEqual((haz_read.intensity != haz_quant.intensity).nnz, 0)
+        haz_blk = next(Hazard.from_hdf5_event_blocks(file_name, 100, quantized=True))
+        self.assertEqual((haz_blk.intensity != haz_quant.intensity[:100]).nnz, 0)
+        with Hazard.from_hdf5(file_name, lazy=True) as haz_lazy:
+            self.assertEqual((haz_lazy.intensity != haz_read.get_intensity()).nnz, 0)
+
+        # selections stay quantized, concatenations are decoded
+        haz_sel = haz_read.select(event_names=hazard.event_name[:3])
+        self.assertEqual(haz_sel.intensity_quantization, haz_read.intensity_quantization)
+        self.assertEqual(haz_sel.intensity.dtype, np.uint16)
+        haz_concat = Hazard.concat([haz_sel, hazard.select(event_names=hazard.event_name[3:5])])
+        self.assertIsNone(haz_concat.intensity_quantization)
+        np.testing.assert_array_equal(haz_concat.intensity[:3].toarray(),
+                                      haz_sel.get_intensity().toarray())
+        haz_read.dequantize_intensity()
+        self.assertIsNone(haz_read.intensity_quantization)
+        self.assertEqual((haz_read.intensity != haz_quant.get_intensity()).nnz, 0)
+
+    def test_read_float32_pass(self):
+        """Read the matrices in single precision if configured"""
+        file_name = str(DATA_DIR.joinpath('test_haz.h5'))
+        hazard = Hazard.from_mat(HAZ_TEST_MAT)
+        hazard.event_name = list(map(str, hazard.event_name))
+        hazard.write_hdf5(file_name)
+        float_dtype = CONFIG.float_dtype._val
+        try:
+            CONFIG.float_dtype._val = 'float32'
+            haz_read = Hazard.from_hdf5(file_name)
+            haz_blocks = list(Hazard.from_hdf5_event_blocks(file_name, 6000))
+            haz_concat = Hazard.concat(haz_blocks)
+        finally:
+            CONFIG.float_dtype._val = float_dtype
+        for haz in [haz_read, haz_blocks[0], haz_concat]:
+            for var_name in ['intensity', 'fraction']:
+                matrix = getattr(haz, var_name)
+                self.assertEqual(matrix.dtype, np.float32)
+                self.assertEqual(matrix.indices.dtype, np.int32)
+                self.assertEqual(matrix.indptr.dtype, np.int32)
+        for haz in [haz_read, haz_concat]:
+            for var_name in ['intensity', 'fraction']:
+                np.testing.assert_allclose(getattr(haz, var_name).toarray(),
+                                           getattr(hazard, var_name).toarray(), rtol=1e-6)
+        self.assertEqual(hazard.intensity.dtype, np.float64)
+
+    def test_read_event_blocks_pass(self):
+        """Read a hazard hdf5 file in blocks of events."""
+        file_name = str(DATA_DIR.joinpath('test_haz.h5'))
+        hazard = Hazard.from_mat(HAZ_TEST_MAT)
+        hazard.event_name = list(map(str, hazard.event_name))
+        for todense_flag in [False, True]:
+            hazard.write_hdf5(file_name, todense=todense_flag)
+            haz_blocks = list(Hazard.from_hdf5_event_blocks(file_name, 6000))
+
+            self.assertEqual([haz.size for haz in haz_blocks], [6000, 6000, 2450])
+            for haz in haz_blocks:
+                self.assertEqual(haz.tag.haz_type, hazard.tag.haz_type)
+                self.assertEqual(haz.units, hazard.units)
+                self.assertIs(haz.centroids, haz_blocks[0].centroids)
+                self.assertIsInstance(haz.intensity, sparse.csr_matrix)
+                self.assertEqual(haz.intensity.shape[1], hazard.centroids.size)
+            np.testing.assert_array_equal(haz_blocks[0].centroids.coord,
+                                          hazard.centroids.coord)
+            for var_name in ['event_id', 'frequency', 'date', 'orig']:
+                np.testing.assert_array_equal(
+                    np.concatenate([getattr(haz, var_name) for haz in haz_blocks]),
+                    getattr(hazard, var_name))
+            self.assertEqual(sum([haz.event_name for haz in haz_blocks], []),
+                             hazard.event_name)
+            for var_name in ['intensity', 'fraction']:
+                np.testing.assert_array_equal(
+                    sparse.vstack([getattr(haz, var_name) for haz in haz_blocks]).toarray(),
+                    getattr(hazard, var_name).toarray())
+
+        with self.assertRaises(ValueError):
+            next(Hazard.from_hdf5_event_blocks(file_name, 0))
+
 class TestCentroids(unittest.TestCase):
     """Test return period statistics"""
 
@@ -1164,6 +1632,20 @@ class TestCentroids(unittest.TestCase):
         self.assertEqual(haz_fl.intensity.min(), -9999)
         self.assertTrue(haz_fl.intensity.max() < 4.7)
 
+    def test_read_raster_window_pass(self):
+        """Streamed raster reading equals reading through the centroids"""
+        window = Window(10, 20, 50, 60)
+        haz_fl = Hazard.from_raster([HAZ_DEMO_FL, HAZ_DEMO_FL],
+                                    files_fraction=[HAZ_DEMO_FL, HAZ_DEMO_FL],
+                                    window=window, n_workers=2)
+        haz_fl.check()
+        centroids = Centroids.from_raster_file(HAZ_DEMO_FL, window=window)
+        values = centroids.values_from_raster_files([HAZ_DEMO_FL, HAZ_DEMO_FL], window=window)
+        self.assertEqual(haz_fl.centroids.meta, centroids.meta)
+        self.assertEqual(haz_fl.intensity.shape, (2, 60 * 50))
+        self.assertEqual((haz_fl.intensity != values).nnz, 0)
+        self.assertEqual((haz_fl.fraction != values).nnz, 0)
+
     def test_raster_to_vector_pass(self):
         """Test raster_to_vector method"""
         haz_fl = Hazard.from_raster([HAZ_DEMO_FL], haz_type='FL')
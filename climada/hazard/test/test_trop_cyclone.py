@@ -25,6 +25,7 @@ from pathlib import Path
 import numpy as np
 from scipy import sparse
 
+from climada import CONFIG
 from climada.util import ureg
 from climada.hazard.tc_tracks import TCTracks
 from climada.hazard.trop_cyclone import (
@@ -104,6 +105,27 @@ class TestReader(unittest.TestCase):
             msk = (intensity > 0)
             np.testing.assert_array_equal(windfield_norms[msk], intensity[msk])
 
+    def test_set_one_float32_pass(self):
+        """Test from_tracks storing single precision matrices."""
+        tc_track = TCTracks.from_processed_ibtracs_csv(TEST_TRACK)
+        tc_track.equal_timestep()
+        tc_track.data = tc_track.data[:1]
+        tc_ref = TropCyclone.from_tracks(tc_track, centroids=CENTR_TEST_BRB, model='H08',
+                                         store_windfields=True)
+        float_dtype = CONFIG.float_dtype._val
+        try:
+            CONFIG.float_dtype._val = 'float32'
+            tc_haz = TropCyclone.from_tracks(tc_track, centroids=CENTR_TEST_BRB, model='H08',
+                                             store_windfields=True)
+        finally:
+            CONFIG.float_dtype._val = float_dtype
+        for matrix in [tc_haz.intensity, tc_haz.fraction, tc_haz.windfields[0]]:
+            self.assertEqual(matrix.dtype, np.float32)
+            self.assertEqual(matrix.indices.dtype, np.int32)
+        np.testing.assert_array_equal(tc_haz.intensity.toarray(),
+                                      tc_ref.intensity.toarray().astype(np.float32))
+        np.testing.assert_array_equal(tc_haz.fraction.toarray(), tc_ref.fraction.toarray())
+
     def test_windfield_models(self):
         """Test _tc_from_track function with different wind field models."""
         intensity_idx = [0, 1, 2,  3,  80, 100, 120, 200, 220, 250, 260, 295]
@@ -38,6 +38,7 @@ from climada.hazard.tc_clim_change import get_knutson_criterion, calc_scale_knut
 from climada.hazard.centroids.centr import Centroids
 from climada.util import ureg
 import climada.util.coordinates as u_coord
+import climada.util.dtype as u_dtype
 import climada.util.plot as u_plot
 
 LOGGER = logging.getLogger(__name__)
@@ -467,6 +468,9 @@ class TropCyclone(Hazard):
             (intensity, reachable_coastal_centr_idx, [0, intensity.size]),
             shape=(1, ncentroids))
         intensity_sparse.eliminate_zeros()
+        # the wind speeds are computed in double precision and only stored
+        # with the configured data type
+        intensity_sparse = u_dtype.as_float_dtype(intensity_sparse)
 
         new_haz = cls()
         new_haz.tag = TagHazard(HAZ_TYPE, 'Name: ' + track.name)
@@ -482,7 +486,7 @@ class TropCyclone(Hazard):
             windfields_sparse = sparse.csr_matrix((windfields.ravel(), indices, indptr),
                                                   shape=(npositions, ncentroids * 2))
             windfields_sparse.eliminate_zeros()
-            new_haz.windfields = [windfields_sparse]
+            new_haz.windfields = [u_dtype.as_float_dtype(windfields_sparse)]
         new_haz.units = 'm/s'
         new_haz.centroids = centroids
         new_haz.event_id = np.array([1])
@@ -522,6 +526,7 @@ class TropCyclone(Hazard):
         """
 
         tc_cc = copy.deepcopy(self)
+        tc_cc.dequantize_intensity()
 
         # Criterion per basin
         for basin in np.unique(tc_cc.basin):
@@ -41,6 +41,7 @@ import rasterio.crs
 import rasterio.features
 import rasterio.mask
 import rasterio.warp
+import scipy.sparse
 import scipy.spatial
 import scipy.interpolate
 from shapely.geometry import Polygon, MultiPolygon, Point, box
@@ -81,6 +82,9 @@ NEAREST_NEIGHBOR_THRESHOLD = 100
 """Distance threshold in km for coordinate assignment. Nearest neighbors with greater distances
 are not considered."""
 
+RASTER_BLOCK_SIZE = 2**20
+"""Approximate number of raster points read at once by read_raster_sparse"""
+
 def latlon_to_geosph_vector(lat, lon, rad=False, basis=False):
     """Convert lat/lon coodinates to radial vectors (on geosphere)
 
@@ -1815,6 +1819,76 @@ def read_raster(file_name, band=None, src_crs=None, window=None, geometry=None,
 
     return dst_meta, intensity.reshape(dst_shape)
 
+def read_raster_sparse(file_name, band=None, window=None, rows_per_block=None):
+    """Read bands of a raster as rows of a sparse matrix, block of rows by
+    block of rows, without dense array of the whole raster. Masked values are
+    set to 0.
+
+    Parameters
+    ----------
+    file_name : str
+        name of the file
+    band : list(int), optional
+        band number to read. Default: 1
+    window : rasterio.windows.Window, optional
+        window to read
+    rows_per_block : int, optional
+        number of raster rows read at once. Default: a multiple of the height
+        of the internal blocks of the raster file, with about RASTER_BLOCK_SIZE
+        points per read
+
+    Returns
+    -------
+    meta : dict
+        Raster meta (height, width, transform, crs).
+    data : sparse.csr_matrix
+        Each row corresponds to one band (raster points are flattened, can be
+        reshaped to height x width).
+    """
+    if not band:
+        band = [1]
+    LOGGER.info('Reading %s', file_name)
+    if Path(file_name).suffix == '.gz':
+        file_name = '/vsigzip/' + str(file_name)
+
+    band_pos, flat_idx, values = [], [], []
+    with rasterio.Env():
+        with rasterio.open(file_name, 'r') as src:
+            meta = src.meta.copy()
+            if window:
+                trans = rasterio.windows.transform(window, src.transform)
+            else:
+                window = rasterio.windows.Window(0, 0, src.width, src.height)
+                trans = meta['transform']
+            height, width = int(window.height), int(window.width)
+            if rows_per_block is None:
+                # whole internal blocks of about RASTER_BLOCK_SIZE points
+                block_height = src.block_shapes[0][0]
+                rows_per_block = block_height * max(
+                    1, RASTER_BLOCK_SIZE // max(block_height * width * len(band), 1))
+            for row_ini in range(0, height, rows_per_block):
+                block = src.read(band, masked=True, window=rasterio.windows.Window(
+                    window.col_off, window.row_off + row_ini,
+                    width, min(rows_per_block, height - row_ini)))
+                block_data = block.data
+                block_data[block.mask] = 0
+                blk_band, blk_row, blk_col = block_data.nonzero()
+                band_pos.append(blk_band)
+                flat_idx.append((blk_row + row_ini) * width + blk_col)
+                values.append(block_data[blk_band, blk_row, blk_col])
+            meta.update({"height": height, "width": width, "transform": trans})
+
+    if not meta['crs']:
+        meta['crs'] = rasterio.crs.CRS.from_user_input(DEF_CRS)
+
+    if not values:
+        return meta, scipy.sparse.csr_matrix((len(band), height * width), dtype=meta['dtype'])
+    # the blocks are read in ascending rows: the columns of every band are sorted
+    data = scipy.sparse.csr_matrix(
+        (np.concatenate(values), (np.concatenate(band_pos), np.concatenate(flat_idx))),
+        shape=(len(band), height * width))
+    return meta, data
+
 def read_raster_bounds(path, bounds, res=None, bands=None, resampling="nearest",
                        global_origin=None, pad_cells=1.0):
     """Read raster file within given bounds at given resolution
@@ -108,3 +108,18 @@ def first_year(ordinal_vector):
     int
     """
     return dt.date.fromordinal(np.min(ordinal_vector)).year
+
+def ordinal_to_year(ordinal_vector):
+    """Extract the year of every ordinal date
+
+    Parameters
+    ----------
+    ordinal_vector : list or np.array
+        input datetime ordinal
+
+    Returns
+    -------
+    np.array(int)
+    """
+    days = np.asarray(ordinal_vector, dtype=np.int64) - dt.date(1970, 1, 1).toordinal()
+    return days.astype('datetime64[D]').astype('datetime64[Y]').astype(int) + 1970
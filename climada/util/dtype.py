@@ -0,0 +1,145 @@
+"""
+This file is part of CLIMADA.
+
+Copyright (C) 2017 ETH Zurich, CLIMADA contributors listed in AUTHORS.
+
+CLIMADA is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free
+Software Foundation, version 3.
+
+CLIMADA is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with CLIMADA. If not, see <https://www.gnu.org/licenses/>.
+
+---
+
+Define the data types used to store hazard and impact matrices
+"""
+import logging
+import numpy as np
+from scipy import sparse
+
+from climada import CONFIG
+
+LOGGER = logging.getLogger(__name__)
+
+FLOAT_DTYPES = ('float32', 'float64')
+"""Supported values of the float_dtype configuration parameter"""
+
+def float_dtype():
+    """Data type of the values of hazard and impact matrices, as set by the
+    float_dtype configuration parameter.
+
+    Returns
+    -------
+    np.dtype
+
+    Raises
+    ------
+    ValueError
+    """
+    dtype = CONFIG.float_dtype.str()
+    if dtype not in FLOAT_DTYPES:
+        raise ValueError('Unsupported float_dtype configuration parameter: %s. '
+                         'Use one of %s.' % (dtype, FLOAT_DTYPES))
+    return np.dtype(dtype)
+
+def index_dtype(max_val):
+    """Smallest integer type to index up to max_val.
+
+    Parameters
+    ----------
+    max_val : int
+        largest index or index pointer
+
+    Returns
+    -------
+    np.dtype
+    """
+    if max_val <= np.iinfo(np.int32).max:
+        return np.dtype(np.int32)
+    return np.dtype(np.int64)
+
+def as_float_dtype(mat):
+    """Store a sparse matrix with the configured float data type and the
+    smallest index type.
+
+    Only the storage is converted: operations on the matrix, e.g. sums,
+    still accumulate in float64 when their result is float64.
+
+    Parameters
+    ----------
+    mat : sparse.csr_matrix or sparse.csc_matrix
+        matrix to convert. Other types are returned unchanged.
+
+    Returns
+    -------
+    sparse.csr_matrix or sparse.csc_matrix
+        mat itself if it is already stored with these types, otherwise a
+        matrix of the same format sharing no data with mat
+    """
+    if not isinstance(mat, (sparse.csr_matrix, sparse.csc_matrix)):
+        return mat
+    dtype = float_dtype()
+    idx_dtype = index_dtype(max(mat.nnz, *mat.shape))
+    if mat.dtype == dtype and mat.indices.dtype == idx_dtype \
+    and mat.indptr.dtype == idx_dtype:
+        return mat
+    return type(mat)((mat.data.astype(dtype),
+                      mat.indices.astype(idx_dtype),
+                      mat.indptr.astype(idx_dtype)),
+                     shape=mat.shape)
+
+QUANTIZED_DTYPE = np.dtype('uint16')
+"""Data type of quantized values, see quantize"""
+
+def quantize(data):
+    """Encode values as integers of QUANTIZED_DTYPE with a scale and an
+    offset: data ~ offset + scale * quantized. The code 0 is reserved, so that
+    no value is encoded as a zero of a sparse matrix: the scale spreads the
+    range of the values over the integers from 1, and the error is at most
+    half the scale, i.e. (max - min) / 131068 for uint16.
+
+    Parameters
+    ----------
+    data : np.array
+        values to encode
+
+    Returns
+    -------
+    quantized : np.array
+        encoded values, of QUANTIZED_DTYPE
+    scale : float
+        value of one integer step
+    offset : float
+        value of 0, one step below the minimum value
+    """
+    if not data.size:
+        return np.zeros(0, dtype=QUANTIZED_DTYPE), 1.0, 0.0
+    max_code = np.iinfo(QUANTIZED_DTYPE).max
+    scale = (float(np.max(data)) - float(np.min(data))) / (max_code - 1) or 1.0
+    offset = float(np.min(data)) - scale
+    quantized = np.rint((data - offset) / scale)
+    np.clip(quantized, 1, max_code, out=quantized)
+    return quantized.astype(QUANTIZED_DTYPE), scale, offset
+
+def dequantize(quantized, scale, offset):
+    """Decode values encoded by quantize, with the configured float data type.
+
+    Parameters
+    ----------
+    quantized : np.array
+        encoded values
+    scale : float
+        value of one integer step
+    offset : float
+        value of 0 (not used by quantize)
+
+    Returns
+    -------
+    np.array
+    """
+    return (quantized * scale + offset).astype(float_dtype(), copy=False)
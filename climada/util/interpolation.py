@@ -0,0 +1,109 @@
+"""
+This file is part of CLIMADA.
+
+Copyright (C) 2017 ETH Zurich, CLIMADA contributors listed in AUTHORS.
+
+CLIMADA is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free
+Software Foundation, version 3.
+
+CLIMADA is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with CLIMADA. If not, see <https://www.gnu.org/licenses/>.
+
+---
+
+Define functions to fit and evaluate exceedance curves
+"""
+import logging
+import numpy as np
+from scipy import sparse
+
+LOGGER = logging.getLogger(__name__)
+
+def local_exceedance_fit(mat, frequency, return_periods, threshold=0):
+    """Compute the exceedance values at given return periods for every column
+    of a sparse matrix of events x points, e.g. an impact or intensity matrix.
+
+    For every column, the values above threshold are sorted in descending
+    order, and fitted linearly against the logarithm of their cumulative
+    frequency. The fit is evaluated at the logarithm of the inverse of the
+    return periods. This is the same fit as with ``np.polyfit(deg=1)`` in
+    ``Impact._cen_return_imp``, computed in closed form for all columns at
+    once and only from the stored values of the matrix.
+
+    Parameters
+    ----------
+    mat : sparse.csc_matrix
+        values of each event (rows) at each point (columns). Other sparse
+        formats are converted to csc.
+    frequency : np.array
+        frequency of each event
+    return_periods : np.array
+        return periods
+    threshold : float, optional
+        only values above threshold are fitted. Must not be negative,
+        as implicit zeros are not considered. Default: 0
+
+    Returns
+    -------
+    np.array
+        exceedance values, return periods x points. Points without values
+        above threshold are 0.
+
+    Raises
+    ------
+    ValueError
+    """
+    if threshold < 0:
+        raise ValueError('Negative threshold not supported: %s' % threshold)
+    mat = sparse.csc_matrix(mat)
+    return_periods = np.asarray(return_periods, dtype=float)
+    exc_val = np.zeros((return_periods.size, mat.shape[1]))
+
+    # values above threshold, sorted by column and descending value
+    col = np.repeat(np.arange(mat.shape[1]), np.diff(mat.indptr))
+    above = mat.data > threshold
+    val, row, col = mat.data[above], mat.indices[above], col[above]
+    if not val.size:
+        return exc_val
+    val_sort = np.lexsort((-val, col))
+    val, row, col = val[val_sort].astype(float), row[val_sort], col[val_sort]
+    cols, starts, counts = np.unique(col, return_index=True, return_counts=True)
+
+    # cumulative frequency per column, summed in the same order as np.cumsum
+    # of each column: the k-th values of all columns are added at once
+    cum_freq = np.array(frequency, dtype=float)[row]
+    rank = np.arange(val.size) - np.repeat(starts, counts)
+    rank_sort = np.argsort(rank, kind='stable')
+    rank_bounds = np.searchsorted(rank[rank_sort], np.arange(counts.max() + 1))
+    for ini, end in zip(rank_bounds[1:-1], rank_bounds[2:]):
+        val_pos = rank_sort[ini:end]
+        cum_freq[val_pos] += cum_freq[val_pos - 1]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_freq = np.log(cum_freq)
+        mean_x = np.add.reduceat(log_freq, starts) / counts
+        mean_y = np.add.reduceat(val, starts) / counts
+        dif_x = log_freq - np.repeat(mean_x, counts)
+        dif_y = val - np.repeat(mean_y, counts)
+        sum_xx = np.add.reduceat(dif_x * dif_x, starts)
+        sum_xy = np.add.reduceat(dif_x * dif_y, starts)
+
+        log_rp = np.log(1 / return_periods)[:, np.newaxis]
+        fit = mean_y + sum_xy / sum_xx * (log_rp - mean_x)
+        # a single value or equal cumulative frequencies: minimum norm
+        # solution of the underdetermined fit, as np.polyfit
+        same_x = sum_xx == 0
+        fit[:, same_x] = mean_y[same_x] / 2 * (log_rp / mean_x[same_x] + 1)
+        zero_x = same_x & (mean_x == 0)
+        fit[:, zero_x] = mean_y[zero_x]
+
+    wrong_val = (return_periods[:, np.newaxis] > 1 / np.minimum.reduceat(cum_freq, starts)) \
+        & np.isnan(fit)
+    fit[wrong_val] = 0.
+    exc_val[:, cols] = fit
+    return exc_val
@@ -1066,6 +1066,17 @@ class TestRasterIO(unittest.TestCase):
         self.assertEqual(inten_ras.shape, (1, 60 * 50))
         self.assertAlmostEqual(inten_ras.reshape((60, 50))[25, 12], 0.056825936)
 
+    def test_read_raster_sparse_pass(self):
+        """Sparse reading by blocks of rows equals dense reading"""
+        window = Window(10, 20, 50, 60)
+        meta, inten_ras = u_coord.read_raster(HAZ_DEMO_FL, window=window)
+        meta_sp, inten_sp = u_coord.read_raster_sparse(HAZ_DEMO_FL, window=window,
+                                                       rows_per_block=7)
+        self.assertEqual(meta_sp, meta)
+        self.assertEqual(inten_sp.shape, (1, 60 * 50))
+        self.assertTrue(inten_sp.has_sorted_indices)
+        np.testing.assert_array_equal(inten_sp.toarray(), inten_ras)
+
     def test_poly_raster_pass(self):
         """Test geometry"""
         poly = box(-69.2471495969998, 9.708220966978912, -68.79714959699979, 10.248220966978932)
@@ -73,6 +73,15 @@ class TestDateNumpy(unittest.TestCase):
         self.assertEqual(u_dt.first_year(ordinal_date), 1918)
         self.assertEqual(u_dt.first_year(np.array(ordinal_date)), 1918)
 
+    def test_ordinal_to_year_pass(self):
+        """Test ordinal_to_year"""
+        dates = [dt.datetime(2018, 4, 6), dt.datetime(1918, 12, 31), dt.datetime(2020, 1, 1),
+                 dt.datetime(1, 1, 1), dt.datetime(1969, 12, 31), dt.datetime(9999, 12, 31)]
+        ordinal_date = [dt.datetime.toordinal(date) for date in dates]
+        np.testing.assert_array_equal(u_dt.ordinal_to_year(ordinal_date),
+                                      [date.year for date in dates])
+        self.assertEqual(u_dt.ordinal_to_year(np.array([], int)).size, 0)
+
 # Execute Tests
 if __name__ == "__main__":
     TESTS = unittest.TestLoader().loadTestsFromTestCase(TestDateString)
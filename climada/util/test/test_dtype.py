@@ -0,0 +1,102 @@
+"""
+This file is part of CLIMADA.
+
+Copyright (C) 2017 ETH Zurich, CLIMADA contributors listed in AUTHORS.
+
+CLIMADA is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free
+Software Foundation, version 3.
+
+CLIMADA is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with CLIMADA. If not, see <https://www.gnu.org/licenses/>.
+
+---
+
+Test dtype module
+"""
+import unittest
+import numpy as np
+from scipy import sparse
+
+from climada import CONFIG
+import climada.util.dtype as u_dtype
+
+class TestFloatDtype(unittest.TestCase):
+    """Test float_dtype and as_float_dtype"""
+
+    def test_default_pass(self):
+        """Double precision matrices are not copied by default"""
+        self.assertEqual(u_dtype.float_dtype(), np.float64)
+        mat = sparse.csr_matrix(np.array([[1., 0., 3.], [0., 0., 2.]]))
+        self.assertIs(u_dtype.as_float_dtype(mat), mat)
+
+    def test_float32_pass(self):
+        """Data and indices are converted to the smallest types"""
+        mat = sparse.csc_matrix((np.array([1., 2., 3.]),
+                                 np.array([0, 1, 1], dtype=np.int64),
+                                 np.array([0, 2, 2, 3], dtype=np.int64)), shape=(2, 3))
+        float_dtype = CONFIG.float_dtype._val
+        try:
+            CONFIG.float_dtype._val = 'float32'
+            mat_32 = u_dtype.as_float_dtype(mat)
+        finally:
+            CONFIG.float_dtype._val = float_dtype
+        self.assertIsInstance(mat_32, sparse.csc_matrix)
+        self.assertEqual(mat_32.dtype, np.float32)
+        self.assertEqual(mat_32.indices.dtype, np.int32)
+        self.assertEqual(mat_32.indptr.dtype, np.int32)
+        np.testing.assert_array_equal(mat_32.toarray(), mat.toarray())
+        self.assertEqual(mat.dtype, np.float64)
+        self.assertEqual(u_dtype.index_dtype(2**31), np.int64)
+
+    def test_wrong_dtype_fail(self):
+        """Only float32 and float64 are supported"""
+        float_dtype = CONFIG.float_dtype._val
+        try:
+            CONFIG.float_dtype._val = 'float16'
+            with self.assertRaises(ValueError):
+                u_dtype.float_dtype()
+        finally:
+            CONFIG.float_dtype._val = float_dtype
+
+class TestQuantize(unittest.TestCase):
+    """Test quantize and dequantize"""
+
+    def test_quantize_pass(self):
+        """Values are decoded with an error of at most half a step"""
+        data = np.random.default_rng(5).uniform(17.5, 85, 1000)
+        quantized, scale, offset = u_dtype.quantize(data)
+        self.assertEqual(quantized.dtype, np.uint16)
+        self.assertEqual(quantized.min(), 1)
+        self.assertEqual(quantized.max(), 65535)
+        self.assertEqual(offset, data.min() - scale)
+        decoded = u_dtype.dequantize(quantized, scale, offset)
+        self.assertEqual(decoded.dtype, np.float64)
+        self.assertLessEqual(np.abs(decoded - data).max(), scale / 2 * (1 + 1e-9))
+
+    def test_constant_pass(self):
+        """Constant and empty values"""
+        quantized, scale, offset = u_dtype.quantize(np.array([2.5, 2.5]))
+        np.testing.assert_array_equal(u_dtype.dequantize(quantized, scale, offset), [2.5, 2.5])
+        self.assertEqual(quantized.min(), 1)
+        quantized, scale, offset = u_dtype.quantize(np.zeros(0))
+        self.assertEqual(u_dtype.dequantize(quantized, scale, offset).size, 0)
+
+    def test_zero_code_pass(self):
+        """No value is encoded as 0, zero values are decoded exactly"""
+        data = np.array([0., 1e-6, 3., 7.5])
+        quantized, scale, offset = u_dtype.quantize(data)
+        self.assertEqual(np.count_nonzero(quantized), data.size)
+        decoded = u_dtype.dequantize(quantized, scale, offset)
+        self.assertEqual(decoded[0], 0)
+        self.assertLessEqual(np.abs(decoded - data).max(), scale / 2 * (1 + 1e-9))
+
+# Execute Tests
+if __name__ == "__main__":
+    TESTS = unittest.TestLoader().loadTestsFromTestCase(TestFloatDtype)
+    TESTS.addTests(unittest.TestLoader().loadTestsFromTestCase(TestQuantize))
+    unittest.TextTestRunner(verbosity=2).run(TESTS)
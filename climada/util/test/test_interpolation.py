@@ -0,0 +1,83 @@
+"""
+This file is part of CLIMADA.
+
+Copyright (C) 2017 ETH Zurich, CLIMADA contributors listed in AUTHORS.
+
+CLIMADA is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free
+Software Foundation, version 3.
+
+CLIMADA is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with CLIMADA. If not, see <https://www.gnu.org/licenses/>.
+
+---
+
+Test of interpolation module
+"""
+import unittest
+import warnings
+import numpy as np
+from scipy import sparse
+
+import climada.util.interpolation as u_interp
+
+def exceedance_polyfit(values, frequency, return_periods, threshold):
+    """Reference fit of one column with np.polyfit"""
+    sort_pos = np.argsort(values)[::-1]
+    cum_freq = np.cumsum(frequency[sort_pos])
+    above = values[sort_pos] > threshold
+    if not above.any():
+        return np.zeros(return_periods.size)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        pol_coef = np.polyfit(np.log(cum_freq[above]), values[sort_pos][above], deg=1)
+    return np.polyval(pol_coef, np.log(1 / return_periods))
+
+class TestLocalExceedance(unittest.TestCase):
+    """Test local_exceedance_fit"""
+
+    def test_fit_pass(self):
+        """Same fit as np.polyfit on each column"""
+        rng = np.random.default_rng(12)
+        mat = sparse.random(200, 30, density=0.3, format='csc', random_state=rng) * 10
+        # empty column and column with a single value
+        mat[:, 3] = 0
+        mat[:, 4] = 0
+        mat[7, 4] = 5
+        mat.eliminate_zeros()
+        frequency = rng.uniform(0.001, 0.01, 200)
+        return_periods = np.array([10, 50, 100, 250])
+        for threshold in [0, 2]:
+            exc_val = u_interp.local_exceedance_fit(mat, frequency, return_periods, threshold)
+            self.assertEqual(exc_val.shape, (4, 30))
+            dense = mat.toarray()
+            for col in range(30):
+                np.testing.assert_allclose(
+                    exc_val[:, col],
+                    exceedance_polyfit(dense[:, col], frequency, return_periods, threshold),
+                    rtol=1e-10)
+            np.testing.assert_array_equal(exc_val[:, 3], 0)
+
+    def test_fit_csr_pass(self):
+        """Other sparse formats give the same result"""
+        mat = sparse.csr_matrix(np.array([[1., 0., 3.], [2., 0., 0.], [4., 5., 1.]]))
+        frequency = np.array([0.1, 0.2, 0.3])
+        return_periods = np.array([5, 20])
+        np.testing.assert_array_equal(
+            u_interp.local_exceedance_fit(mat, frequency, return_periods),
+            u_interp.local_exceedance_fit(mat.tocsc(), frequency, return_periods))
+
+    def test_negative_threshold_fail(self):
+        """Implicit zeros above a negative threshold are not supported"""
+        with self.assertRaises(ValueError):
+            u_interp.local_exceedance_fit(sparse.csc_matrix((2, 2)), np.ones(2),
+                                          np.array([10]), -1)
+
+# Execute Tests
+if __name__ == "__main__":
+    TESTS = unittest.TestLoader().loadTestsFromTestCase(TestLocalExceedance)
+    unittest.TextTestRunner(verbosity=2).run(TESTS)